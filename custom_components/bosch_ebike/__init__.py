@@ -1,14 +1,59 @@
 """The Bosch eBike integration."""
+import asyncio
+from datetime import timedelta
 import logging
+import time
+from typing import Any
+
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_ACCESS_TOKEN, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.typing import ConfigType
 
-from .api import BoschEBikeAPI
-from .const import DOMAIN, CONF_BIKE_ID, CONF_BIKE_NAME, CONF_REFRESH_TOKEN
+from .api import BoschEBikeAPI, BoschEBikeAuthError
+from .const import (
+    API_MODE_RECORD,
+    API_MODE_REPLAY,
+    DOMAIN,
+    CONF_API_MODE,
+    CONF_BIKE_ID,
+    CONF_BIKE_NAME,
+    CONF_BIKES,
+    CONF_CHARGER_BIKE,
+    CONF_CHARGERS,
+    CONF_CHARGER_EFFICIENCY,
+    CONF_CHARGER_ENTITY,
+    CONF_CHARGER_THRESHOLD,
+    CONF_EXPORT_STATISTICS,
+    CONF_HIBERNATE_AFTER,
+    CONF_MAX_CONCURRENT_REFRESHES,
+    CONF_PROBE_INTERVAL,
+    CONF_REFRESH_TOKEN,
+    CONF_REPLAY_SPEED,
+    CONF_SCAN_INTERVAL,
+    CONF_TARGET_SOC,
+    CONF_WAKE_ENTITIES,
+    DATA_PREFETCH,
+    DEFAULT_CHARGER_EFFICIENCY,
+    DEFAULT_HIBERNATE_AFTER,
+    DEFAULT_MAX_CONCURRENT_REFRESHES,
+    DEFAULT_PROBE_INTERVAL,
+    DEFAULT_REPLAY_SPEED,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_TARGET_SOC,
+    PREFETCH_MAX_AGE,
+)
 from .coordinator import BoschEBikeDataUpdateCoordinator
+from .discovery import async_setup_discovery
+from .executor import async_get_executor
+from .recording import ApiRecorder, ApiReplayer
+from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -18,72 +63,348 @@ PLATFORMS: list[Platform] = [
     Platform.BINARY_SENSOR,
 ]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Bosch eBike services."""
+    async_setup_services(hass)
+    return True
+
+
+def _coordinator_options(options: dict[str, Any]) -> dict[str, Any]:
+    """Return the coordinator settings for a config entry's options."""
+    probe_interval = options.get(CONF_PROBE_INTERVAL, DEFAULT_PROBE_INTERVAL)
+    return {
+        "scan_interval": timedelta(
+            seconds=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+        ),
+        "hibernate_after": timedelta(
+            hours=options.get(CONF_HIBERNATE_AFTER, DEFAULT_HIBERNATE_AFTER)
+        ),
+        "probe_interval": timedelta(hours=probe_interval) if probe_interval else None,
+        "target_soc": options.get(CONF_TARGET_SOC, DEFAULT_TARGET_SOC),
+        "export_statistics": options.get(CONF_EXPORT_STATISTICS, True),
+        "charger_efficiency": options.get(
+            CONF_CHARGER_EFFICIENCY, DEFAULT_CHARGER_EFFICIENCY
+        ),
+    }
+
+
+@callback
+def _async_update_refresh_limit(hass: HomeAssistant) -> None:
+    """Apply the lowest concurrent refresh limit of the entries to the shared executor."""
+    limit = min(
+        (
+            entry.options.get(CONF_MAX_CONCURRENT_REFRESHES, DEFAULT_MAX_CONCURRENT_REFRESHES)
+            for entry in hass.config_entries.async_entries(DOMAIN)
+            if entry.disabled_by is None
+        ),
+        default=DEFAULT_MAX_CONCURRENT_REFRESHES,
+    )
+    # NumberSelector stores floats
+    async_get_executor(hass).set_limit(int(limit))
+
+
+async def _async_setup_recording(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> tuple[ApiRecorder | None, ApiReplayer | None]:
+    """Return the recorder or replayer for the API mode in the options."""
+    # Record API traffic to, or replay it from, <config>/bosch_ebike_<account>.jsonl.gz
+    options = entry.options
+    recording_path = hass.config.path(f"{DOMAIN}_{entry.unique_id}.jsonl.gz")
+    api_mode = options.get(CONF_API_MODE)
+    if api_mode == API_MODE_RECORD:
+        _LOGGER.warning("Recording API traffic for %s to %s", entry.title, recording_path)
+        return ApiRecorder(recording_path), None
+    if api_mode == API_MODE_REPLAY:
+        replayer = ApiReplayer(
+            recording_path,
+            speed=options.get(CONF_REPLAY_SPEED, DEFAULT_REPLAY_SPEED),
+        )
+        try:
+            await replayer.async_load()
+        except (OSError, EOFError, KeyError, TypeError, ValueError) as err:
+            # Missing, truncated (EOFError) or malformed (records without
+            # method/endpoint, or not JSON objects) recordings
+            _LOGGER.error(
+                "Cannot replay %s, using the live API: %s: %s",
+                recording_path,
+                type(err).__name__,
+                err,
+            )
+            return None, None
+        _LOGGER.warning("Replaying recorded API traffic for %s", entry.title)
+        return None, replayer
+    return None, None
+
+
+def _v1_account_id(entry: ConfigEntry) -> str:
+    """Return the Bosch account a version 1 entry's bike belongs to."""
+    return (
+        BoschEBikeAPI.account_id_from_token(entry.data[CONF_ACCESS_TOKEN])
+        or entry.data[CONF_BIKE_ID]
+    )
+
+
+def _v1_charger(entry: ConfigEntry) -> dict[str, dict[str, Any]]:
+    """Return the charger plug of a version 1 entry, keyed by its bike."""
+    if not (charger_entity := entry.options.get(CONF_CHARGER_ENTITY)):
+        return {}
+    charger = {CONF_CHARGER_ENTITY: charger_entity}
+    if CONF_CHARGER_THRESHOLD in entry.options:
+        charger[CONF_CHARGER_THRESHOLD] = entry.options[CONF_CHARGER_THRESHOLD]
+    return {entry.data[CONF_BIKE_ID]: charger}
+
+
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Migrate a config entry to the current version.
+
+    Version 1 entries held one bike each. Version 2 entries hold every bike of
+    a Bosch account: the first v1 entry of an account to be migrated takes the
+    bikes of all the account's other v1 entries in one pass - before any of
+    them is set up - and those move their devices and entities into it and
+    are removed.
+    """
+    if entry.version > 2:
+        return False
+
+    if entry.version == 1:
+        account_id = _v1_account_id(entry)
+        _LOGGER.debug("Migrating %s to version 2", entry.title)
+
+        target = next(
+            (
+                other for other in hass.config_entries.async_entries(DOMAIN)
+                if other.version == 2 and other.unique_id == account_id
+            ),
+            None,
+        )
+        if target is None:
+            # This entry becomes the account's entry
+            target = entry
+            merged = [entry] + [
+                other for other in hass.config_entries.async_entries(DOMAIN)
+                if other.entry_id != entry.entry_id
+                and other.version == 1
+                and _v1_account_id(other) == account_id
+            ]
+            bikes: dict[str, str] = {}
+            options = {
+                key: value
+                for key, value in entry.options.items()
+                if key not in (CONF_CHARGER_ENTITY, CONF_CHARGER_THRESHOLD, CONF_CHARGER_BIKE)
+            }
+            chargers: dict[str, dict[str, Any]] = {}
+        else:
+            # Another bike of an account migrated before (e.g. restored from
+            # a backup) - the running entry reloads to pick it up
+            merged = [entry]
+            bikes = dict(target.data[CONF_BIKES])
+            options = dict(target.options)
+            chargers = {
+                bike_id: charger
+                for bike_id in bikes
+                if (charger := charger_options(options, bike_id, next(iter(bikes))))
+            }
+            options.pop(CONF_CHARGER_ENTITY, None)
+            options.pop(CONF_CHARGER_THRESHOLD, None)
+            options.pop(CONF_CHARGER_BIKE, None)
+
+        for source in merged:
+            bikes[source.data[CONF_BIKE_ID]] = source.data.get(CONF_BIKE_NAME, "eBike")
+            chargers.update(_v1_charger(source))
+        options[CONF_CHARGERS] = chargers
+
+        hass.config_entries.async_update_entry(
+            target,
+            data={
+                CONF_ACCESS_TOKEN: target.data[CONF_ACCESS_TOKEN],
+                CONF_REFRESH_TOKEN: target.data.get(CONF_REFRESH_TOKEN),
+                CONF_BIKES: bikes,
+            },
+            options=options,
+            unique_id=account_id,
+            version=2,
+        )
+        for source in merged:
+            if source is target:
+                continue
+            _async_move_bike(hass, source, target, source.data[CONF_BIKE_ID])
+            hass.config_entries.async_update_entry(
+                source, data={**source.data, CONF_BIKES: {}}, version=2
+            )
+            hass.async_create_task(hass.config_entries.async_remove(source.entry_id))
+        if target is not entry:
+            hass.async_create_task(hass.config_entries.async_reload(target.entry_id))
+
+    return True
+
+
+@callback
+def _async_move_bike(
+    hass: HomeAssistant, source: ConfigEntry, target: ConfigEntry, bike_id: str
+) -> None:
+    """Move a bike's device and entities to another config entry."""
+    entity_registry = er.async_get(hass)
+    for entity in er.async_entries_for_config_entry(entity_registry, source.entry_id):
+        entity_registry.async_update_entity(
+            entity.entity_id, config_entry_id=target.entry_id
+        )
+    device_registry = dr.async_get(hass)
+    if device := device_registry.async_get_device(identifiers={(DOMAIN, bike_id)}):
+        device_registry.async_update_device(
+            device.id,
+            add_config_entry_id=target.entry_id,
+            remove_config_entry_id=source.entry_id,
+        )
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up Bosch eBike from a config entry."""
+    """Set up a Bosch account and all of its bikes from a config entry."""
     _LOGGER.debug("Setting up Bosch eBike integration")
     
-    # Get tokens from config entry
-    access_token = entry.data[CONF_ACCESS_TOKEN]
-    refresh_token = entry.data.get(CONF_REFRESH_TOKEN)
-    bike_id = entry.data[CONF_BIKE_ID]
-    bike_name = entry.data.get(CONF_BIKE_NAME, "eBike")
+    bikes: dict[str, str] = entry.data[CONF_BIKES]
+    if not bikes:
+        # Merged into another entry by async_migrate_entry, being removed
+        return True
+    
+    recorder, replayer = await _async_setup_recording(hass, entry)
     
-    # Create API client
+    # Profiles and token expiry from the config flow that just created the entry
+    prefetch = hass.data.get(DATA_PREFETCH, {}).pop(entry.unique_id, None)
+    if prefetch and time.monotonic() - prefetch["fetched_at"] > PREFETCH_MAX_AGE:
+        prefetch = None
+    prefetch = prefetch or {}
+    
+    # One API client (and token) for every bike of the account
     session = async_get_clientsession(hass)
     api = BoschEBikeAPI(
         session=session,
-        access_token=access_token,
-        refresh_token=refresh_token,
+        access_token=entry.data[CONF_ACCESS_TOKEN],
+        refresh_token=entry.data.get(CONF_REFRESH_TOKEN),
+        recorder=recorder,
+        replayer=replayer,
+        # A known expiry saves the token refresh before the first request
+        token_expires_at=prefetch.get("token_expires_at"),
     )
     
-    # Create update coordinator
-    coordinator = BoschEBikeDataUpdateCoordinator(
-        hass=hass,
-        api=api,
-        bike_id=bike_id,
-        bike_name=bike_name,
+    # Refreshes of all bikes, of every account, share a bounded number of slots
+    _async_update_refresh_limit(hass)
+    executor = async_get_executor(hass)
+    coordinators = {
+        bike_id: BoschEBikeDataUpdateCoordinator(
+            hass=hass,
+            api=api,
+            bike_id=bike_id,
+            bike_name=bike_name,
+            executor=executor,
+            **_coordinator_options(entry.options),
+        )
+        for bike_id, bike_name in bikes.items()
+    }
+    for bike_id, coordinator in coordinators.items():
+        entry.async_on_unload(coordinator.async_shutdown)
+        if profile := prefetch.get("profiles", {}).get(bike_id):
+            coordinator.use_prefetched_profile(profile)
+    
+    await asyncio.gather(
+        *(coordinator.async_load_storage() for coordinator in coordinators.values())
     )
     
-    _LOGGER.info(
-        "Created coordinator for %s with update interval: %s",
-        bike_name,
-        coordinator.update_interval,
+    # Fetch initial data - refreshed together (up to the executor's limit at
+    # a time), the bikes' profiles come from a single bike list request. A
+    # bike that fails (e.g. removed from the account, or the cloud is down)
+    # doesn't hold up setup: its entities show their restored states and it
+    # retries at its next poll
+    _LOGGER.info("Performing initial data refresh for %s", entry.title)
+    await asyncio.gather(
+        *(coordinator.async_refresh() for coordinator in coordinators.values())
     )
+    failed = {
+        bike_id: coordinator.last_exception
+        for bike_id, coordinator in coordinators.items()
+        if not coordinator.last_update_success
+    }
+    for err in failed.values():
+        if isinstance(getattr(err, "__cause__", None), BoschEBikeAuthError):
+            raise ConfigEntryNotReady(f"Authentication failed: {err}")
+    for bike_id, err in failed.items():
+        _LOGGER.warning(
+            "Initial refresh of %s failed, retrying at the next poll: %s",
+            bikes[bike_id],
+            err,
+        )
+    _LOGGER.info("Initial data refresh complete for %s", entry.title)
     
-    # Fetch initial data
-    _LOGGER.info("Performing initial data refresh for %s", bike_name)
-    await coordinator.async_config_entry_first_refresh()
-    _LOGGER.info("Initial data refresh complete for %s", bike_name)
+    _async_track_entities(entry, coordinators)
     
-    # Store coordinator in hass.data
+    # Store coordinators in hass.data
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = {
-        "coordinator": coordinator,
+        "coordinators": coordinators,
         "api": api,
-        "bike_id": bike_id,
-        "bike_name": bike_name,
+        # Options the running client was set up with, see async_update_options
+        "api_mode": (entry.options.get(CONF_API_MODE), entry.options.get(CONF_REPLAY_SPEED)),
     }
     
     # Set up platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     
+    # Offer bikes added to the account later, using this entry's tokens
+    entry.async_on_unload(async_setup_discovery(hass, entry, api))
+    
     # Register options update listener
-    entry.add_update_listener(async_update_options)
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
     
     _LOGGER.info(
-        "Bosch eBike integration setup complete for %s (ID: %s)",
-        bike_name,
-        bike_id,
+        "Bosch eBike integration setup complete for %s (%d bikes)",
+        entry.title,
+        len(coordinators),
     )
     
     return True
 
 
+def charger_options(options: dict[str, Any], bike_id: str, first_bike: str) -> dict[str, Any]:
+    """Return the charger plug options of a bike, empty without a plug."""
+    if CONF_CHARGERS in options:
+        return options[CONF_CHARGERS].get(bike_id, {})
+    # Options saved before the plug was set per bike
+    if (options.get(CONF_CHARGER_BIKE) or first_bike) != bike_id:
+        return {}
+    return {
+        key: options[key]
+        for key in (CONF_CHARGER_ENTITY, CONF_CHARGER_THRESHOLD)
+        if key in options
+    }
+
+
+@callback
+def _async_track_entities(
+    entry: ConfigEntry, coordinators: dict[str, BoschEBikeDataUpdateCoordinator]
+) -> None:
+    """Link the charger plugs and wake entities from the options."""
+    first_bike = next(iter(coordinators))
+    for bike_id, coordinator in coordinators.items():
+        # Refresh on charger plug events if a smart plug sensor is linked
+        charger = charger_options(entry.options, bike_id, first_bike)
+        coordinator.async_track_charger(
+            charger.get(CONF_CHARGER_ENTITY),
+            charger.get(CONF_CHARGER_THRESHOLD),
+        )
+        # Wake a hibernating bike when its rider comes or goes
+        coordinator.async_track_wake_entities(entry.options.get(CONF_WAKE_ENTITIES))
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     _LOGGER.debug("Unloading Bosch eBike integration")
     
+    if entry.entry_id not in hass.data.get(DOMAIN, {}):
+        # Merged entry that was never set up
+        return True
+    
     # Unload platforms
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     
@@ -95,12 +416,40 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
 
 async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Update options."""
-    await hass.config_entries.async_reload(entry.entry_id)
+    """Apply changed options to the running coordinators and API client.
+
+    Reloading would tear down every entity and refetch everything (token
+    refresh included) just to change a setting, so only a change to the
+    entry's bikes (a discovered bike was added) reloads.
+    """
+    data = hass.data[DOMAIN][entry.entry_id]
+    coordinators: dict[str, BoschEBikeDataUpdateCoordinator] = data["coordinators"]
+    if set(entry.data[CONF_BIKES]) != set(coordinators):
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
+    options = entry.options
+    first_bike = next(iter(coordinators))
+    for bike_id, coordinator in coordinators.items():
+        charger = charger_options(options, bike_id, first_bike)
+        coordinator.async_apply_options(
+            **_coordinator_options(options),
+            charger_entity=charger.get(CONF_CHARGER_ENTITY),
+            charger_threshold=charger.get(CONF_CHARGER_THRESHOLD),
+            wake_entities=options.get(CONF_WAKE_ENTITIES),
+        )
+
+    _async_update_refresh_limit(hass)
+
+    api_mode = (options.get(CONF_API_MODE), options.get(CONF_REPLAY_SPEED))
+    if api_mode != data["api_mode"]:
+        data["api_mode"] = api_mode
+        data["api"].set_recording(*await _async_setup_recording(hass, entry))
+
+    _LOGGER.debug("Applied updated options for %s", entry.title)
 
 
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload config entry."""
     await async_unload_entry(hass, entry)
     await async_setup_entry(hass, entry)
-
@@ -1,15 +1,26 @@
 """API client for Bosch eBike Flow."""
+import asyncio
+from collections.abc import Sequence
+import json
 import logging
 import secrets
 import hashlib
 import base64
 from datetime import datetime, timedelta
+from importlib.util import find_spec
+import time
 from typing import Any
 from urllib.parse import urlencode
 
 import aiohttp
 import async_timeout
 
+try:
+    # Ships with Home Assistant; several times faster than the json module
+    from orjson import loads as json_loads
+except ImportError:  # pragma: no cover
+    from json import loads as json_loads
+
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 from .const import (
@@ -21,10 +32,95 @@ from .const import (
     SCOPE,
     ENDPOINT_BIKE_PROFILE,
     ENDPOINT_STATE_OF_CHARGE,
+    REQUEST_BUDGET,
+)
+from .middleware import (
+    ApiRequest,
+    ApiResponse,
+    AuthMiddleware,
+    CacheMiddleware,
+    MetricsMiddleware,
+    Middleware,
+    RateLimitMiddleware,
+    RecordReplayMiddleware,
+    RetryMiddleware,
+    build_chain,
 )
+from .profiler import span
+from .recording import ApiRecorder, ApiReplayer
 
 _LOGGER = logging.getLogger(__name__)
 
+# aiohttp only decodes brotli with one of these packages installed
+ACCEPT_ENCODING = (
+    "gzip, deflate, br"
+    if find_spec("brotli") or find_spec("brotlicffi")
+    else "gzip, deflate"
+)
+
+# Fields of each response the integration reads - everything else is dropped
+# right after decoding. True keeps a value as is, a dict keeps the listed keys
+# of an object and a one-item list applies its spec to every element.
+_COMPONENT_FIELDS: dict[str, Any] = {
+    "productName": True,
+    "softwareVersion": True,
+    "serialNumber": True,
+}
+_BIKE_FIELDS: dict[str, Any] = {
+    "id": True,
+    "attributes": {
+        "brandName": True,
+        "frameNumber": True,
+        "batteries": [{
+            **_COMPONENT_FIELDS,
+            "batteryLevel": True,
+            "remainingEnergy": True,
+            "totalEnergy": True,
+            "isCharging": True,
+            "isChargerConnected": True,
+            "numberOfFullChargeCycles": {"total": True},
+            "deliveredWhOverLifetime": True,
+        }],
+        "driveUnit": {
+            **_COMPONENT_FIELDS,
+            "totalDistanceTraveled": True,
+            "lock": {"isLocked": True, "isEnabled": True},
+        },
+        "connectedModule": {**_COMPONENT_FIELDS, "isAlarmFeatureEnabled": True},
+        "remoteControl": _COMPONENT_FIELDS,
+    },
+}
+BIKE_LIST_FIELDS: dict[str, Any] = {"data": [_BIKE_FIELDS]}
+BIKE_PROFILE_FIELDS: dict[str, Any] = {"data": _BIKE_FIELDS}
+STATE_OF_CHARGE_FIELDS: dict[str, Any] = {
+    "stateOfCharge": True,
+    "chargingActive": True,
+    "chargerConnected": True,
+    "reachableRange": True,
+    "remainingEnergyForRider": True,
+    "odometer": True,
+    "stateOfChargeLatestUpdate": True,
+}
+
+
+def project(value: Any, fields: Any) -> Any:
+    """Return the parts of a decoded JSON value selected by a field spec.
+
+    Values that don't have the shape the spec expects are returned as is,
+    so the coordinator's own type checks still see them.
+    """
+    if fields is True:
+        return value
+    if isinstance(fields, dict) and isinstance(value, dict):
+        return {
+            key: project(value[key], spec)
+            for key, spec in fields.items()
+            if key in value
+        }
+    if isinstance(fields, list) and isinstance(value, list):
+        return [project(item, fields[0]) for item in value]
+    return value
+
 
 class BoschEBikeAPIError(Exception):
     """Base exception for Bosch eBike API errors."""
@@ -42,12 +138,56 @@ class BoschEBikeAPI:
         session: aiohttp.ClientSession,
         access_token: str | None = None,
         refresh_token: str | None = None,
+        recorder: ApiRecorder | None = None,
+        replayer: ApiReplayer | None = None,
+        token_expires_at: datetime | None = None,
+        middlewares: Sequence[Middleware] | None = None,
     ) -> None:
-        """Initialize the API client."""
+        """Initialize the API client.
+
+        middlewares replaces the default request chain (see middleware.py),
+        first one outermost.
+        """
         self._session = session
         self._access_token = access_token
         self._refresh_token = refresh_token
-        self._token_expires_at: datetime | None = None
+        # Unknown expiry (None) means the first request refreshes the token
+        self._token_expires_at = token_expires_at
+        # Record live traffic to disk, or serve recorded traffic instead
+        self._recording = RecordReplayMiddleware(recorder, replayer)
+        self.metrics = MetricsMiddleware()
+        if middlewares is None:
+            middlewares = (
+                CacheMiddleware(),
+                self.metrics,
+                self._recording,
+                RetryMiddleware(),
+                RateLimitMiddleware(),
+                AuthMiddleware(self),
+            )
+        self._handler = build_chain(middlewares, self._send)
+
+    def set_recording(
+        self,
+        recorder: ApiRecorder | None,
+        replayer: ApiReplayer | None,
+    ) -> None:
+        """Switch recording/replaying of API traffic on the running client."""
+        self._recording.recorder = recorder
+        self._recording.replayer = replayer
+
+    @staticmethod
+    def account_id_from_token(access_token: str | None) -> str | None:
+        """Return the account ID (the JWT "sub" claim) of an access token.
+
+        Only reads the claim - the token is not verified, and may have expired.
+        """
+        try:
+            payload = access_token.split(".")[1]
+            claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        except (AttributeError, IndexError, ValueError):
+            return None
+        return claims.get("sub") if isinstance(claims, dict) else None
 
     @staticmethod
     def generate_pkce_pair() -> tuple[str, str]:
@@ -131,7 +271,7 @@ class BoschEBikeAPI:
             _LOGGER.error("Error exchanging code for token: %s", err)
             raise BoschEBikeAuthError(f"Failed to exchange code: {err}") from err
 
-    async def refresh_access_token(self) -> dict[str, Any]:
+    async def refresh_access_token(self, timeout: float = 10) -> dict[str, Any]:
         """Refresh the access token."""
         if not self._refresh_token:
             raise BoschEBikeAuthError("No refresh token available")
@@ -147,7 +287,7 @@ class BoschEBikeAPI:
         }
         
         try:
-            async with async_timeout.timeout(10):
+            async with async_timeout.timeout(timeout):
                 async with self._session.post(
                     TOKEN_URL,
                     data=data,
@@ -170,92 +310,146 @@ class BoschEBikeAPI:
             _LOGGER.error("Error refreshing token: %s", err)
             raise BoschEBikeAuthError(f"Failed to refresh token: {err}") from err
 
-    async def ensure_valid_token(self) -> None:
+    async def ensure_valid_token(self, timeout: float = 10) -> None:
         """Ensure we have a valid access token."""
         # Refresh if token expires in less than 10 minutes
         if self._token_expires_at:
             time_until_expiry = self._token_expires_at - datetime.now()
             if time_until_expiry < timedelta(minutes=10):
                 _LOGGER.debug("Token expiring soon, refreshing...")
-                await self.refresh_access_token()
+                await self.refresh_access_token(timeout)
         elif self._refresh_token:
             # No expiration time set, try to refresh
-            await self.refresh_access_token()
+            await self.refresh_access_token(timeout)
+
+    async def async_get_access_token(self, timeout: float = 10) -> str:
+        """Return a valid access token, refreshing it first if needed."""
+        await self.ensure_valid_token(timeout)
+        if not self._access_token:
+            raise BoschEBikeAuthError("No access token available")
+        return self._access_token
 
     async def _api_request(
         self,
         method: str,
         endpoint: str,
+        max_age: float = 0,
+        fields: dict[str, Any] | None = None,
         **kwargs: Any,
-    ) -> dict[str, Any]:
-        """Make an API request."""
-        await self.ensure_valid_token()
-        
-        if not self._access_token:
-            raise BoschEBikeAuthError("No access token available")
-        
-        headers = kwargs.pop("headers", {})
-        headers.update({
-            "Authorization": f"Bearer {self._access_token}",
-            "Content-Type": "application/json",
-        })
-        
-        url = f"{API_BASE_URL}{endpoint}"
-        
+    ) -> dict[str, Any] | None:
+        """Make an API request through the middleware chain.
+
+        The whole request - token refresh, retries and rate limiting
+        included - must finish within REQUEST_BUDGET seconds. With fields,
+        only those parts of the response are kept (see project). Returns
+        None for a 404.
+        """
+        request = ApiRequest(
+            method,
+            endpoint,
+            deadline=time.monotonic() + REQUEST_BUDGET,
+            max_age=max_age,
+            headers=kwargs.pop("headers", {}),
+            kwargs=kwargs,
+        )
         try:
-            async with async_timeout.timeout(10):
-                async with self._session.request(
-                    method,
-                    url,
-                    headers=headers,
-                    **kwargs,
-                ) as response:
-                    if response.status == 401:
-                        # Try to refresh token and retry once
-                        _LOGGER.debug("Got 401, attempting token refresh")
-                        await self.refresh_access_token()
-                        
-                        headers["Authorization"] = f"Bearer {self._access_token}"
-                        async with self._session.request(
-                            method,
-                            url,
-                            headers=headers,
-                            **kwargs,
-                        ) as retry_response:
-                            retry_response.raise_for_status()
-                            return await retry_response.json()
-                    
-                    response.raise_for_status()
-                    return await response.json()
-                    
-        except aiohttp.ClientResponseError as err:
-            if err.status == 404:
-                _LOGGER.debug("Resource not found (404): %s", endpoint)
-                return None
-            _LOGGER.error("API request error: %s", err)
+            response = await self._handler(request)
+        except LookupError as err:
+            # Nothing recorded for the request while replaying
             raise BoschEBikeAPIError(f"API request failed: {err}") from err
+        except asyncio.TimeoutError as err:
+            _LOGGER.error("API request timed out: %s %s", method, endpoint)
+            raise BoschEBikeAPIError(f"API request timed out: {endpoint}") from err
         except aiohttp.ClientError as err:
             _LOGGER.error("Connection error: %s", err)
             raise BoschEBikeAPIError(f"Connection failed: {err}") from err
 
-    async def get_bikes(self) -> list[dict[str, Any]]:
-        """Get all bikes for the authenticated user."""
-        _LOGGER.debug("Fetching bike list")
-        response = await self._api_request("GET", ENDPOINT_BIKE_PROFILE)
-        
-        if not response:
-            return []
-        
-        bikes = response.get("data", [])
-        _LOGGER.debug("Found %d bike(s)", len(bikes))
+        if response.status == 404:
+            _LOGGER.debug("Resource not found (404): %s", endpoint)
+            return None
+        if response.status >= 400:
+            _LOGGER.error("API request error: %s %s", response.status, endpoint)
+            raise BoschEBikeAPIError(f"API request failed ({response.status}): {endpoint}")
+        if fields is None:
+            return response.body
+        # After the chain, so recordings (and the cache) hold what the cloud
+        # sent and replayed responses are projected just like live ones
+        with span("project"):
+            return project(response.body, fields)
+
+    async def _send(self, request: ApiRequest) -> ApiResponse:
+        """Send a request to the Bosch cloud - the innermost handler of the chain."""
+        headers = {
+            **request.headers,
+            "Content-Type": "application/json",
+            "Accept-Encoding": ACCEPT_ENCODING,
+        }
+        with span("network"):
+            async with async_timeout.timeout(max(request.remaining(), 0)):
+                async with self._session.request(
+                    request.method,
+                    f"{API_BASE_URL}{request.endpoint}",
+                    headers=headers,
+                    **request.kwargs,
+                ) as response:
+                    if response.status >= 400:
+                        return ApiResponse(response.status)
+                    raw = await response.read()
+                    # aiohttp has already decompressed raw; Content-Length is
+                    # the size on the wire
+                    wire_bytes = (
+                        response.content_length
+                        if response.headers.get("Content-Encoding")
+                        else len(raw)
+                    )
+
+        with span("decode"):
+            try:
+                body = json_loads(raw)
+            except ValueError as err:
+                # Empty or truncated body - orjson's JSONDecodeError is a ValueError
+                _LOGGER.error("Invalid JSON in response: %s %s", request.method, request.endpoint)
+                raise BoschEBikeAPIError(
+                    f"Invalid response from {request.endpoint}: {err}"
+                ) from err
+        return ApiResponse(response.status, body, len(raw), wire_bytes)
+
+    async def get_bikes(self, max_age: float = 0) -> list[dict[str, Any]]:
+        """Get all bikes for the authenticated user.
+
+        A list fetched less than max_age seconds ago is returned without a
+        request, and concurrent callers share a single request.
+        """
+        response = await self._api_request(
+            "GET", ENDPOINT_BIKE_PROFILE, max_age=max_age, fields=BIKE_LIST_FIELDS
+        )
+        bikes = response.get("data", []) if response else []
+        _LOGGER.debug("Got %d bike(s)", len(bikes))
         return bikes
 
-    async def get_bike_profile(self, bike_id: str) -> dict[str, Any] | None:
-        """Get detailed bike profile."""
+    async def get_bike_profile(
+        self, bike_id: str, max_age: float = 0
+    ) -> dict[str, Any] | None:
+        """Get detailed bike profile.
+
+        With max_age, the profile is taken from the account's bike list
+        (fetched at most once per max_age for all bikes) when the list
+        carries the bike's full attributes.
+        """
+        if max_age > 0:
+            for bike in await self.get_bikes(max_age=max_age):
+                if (
+                    isinstance(bike, dict)
+                    and bike.get("id") == bike_id
+                    and isinstance((bike.get("attributes") or {}).get("batteries"), list)
+                ):
+                    return {"data": bike}
+
         _LOGGER.debug("Fetching bike profile for %s", bike_id)
         response = await self._api_request(
             "GET",
-            f"{ENDPOINT_BIKE_PROFILE}/{bike_id}"
+            f"{ENDPOINT_BIKE_PROFILE}/{bike_id}",
+            fields=BIKE_PROFILE_FIELDS,
         )
         return response
 
@@ -265,7 +459,8 @@ class BoschEBikeAPI:
         try:
             response = await self._api_request(
                 "GET",
-                f"{ENDPOINT_STATE_OF_CHARGE}/{bike_id}"
+                f"{ENDPOINT_STATE_OF_CHARGE}/{bike_id}",
+                fields=STATE_OF_CHARGE_FIELDS,
             )
             return response
         except BoschEBikeAPIError:
@@ -285,7 +480,8 @@ class BoschEBikeAPI:
         
         # Extract battery info from profile
         attributes = profile_data.get("data", {}).get("attributes", {})
-        battery = attributes.get("batteries", [{}])[0]
+        batteries = attributes.get("batteries") or [{}]
+        battery = batteries[0]  # primary; DualBattery bikes list two
         drive_unit = attributes.get("driveUnit", {})
         
         # Build combined data structure
@@ -301,19 +497,24 @@ class BoschEBikeAPI:
             "is_charging": battery.get("isCharging"),
             "is_charger_connected": battery.get("isChargerConnected"),
             "charge_cycles": battery.get("numberOfFullChargeCycles", {}).get("total"),
+            "batteries": [
+                {
+                    "serial_number": pack.get("serialNumber"),
+                    "battery_level": pack.get("batteryLevel"),
+                    "remaining_energy": pack.get("remainingEnergy"),
+                    "total_energy": pack.get("totalEnergy"),
+                }
+                for pack in batteries
+            ],
             
             # Bike info
             "brand": attributes.get("brandName"),
             "odometer": drive_unit.get("totalDistanceTraveled"),
             "is_locked": drive_unit.get("lock", {}).get("isLocked"),
-            
-            # From ConnectModule (if available)
-            "connect_module_data": None,
         }
         
         # Override/add data from state-of-charge if available
         if soc_data:
-            data["connect_module_data"] = soc_data
             data["battery_level"] = soc_data.get("stateOfCharge", data["battery_level"])
             data["is_charging"] = soc_data.get("chargingActive", data["is_charging"])
             data["is_charger_connected"] = soc_data.get("chargerConnected", data["is_charger_connected"])
@@ -334,3 +535,8 @@ class BoschEBikeAPI:
         """Get the current refresh token."""
         return self._refresh_token
 
+    @property
+    def token_expires_at(self) -> datetime | None:
+        """Get when the current access token expires."""
+        return self._token_expires_at
+
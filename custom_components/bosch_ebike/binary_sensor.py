@@ -12,11 +12,13 @@ from homeassistant.components.binary_sensor import (
     BinarySensorEntityDescription,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import STATE_ON
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
+from .const import ATTR_DATA_AS_OF, DOMAIN
 from .coordinator import BoschEBikeDataUpdateCoordinator
 
 _LOGGER = logging.getLogger(__name__)
@@ -27,6 +29,8 @@ class BoschEBikeBinarySensorEntityDescription(BinarySensorEntityDescription):
     """Describes Bosch eBike binary sensor entity."""
 
     value_fn: Callable[[dict[str, Any]], bool | None] | None = None
+    # False for states that must not outlive a restart (see sensor.py)
+    restore: bool = True
 
 
 BINARY_SENSORS: tuple[BoschEBikeBinarySensorEntityDescription, ...] = (
@@ -35,7 +39,9 @@ BINARY_SENSORS: tuple[BoschEBikeBinarySensorEntityDescription, ...] = (
         translation_key="battery_charging",
         name="Battery Charging",
         device_class=BinarySensorDeviceClass.BATTERY_CHARGING,
-        value_fn=lambda data: bool(data.get("battery", {}).get("is_charging")),
+        restore=False,
+        # None when missing, so the restored state applies
+        value_fn=lambda data: data.get("battery", {}).get("is_charging"),
     ),
     # Note: charger_connected is unreliable - ConnectModule stops updating when
     # bike is unplugged and powered off, so we never get the "unplugged" event
@@ -44,7 +50,8 @@ BINARY_SENSORS: tuple[BoschEBikeBinarySensorEntityDescription, ...] = (
         translation_key="charger_connected",
         name="Charger Connected",
         device_class=BinarySensorDeviceClass.PLUG,
-        value_fn=lambda data: bool(data.get("battery", {}).get("is_charger_connected")),
+        restore=False,
+        value_fn=lambda data: data.get("battery", {}).get("is_charger_connected"),
         entity_registry_enabled_default=False,  # Disabled - unreliable due to ConnectModule behavior
     ),
     # Lock and alarm sensors are unreliable - need further API exploration
@@ -77,18 +84,27 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Bosch eBike binary sensors from a config entry."""
-    coordinator: BoschEBikeDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    coordinators: dict[str, BoschEBikeDataUpdateCoordinator] = hass.data[DOMAIN][
+        entry.entry_id
+    ]["coordinators"]
     
     entities = [
         BoschEBikeBinarySensor(coordinator, description)
+        for coordinator in coordinators.values()
         for description in BINARY_SENSORS
     ]
     
     async_add_entities(entities)
 
 
-class BoschEBikeBinarySensor(CoordinatorEntity[BoschEBikeDataUpdateCoordinator], BinarySensorEntity):
-    """Representation of a Bosch eBike binary sensor."""
+class BoschEBikeBinarySensor(
+    CoordinatorEntity[BoschEBikeDataUpdateCoordinator], BinarySensorEntity, RestoreEntity
+):
+    """Representation of a Bosch eBike binary sensor.
+
+    Like the sensors, the last state is restored and shown until the API
+    returns a value again.
+    """
 
     entity_description: BoschEBikeBinarySensorEntityDescription
     _attr_has_entity_name = True
@@ -101,6 +117,8 @@ class BoschEBikeBinarySensor(CoordinatorEntity[BoschEBikeDataUpdateCoordinator],
         """Initialize the binary sensor."""
         super().__init__(coordinator)
         self.entity_description = description
+        self._restored_is_on: bool | None = None
+        self._restored_as_of: str | None = None
         
         # Set unique ID
         self._attr_unique_id = f"{coordinator.bike_id}_{description.key}"
@@ -134,38 +152,58 @@ class BoschEBikeBinarySensor(CoordinatorEntity[BoschEBikeDataUpdateCoordinator],
             
         self._attr_device_info = device_info
 
-    @property
-    def is_on(self) -> bool | None:
-        """Return the state of the binary sensor."""
+    async def async_added_to_hass(self) -> None:
+        """Restore the last state, used until the API provides one."""
+        await super().async_added_to_hass()
+        if not self.entity_description.restore:
+            return
+        last_state = await self.async_get_last_state()
+        if last_state is None or last_state.state not in (STATE_ON, "off"):
+            return
+        self._restored_is_on = last_state.state == STATE_ON
+        self._restored_as_of = last_state.attributes.get(ATTR_DATA_AS_OF)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Drop the restored state once the API provides a newer one."""
+        if self._restored_is_on is not None and self._live_is_on() is not None:
+            self._restored_is_on = self._restored_as_of = None
+        super()._handle_coordinator_update()
+
+    def _live_is_on(self) -> bool | None:
+        """Return the state in the latest snapshot."""
         if self.coordinator.data is None:
             return None
         
         if self.entity_description.value_fn is not None:
-            value = self.entity_description.value_fn(self.coordinator.data)
-            
-            # Log state changes for critical sensors
-            if self.entity_description.key in ("charger_connected", "battery_charging"):
-                if not hasattr(self, "_last_logged_state") or self._last_logged_state != value:
-                    _LOGGER.info(
-                        "Binary sensor %s state: %s (previous: %s)",
-                        self.entity_description.key,
-                        value,
-                        getattr(self, "_last_logged_state", "unknown"),
-                    )
-                    self._last_logged_state = value
-            
-            return value
+            # Charging/charger transitions are logged (and fired as events) once
+            # per snapshot by the coordinator
+            return self.entity_description.value_fn(self.coordinator.data)
         
         return None
 
+    @property
+    def is_on(self) -> bool | None:
+        """Return the state of the binary sensor."""
+        is_on = self._live_is_on()
+        return self._restored_is_on if is_on is None else is_on
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return when the state was last received by the Bosch cloud."""
+        if self._restored_is_on is not None and self._live_is_on() is None:
+            return {ATTR_DATA_AS_OF: self._restored_as_of}
+        return {ATTR_DATA_AS_OF: (self.coordinator.data or {}).get("last_update")}
+
     @property
     def available(self) -> bool:
         """Return if entity is available."""
         # Entity is available if coordinator succeeded
         # Even if individual values are None, we want to show the entity
-        # (it will just show as Off/Unknown)
+        # (it will just show as Off/Unknown). A restored state keeps it
+        # available while the API is unreachable.
         return (
             self.coordinator.last_update_success
             and self.coordinator.data is not None
-        )
+        ) or self._restored_is_on is not None
 
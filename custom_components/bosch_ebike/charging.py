@@ -0,0 +1,168 @@
+"""Charging session detection and grid energy accounting."""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Sequence
+import math
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+SESSION_HISTORY_SIZE = 100
+
+
+def _number(value: Any) -> float | None:
+    """Return value as a float, None if it isn't a number or numeric string."""
+    if isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+class ChargingSessionTracker:
+    """Integrates the energy put into the battery across charging sessions.
+
+    Every increase of the battery's energy between two readings is charging
+    (eBikes don't regenerate), so it is added to the running grid energy total
+    after dividing by the charger efficiency. Increases are grouped into
+    sessions using the is_charging flag; an increase seen while the flag is
+    off (the bike charged while offline) becomes a session of its own.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the tracker."""
+        self.total_wh = 0.0  # grid energy, only ever increases
+        # [start, end, start_soc, end_soc, battery_wh, grid_wh]
+        self._session: list[float | None] | None = None
+        self._sessions: deque[list[float | None]] = deque(maxlen=SESSION_HISTORY_SIZE)
+        self._last_energy: float | None = None
+        # How _last_energy was measured - (source, number of packs)
+        self._source: tuple[str, int] | None = None
+
+    def load(self, stored: dict[str, Any] | None) -> None:
+        """Restore the tracker from storage."""
+        if not stored:
+            return
+        self.total_wh = stored.get("total_wh", 0.0)
+        self._session = stored.get("session")
+        self._sessions.extend(stored.get("sessions", []))
+        self._last_energy = stored.get("last_energy")
+        if source := stored.get("source"):
+            self._source = tuple(source)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the tracker in storage form."""
+        return {
+            "total_wh": self.total_wh,
+            "session": self._session,
+            "sessions": list(self._sessions),
+            "last_energy": self._last_energy,
+            "source": self._source,
+        }
+
+    @staticmethod
+    def _energy(
+        packs: Sequence[tuple[Any, Any, Any]],
+    ) -> tuple[tuple[str, int], float] | None:
+        """Return the battery energy and the source it was measured from.
+
+        The remaining energy of every pack is preferred, the level times the
+        capacity of every pack is the fallback. Nothing is returned unless
+        every pack reports the readings of a source - a sum over some of the
+        packs of a DualBattery is not comparable with one over all of them.
+        """
+        if not packs:
+            return None
+        remaining = [_number(remaining_wh) for remaining_wh, _, _ in packs]
+        if None not in remaining:
+            return ("remaining_wh", len(packs)), sum(remaining)
+        from_level = []
+        for _, level, capacity in packs:
+            level, capacity = _number(level), _number(capacity)
+            if level is None or capacity is None or capacity <= 0:
+                return None
+            from_level.append(level / 100 * capacity)
+        return ("level", len(packs)), sum(from_level)
+
+    def update(
+        self,
+        timestamp: float,
+        is_charging: bool | None,
+        soc: float | None,
+        packs: Sequence[tuple[Any, Any, Any]],
+        efficiency: float,
+    ) -> bool:
+        """Feed a reading, returning True if the tracker changed.
+
+        packs holds (remaining Wh, level %, capacity Wh) of every battery.
+        Energy is only compared between readings of the same source: a
+        reading of another source starts over from its value outside a
+        session and is skipped during one, so switching sources never adds
+        energy.
+        """
+        changed = False
+        reading = self._energy(packs)
+        if reading is not None and reading[0] != self._source and (
+            self._session is None or self._source is None
+        ):
+            self._source, self._last_energy = reading
+            reading = None
+            changed = True
+        if reading is None or reading[0] != self._source:
+            if self._session is not None and is_charging is False:
+                self._end_session()
+                changed = True
+            return changed
+
+        energy_wh = reading[1]
+        added = (
+            energy_wh - self._last_energy
+            if self._last_energy is not None and energy_wh > self._last_energy
+            else 0.0
+        )
+        if energy_wh != self._last_energy:
+            self._last_energy = energy_wh
+            changed = True
+
+        if (is_charging or added) and self._session is None:
+            self._session = [timestamp, timestamp, soc, soc, 0.0, 0.0]
+            changed = True
+
+        if self._session is not None and added:
+            grid = added / efficiency
+            self.total_wh += grid
+            self._session[1] = timestamp
+            self._session[3] = soc
+            self._session[4] += added
+            self._session[5] += grid
+
+        if self._session is not None and not is_charging:
+            self._end_session()
+            changed = True
+
+        return changed
+
+    def _end_session(self) -> None:
+        """Move the running session to the history, unless nothing was charged."""
+        if self._session[4]:
+            self._sessions.append(self._session)
+        self._session = None
+
+    @property
+    def last_session(self) -> list[float | None] | None:
+        """Return the running session, or the last completed one."""
+        return self._session or (self._sessions[-1] if self._sessions else None)
+
+    def summary(self) -> dict[str, Any]:
+        """Return the values exposed as sensors."""
+        session = self.last_session
+        return {
+            "energy_total_kwh": round(self.total_wh / 1000, 3),
+            "last_session_wh": round(session[5]) if session else None,
+            "last_session_start": (
+                dt_util.utc_from_timestamp(session[0]).isoformat() if session else None
+            ),
+        }
@@ -1,5 +1,8 @@
 """Config flow for Bosch eBike integration."""
+import asyncio
+from datetime import datetime
 import logging
+import time
 from typing import Any
 
 import voluptuous as vol
@@ -7,14 +10,43 @@ import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_ACCESS_TOKEN
 from homeassistant.core import callback
+from homeassistant.helpers import selector
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.data_entry_flow import FlowResult
 
+from . import charger_options
 from .api import BoschEBikeAPI, BoschEBikeAuthError, BoschEBikeAPIError
 from .const import (
+    API_MODE_LIVE,
+    API_MODE_RECORD,
+    API_MODE_REPLAY,
+    BIKES_CACHE_TTL,
+    DATA_PREFETCH,
     DOMAIN,
+    CONF_API_MODE,
     CONF_BIKE_ID,
     CONF_BIKE_NAME,
+    CONF_BIKES,
+    CONF_CHARGERS,
+    CONF_CHARGER_EFFICIENCY,
+    CONF_CHARGER_ENTITY,
+    CONF_CHARGER_THRESHOLD,
+    CONF_EXPORT_STATISTICS,
+    CONF_HIBERNATE_AFTER,
+    CONF_MAX_CONCURRENT_REFRESHES,
+    CONF_PROBE_INTERVAL,
+    CONF_REPLAY_SPEED,
+    CONF_SCAN_INTERVAL,
+    CONF_SOURCE_ENTRY_ID,
+    CONF_TARGET_SOC,
+    CONF_WAKE_ENTITIES,
+    DEFAULT_CHARGER_EFFICIENCY,
+    DEFAULT_HIBERNATE_AFTER,
+    DEFAULT_MAX_CONCURRENT_REFRESHES,
+    DEFAULT_PROBE_INTERVAL,
+    DEFAULT_REPLAY_SPEED,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_TARGET_SOC,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -48,13 +80,27 @@ def _build_bike_name(bike: dict[str, Any]) -> str:
 class BoschEBikeConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Bosch eBike."""
 
-    VERSION = 1
+    # 2: one entry per Bosch account, holding all of its bikes
+    VERSION = 2
 
     def __init__(self) -> None:
         """Initialize the config flow."""
         self._code_verifier: str | None = None
         self._code_challenge: str | None = None
         self._bikes: list[dict[str, Any]] = []
+        # Profiles fetched while naming the bikes, and the token expiry,
+        # handed to the new entry's setup so it doesn't fetch them again
+        self._profiles: dict[str, dict[str, Any]] = {}
+        self._token_expires_at: datetime | None = None
+        self._discovered: dict[str, Any] = {}
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Get the options flow for this handler."""
+        return BoschEBikeOptionsFlow(config_entry)
 
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
@@ -117,21 +163,27 @@ class BoschEBikeConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 self.context["access_token"] = api.access_token
                 self.context["refresh_token"] = api.refresh_token
 
-                # If only one bike, auto-select it
+                # One entry per account - logging in again updates its tokens
+                account_id = (
+                    BoschEBikeAPI.account_id_from_token(api.access_token)
+                    or self._bikes[0]["id"]
+                )
+                await self.async_set_unique_id(account_id)
+                self._abort_if_unique_id_configured(
+                    updates={
+                        CONF_ACCESS_TOKEN: api.access_token,
+                        CONF_REFRESH_TOKEN: api.refresh_token,
+                    }
+                )
+
+                # Profiles for better names, handed to the new entry's setup
+                # so it doesn't fetch them again
+                self._profiles = await self._async_fetch_profiles(api)
+                self._token_expires_at = api.token_expires_at
+
+                # If only one bike, add it straight away
                 if len(self._bikes) == 1:
-                    bike = self._bikes[0]
-                    bike_id = bike["id"]
-                    bike_name = _build_bike_name(bike)
-
-                    return self.async_create_entry(
-                        title=bike_name,
-                        data={
-                            CONF_ACCESS_TOKEN: api.access_token,
-                            CONF_REFRESH_TOKEN: api.refresh_token,
-                            CONF_BIKE_ID: bike_id,
-                            CONF_BIKE_NAME: bike_name,
-                        },
-                    )
+                    return self._async_create_account_entry([self._bikes[0]["id"]])
 
                 # Multiple bikes - let user choose
                 return await self.async_step_select_bike()
@@ -161,36 +213,332 @@ class BoschEBikeConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Handle bike selection when multiple bikes exist."""
+        errors = {}
         if user_input is not None:
-            # Get selected bike
-            bike_id = user_input[CONF_BIKE_ID]
+            if user_input[CONF_BIKES]:
+                return self._async_create_account_entry(user_input[CONF_BIKES])
+            errors["base"] = "no_bikes_selected"
 
-            # Find bike details
-            bike = next((b for b in self._bikes if b["id"] == bike_id), None)
-            if not bike:
-                return self.async_abort(reason="bike_not_found")
-
-            bike_name = _build_bike_name(bike)
+        # Build bike selection options, all selected by default
+        bike_options = [
+            selector.SelectOptionDict(value=bike["id"], label=_build_bike_name(bike))
+            for bike in self._bikes
+        ]
 
-            return self.async_create_entry(
-                title=bike_name,
-                data={
-                    CONF_ACCESS_TOKEN: self.context["access_token"],
-                    CONF_REFRESH_TOKEN: self.context["refresh_token"],
-                    CONF_BIKE_ID: bike_id,
-                    CONF_BIKE_NAME: bike_name,
-                },
-            )
+        return self.async_show_form(
+            step_id="select_bike",
+            data_schema=vol.Schema({
+                vol.Required(
+                    CONF_BIKES,
+                    default=[bike["id"] for bike in self._bikes],
+                ): selector.SelectSelector(
+                    selector.SelectSelectorConfig(options=bike_options, multiple=True)
+                ),
+            }),
+            errors=errors,
+        )
 
-        # Build bike selection options
-        bike_options = {
+    async def _async_fetch_profiles(
+        self, api: BoschEBikeAPI
+    ) -> dict[str, dict[str, Any]]:
+        """Return every bike's profile and use it for the bike list.
+
+        The bike list usually carries each bike's full attributes, which are
+        its profile; only bikes whose list entry has no batteries are fetched,
+        concurrently. A failed profile is skipped - the bike keeps its list
+        entry and its setup fetches the profile as usual.
+        """
+        profiles = {
+            bike["id"]: {"data": bike}
+            for bike in self._bikes
+            if isinstance((bike.get("attributes") or {}).get("batteries"), list)
+        }
+        missing = [bike for bike in self._bikes if bike["id"] not in profiles]
+        results = await asyncio.gather(
+            *(api.get_bike_profile(bike["id"]) for bike in missing),
+            return_exceptions=True,
+        )
+        for bike, result in zip(missing, results):
+            if isinstance(result, BoschEBikeAPIError):
+                _LOGGER.debug("Profile for %s not prefetched: %s", bike["id"], result)
+            elif isinstance(result, BaseException):
+                raise result
+            elif isinstance(result, dict) and isinstance(result.get("data"), dict):
+                profiles[bike["id"]] = result
+                self._bikes[self._bikes.index(bike)] = result["data"]
+        return profiles
+
+    @callback
+    def _async_create_account_entry(self, bike_ids: list[str]) -> FlowResult:
+        """Create the account's entry for the selected bikes."""
+        bikes = {
             bike["id"]: _build_bike_name(bike)
             for bike in self._bikes
+            if bike["id"] in bike_ids
+        }
+        if not bikes:
+            return self.async_abort(reason="bike_not_found")
+
+        self.hass.data.setdefault(DATA_PREFETCH, {})[self.unique_id] = {
+            "profiles": {
+                bike_id: profile
+                for bike_id, profile in self._profiles.items()
+                if bike_id in bikes
+            },
+            "token_expires_at": self._token_expires_at,
+            "fetched_at": time.monotonic(),
         }
 
+        return self.async_create_entry(
+            title=", ".join(bikes.values()),
+            data={
+                CONF_ACCESS_TOKEN: self.context["access_token"],
+                CONF_REFRESH_TOKEN: self.context["refresh_token"],
+                CONF_BIKES: bikes,
+            },
+        )
+
+    async def async_step_integration_discovery(
+        self, discovery_info: dict[str, Any]
+    ) -> FlowResult:
+        """Handle a bike found on the account of a configured entry."""
+        bike_id = discovery_info[CONF_BIKE_ID]
+        # Keyed by bike so repeated discoveries don't stack up flows
+        await self.async_set_unique_id(bike_id)
+        # A bike the user ignored is stored as an ignored entry with its ID
+        self._abort_if_unique_id_configured()
+        # Bikes of an account entry are in its CONF_BIKES
+        for entry in self._async_current_entries(include_ignore=False):
+            if bike_id in entry.data.get(CONF_BIKES, {}):
+                return self.async_abort(reason="already_configured")
+
+        # Reuse the account's client - its bike list is cached, no request needed
+        source = self.hass.data.get(DOMAIN, {}).get(discovery_info[CONF_SOURCE_ENTRY_ID])
+        if source is None:
+            return self.async_abort(reason="account_not_loaded")
+        api: BoschEBikeAPI = source["api"]
+        try:
+            bikes = await api.get_bikes(max_age=BIKES_CACHE_TTL)
+        except BoschEBikeAPIError:
+            return self.async_abort(reason="api_error")
+        bike = next((b for b in bikes if b.get("id") == bike_id), None)
+        if bike is None:
+            return self.async_abort(reason="bike_not_found")
+
+        self._discovered = {
+            CONF_BIKE_ID: bike_id,
+            CONF_BIKE_NAME: _build_bike_name(bike),
+            CONF_SOURCE_ENTRY_ID: discovery_info[CONF_SOURCE_ENTRY_ID],
+        }
+        self.context["title_placeholders"] = {"name": self._discovered[CONF_BIKE_NAME]}
+        return await self.async_step_discovery_confirm()
+
+    async def async_step_discovery_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Confirm adding a discovered bike to its account's entry."""
+        if user_input is None:
+            return self.async_show_form(
+                step_id="discovery_confirm",
+                description_placeholders={"name": self._discovered[CONF_BIKE_NAME]},
+            )
+
+        entry = self.hass.config_entries.async_get_entry(
+            self._discovered[CONF_SOURCE_ENTRY_ID]
+        )
+        if entry is None:
+            return self.async_abort(reason="account_not_loaded")
+
+        # The entry reloads with the new bike, reusing the account's tokens
+        self.hass.config_entries.async_update_entry(
+            entry,
+            data={
+                **entry.data,
+                CONF_BIKES: {
+                    **entry.data[CONF_BIKES],
+                    self._discovered[CONF_BIKE_ID]: self._discovered[CONF_BIKE_NAME],
+                },
+            },
+        )
+        return self.async_abort(reason="bike_added")
+
+
+class BoschEBikeOptionsFlow(config_entries.OptionsFlow):
+    """Handle options for a Bosch eBike."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self._config_entry = config_entry
+        self._options: dict[str, Any] = {}
+        self._chargers: dict[str, dict[str, Any]] = {}
+        self._charger_bikes: list[str] = []
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            # Then the charger plug of each bike
+            self._options = user_input
+            self._charger_bikes = list(self._config_entry.data.get(CONF_BIKES, {}))
+            return await self.async_step_charger()
+
+        options = self._config_entry.options
+
+        schema = vol.Schema({
+            # Applied to the running coordinator, from its next poll
+            vol.Optional(
+                CONF_SCAN_INTERVAL,
+                default=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=60,
+                    max=3600,
+                    unit_of_measurement="s",
+                    mode=selector.NumberSelectorMode.BOX,
+                )
+            ),
+            vol.Optional(
+                CONF_MAX_CONCURRENT_REFRESHES,
+                default=options.get(
+                    CONF_MAX_CONCURRENT_REFRESHES, DEFAULT_MAX_CONCURRENT_REFRESHES
+                ),
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=1, max=20, mode=selector.NumberSelectorMode.BOX
+                )
+            ),
+            # Grid energy = energy added to the battery / efficiency
+            vol.Optional(
+                CONF_CHARGER_EFFICIENCY,
+                default=options.get(CONF_CHARGER_EFFICIENCY, DEFAULT_CHARGER_EFFICIENCY),
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=50,
+                    max=100,
+                    unit_of_measurement="%",
+                    mode=selector.NumberSelectorMode.BOX,
+                )
+            ),
+            # Battery level that fires the target_soc_reached event
+            vol.Optional(
+                CONF_TARGET_SOC,
+                default=options.get(CONF_TARGET_SOC, DEFAULT_TARGET_SOC),
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=1,
+                    max=100,
+                    unit_of_measurement="%",
+                    mode=selector.NumberSelectorMode.SLIDER,
+                )
+            ),
+            # Hibernation for bikes that stop reporting (e.g. winter storage)
+            vol.Optional(
+                CONF_HIBERNATE_AFTER,
+                default=options.get(CONF_HIBERNATE_AFTER, DEFAULT_HIBERNATE_AFTER),
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=1,
+                    max=24 * 30,
+                    unit_of_measurement="h",
+                    mode=selector.NumberSelectorMode.BOX,
+                )
+            ),
+            vol.Optional(
+                CONF_PROBE_INTERVAL,
+                default=options.get(CONF_PROBE_INTERVAL, DEFAULT_PROBE_INTERVAL),
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=0,
+                    max=24 * 7,
+                    unit_of_measurement="h",
+                    mode=selector.NumberSelectorMode.BOX,
+                )
+            ),
+            vol.Optional(
+                CONF_WAKE_ENTITIES,
+                description={"suggested_value": options.get(CONF_WAKE_ENTITIES)},
+            ): selector.EntitySelector(
+                selector.EntitySelectorConfig(
+                    domain=["person", "device_tracker", "zone"],
+                    multiple=True,
+                )
+            ),
+            # Hourly long-term statistics for odometer, energy and cycles
+            vol.Optional(
+                CONF_EXPORT_STATISTICS,
+                default=options.get(CONF_EXPORT_STATISTICS, True),
+            ): selector.BooleanSelector(),
+        })
+
+        if self.show_advanced_options:
+            # Record live API traffic, or replay a recording, for debugging
+            schema = schema.extend({
+                vol.Optional(
+                    CONF_API_MODE,
+                    default=options.get(CONF_API_MODE, API_MODE_LIVE),
+                ): selector.SelectSelector(
+                    selector.SelectSelectorConfig(
+                        options=[API_MODE_LIVE, API_MODE_RECORD, API_MODE_REPLAY],
+                        translation_key=CONF_API_MODE,
+                    )
+                ),
+                vol.Optional(
+                    CONF_REPLAY_SPEED,
+                    default=options.get(CONF_REPLAY_SPEED, DEFAULT_REPLAY_SPEED),
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=100,
+                        step=0.1,
+                        mode=selector.NumberSelectorMode.BOX,
+                    )
+                ),
+            })
+
+        return self.async_show_form(step_id="init", data_schema=schema)
+
+    async def async_step_charger(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Link the smart plug power/current sensor a bike charges from."""
+        bikes: dict[str, str] = self._config_entry.data.get(CONF_BIKES, {})
+        if user_input is not None:
+            bike_id = self._charger_bikes.pop(0)
+            if user_input.get(CONF_CHARGER_ENTITY):
+                self._chargers[bike_id] = user_input
+        if not self._charger_bikes:
+            return self.async_create_entry(
+                title="", data={**self._options, CONF_CHARGERS: self._chargers}
+            )
+
+        bike_id = self._charger_bikes[0]
+        charger = charger_options(self._config_entry.options, bike_id, next(iter(bikes)))
+        schema = vol.Schema({
+            vol.Optional(
+                CONF_CHARGER_ENTITY,
+                description={"suggested_value": charger.get(CONF_CHARGER_ENTITY)},
+            ): selector.EntitySelector(
+                selector.EntitySelectorConfig(
+                    domain="sensor",
+                    device_class=["power", "current"],
+                )
+            ),
+            # Empty - a default for the sensor's unit (W, kW, A or mA)
+            vol.Optional(
+                CONF_CHARGER_THRESHOLD,
+                description={"suggested_value": charger.get(CONF_CHARGER_THRESHOLD)},
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=0,
+                    max=100,
+                    step=0.001,
+                    mode=selector.NumberSelectorMode.BOX,
+                )
+            ),
+        })
         return self.async_show_form(
-            step_id="select_bike",
-            data_schema=vol.Schema({
-                vol.Required(CONF_BIKE_ID): vol.In(bike_options),
-            }),
+            step_id="charger",
+            data_schema=schema,
+            description_placeholders={"bike_name": bikes[bike_id]},
         )
@@ -1,6 +1,13 @@
 """Constants for the Bosch eBike integration."""
 
 DOMAIN = "bosch_ebike"
+# hass.data key for profiles and token expiry handed from the config flow to
+# setup, keyed by account (hass.data[DOMAIN] only holds loaded entries)
+DATA_PREFETCH = f"{DOMAIN}_prefetch"
+# hass.data key for the RefreshExecutor shared by all entries
+DATA_EXECUTOR = f"{DOMAIN}_executor"
+# Dispatcher signal sent after every update cycle, formatted with the bike ID
+SIGNAL_DIAGNOSTICS = f"{DOMAIN}_diagnostics_{{}}"
 
 # API URLs
 AUTH_URL = "https://p9.authz.bosch.com/auth/realms/obc/protocol/openid-connect/auth"
@@ -17,9 +24,33 @@ ENDPOINT_BIKE_PROFILE = "/v1/bike-profile"
 ENDPOINT_STATE_OF_CHARGE = "/v1/state-of-charge"
 ENDPOINT_PROFILE = "/v1/profile"
 
+# Request pipeline (middleware.py)
+REQUEST_BUDGET = 30  # seconds per API request, token refresh and retries included
+REQUEST_RETRIES = 2  # extra attempts after a connection error, 429 or 5xx
+REQUEST_RETRY_BACKOFF = 0.5  # seconds before the first retry, doubled for each next one
+REQUEST_RATE = 2.0  # sustained requests per second per account
+REQUEST_BURST = 10  # requests that may be sent back to back
+PAYLOAD_GROWTH_FACTOR = 1.5  # average response size over the first one that flags growth
+
+# Hot-path logging (tracing.py)
+LOG_SAMPLE_INTERVAL = 900  # seconds between two logs of a message repeated every update
+TRACE_BUFFER_SIZE = 500  # trace events kept per bike for the dump_trace service
+DEFAULT_PROFILE_CYCLES = 5  # update cycles timed by the profile service
+DEFAULT_PROFILE_DURATION = 3600  # seconds - the profile ends early if the cycles don't come
+
 # Update intervals
 DEFAULT_SCAN_INTERVAL = 300  # 5 minutes (ConnectModule updates every 5 min)
 TOKEN_REFRESH_INTERVAL = 5400  # 1.5 hours (tokens expire at 2 hours)
+MANUAL_REFRESH_COOLDOWN = 30  # Minimum seconds between manual refreshes of a bike
+DEFAULT_MAX_CONCURRENT_REFRESHES = 2  # bikes refreshed at once, across all accounts
+DISCOVERY_INTERVAL = 21600  # 6 hours between checks for bikes added to the account
+BIKES_CACHE_TTL = 3600  # seconds a fetched bike list is reused for
+PREFETCH_MAX_AGE = 300  # seconds a profile fetched by the config flow is used at setup
+PROFILE_BATCH_TTL = 30  # seconds - bikes of an account polled together share one list request
+
+# Persistent per-bike storage (battery health, ...)
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 60  # seconds - coalesces writes from consecutive updates
 
 # Entity naming
 ATTR_BATTERY_LEVEL = "battery_level"
@@ -30,6 +61,7 @@ ATTR_REACHABLE_RANGE = "reachable_range"
 ATTR_ODOMETER = "odometer"
 ATTR_LAST_UPDATE = "last_update"
 ATTR_CHARGE_CYCLES = "charge_cycles"
+ATTR_DATA_AS_OF = "data_as_of"  # when the Bosch cloud last received the value
 
 # Assist modes for range sensors
 ASSIST_MODES = ["eco", "tour", "sport", "turbo"]
@@ -37,5 +69,65 @@ ASSIST_MODES = ["eco", "tour", "sport", "turbo"]
 # Config flow
 CONF_BIKE_ID = "bike_id"
 CONF_BIKE_NAME = "bike_name"
+CONF_BIKES = "bikes"  # v2 entries: {bike_id: bike_name} for every bike of the account
 CONF_REFRESH_TOKEN = "refresh_token"
 CONF_CODE = "code"
+CONF_SOURCE_ENTRY_ID = "source_entry_id"  # discovered bikes: entry with the account tokens
+
+# Options
+CONF_SCAN_INTERVAL = "scan_interval"  # seconds, defaults to DEFAULT_SCAN_INTERVAL
+# Shared by all entries - the lowest value of any entry applies
+CONF_MAX_CONCURRENT_REFRESHES = "max_concurrent_refreshes"
+# Smart plug per bike: {bike_id: {CONF_CHARGER_ENTITY: ..., CONF_CHARGER_THRESHOLD: ...}}
+CONF_CHARGERS = "chargers"
+CONF_CHARGER_ENTITY = "charger_entity"
+CONF_CHARGER_THRESHOLD = "charger_threshold"
+# One plug per entry, before CONF_CHARGERS - the bike it charged, defaults to the first
+CONF_CHARGER_BIKE = "charger_bike"
+# Draw above which the plug counts as charging, by the plug sensor's unit when
+# no threshold is set - smart plugs report a few W of standby draw, a charging
+# eBike charger draws 50 W and more (about 0.25 A at 230 V)
+DEFAULT_CHARGER_THRESHOLDS = {
+    "W": 5.0,
+    "kW": 0.005,
+    "A": 0.05,
+    "mA": 50.0,
+}
+DEFAULT_CHARGER_THRESHOLD = DEFAULT_CHARGER_THRESHOLDS["W"]  # unknown units
+CONF_HIBERNATE_AFTER = "hibernate_after"
+DEFAULT_HIBERNATE_AFTER = 72  # hours without new data before a bike hibernates
+CONF_PROBE_INTERVAL = "probe_interval"
+DEFAULT_PROBE_INTERVAL = 6  # hours between profile probes while hibernating (0 = never)
+CONF_WAKE_ENTITIES = "wake_entities"
+CONF_CHARGER_EFFICIENCY = "charger_efficiency"
+DEFAULT_CHARGER_EFFICIENCY = 85  # % of grid energy that ends up in the battery
+CONF_EXPORT_STATISTICS = "export_statistics"
+CONF_TARGET_SOC = "target_soc"
+# Record/replay of API traffic (advanced options)
+CONF_API_MODE = "api_mode"
+API_MODE_LIVE = "live"
+API_MODE_RECORD = "record"
+API_MODE_REPLAY = "replay"
+CONF_REPLAY_SPEED = "replay_speed"
+DEFAULT_REPLAY_SPEED = 1.0  # 0 = no delay
+DEFAULT_TARGET_SOC = 100  # %
+
+# Services
+SERVICE_REFRESH = "refresh"
+SERVICE_GET_TRIPS = "get_trips"
+SERVICE_DUMP_TRACE = "dump_trace"
+SERVICE_PROFILE = "profile"
+ATTR_LIMIT = "limit"
+ATTR_CYCLES = "cycles"
+ATTR_DURATION = "duration"
+ATTR_BIKE_ID = "bike_id"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+
+# Events fired on the bus when a snapshot differs from the previous one
+EVENT_CHARGING_STARTED = f"{DOMAIN}_charging_started"
+EVENT_CHARGING_STOPPED = f"{DOMAIN}_charging_stopped"
+EVENT_TARGET_SOC_REACHED = f"{DOMAIN}_target_soc_reached"
+EVENT_CHARGER_CONNECTED = f"{DOMAIN}_charger_connected"
+EVENT_RIDE_DETECTED = f"{DOMAIN}_ride_detected"
+EVENT_FIRMWARE_CHANGED = f"{DOMAIN}_firmware_changed"
+RIDE_MIN_DISTANCE = 100  # m - smaller odometer deltas are treated as noise
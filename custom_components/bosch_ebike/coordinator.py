@@ -1,19 +1,172 @@
 """DataUpdateCoordinator for Bosch eBike integration."""
-from datetime import timedelta
+from collections.abc import Awaitable
+from datetime import datetime, timedelta
 import logging
-from typing import Any
+import time
+from typing import Any, TypeVar
 
-from homeassistant.core import HomeAssistant
+from homeassistant.const import ATTR_UNIT_OF_MEASUREMENT
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_call_later, async_track_state_change_event
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
 from .api import BoschEBikeAPI, BoschEBikeAPIError
-from .const import DOMAIN
+from .const import (
+    ASSIST_MODES,
+    DEFAULT_CHARGER_EFFICIENCY,
+    DEFAULT_CHARGER_THRESHOLD,
+    DEFAULT_CHARGER_THRESHOLDS,
+    DEFAULT_HIBERNATE_AFTER,
+    DEFAULT_PROBE_INTERVAL,
+    DEFAULT_TARGET_SOC,
+    DOMAIN,
+    MANUAL_REFRESH_COOLDOWN,
+    PROFILE_BATCH_TTL,
+    SIGNAL_DIAGNOSTICS,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+from .charging import ChargingSessionTracker
+from .events import detect_transitions
+from .executor import RefreshExecutor
+from .external_statistics import ExternalStatistics
+from .health import BatteryHealthModel
+from .history import ChargeRateEstimator, SampleBuffer
+from .profiler import UpdateProfiler, span
+from .tracing import SampledLogger, TraceBuffer
+from .trips import TripStore
 
 _LOGGER = logging.getLogger(__name__)
+# Shared by all bikes, so repeated messages don't grow with the fleet
+_SAMPLED_LOGGER = SampledLogger(_LOGGER)
 
 # Poll every 5 minutes (300 seconds)
 UPDATE_INTERVAL = timedelta(minutes=5)
 
+_T = TypeVar("_T")
+
+
+def _as_dict(value: Any) -> dict[str, Any]:
+    """Return value if it is a JSON object, else an empty dict.
+
+    The API returns null (and occasionally other types) for optional objects.
+    """
+    return value if isinstance(value, dict) else {}
+
+
+def _parse_timestamp(value: Any) -> datetime | None:
+    """Parse an API timestamp (e.g. stateOfChargeLatestUpdate) to UTC."""
+    if not isinstance(value, str):
+        return None
+    parsed = dt_util.parse_datetime(value)
+    return dt_util.as_utc(parsed) if parsed else None
+
+
+def _is_number(value: Any) -> bool:
+    """Return True for JSON numbers (bool is an int subclass in Python)."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _write_lines(path: str, lines: list[str]) -> None:
+    """Write lines to a text file (run in the executor)."""
+    with open(path, "w", encoding="utf-8") as file:
+        file.writelines(f"{line}\n" for line in lines)
+
+
+# Readings summed across the batteries of a multi-battery (DualBattery) bike
+_BATTERY_SUM_FIELDS = (
+    "remaining_wh",
+    "total_capacity_wh",
+    "charge_cycles_total",
+    "delivered_lifetime_wh",
+)
+
+
+def _parse_battery(battery: dict[str, Any]) -> dict[str, Any]:
+    """Map one entry of the profile's batteries array to snapshot fields."""
+    return {
+        "level_percent": battery.get("batteryLevel"),
+        "remaining_wh": battery.get("remainingEnergy"),
+        "total_capacity_wh": battery.get("totalEnergy"),
+        "is_charging": battery.get("isCharging"),
+        "is_charger_connected": battery.get("isChargerConnected"),
+        "charge_cycles_total": _as_dict(battery.get("numberOfFullChargeCycles")).get("total"),
+        "delivered_lifetime_wh": battery.get("deliveredWhOverLifetime"),
+        "product_name": battery.get("productName"),
+        "software_version": battery.get("softwareVersion"),
+        "serial_number": battery.get("serialNumber"),
+    }
+
+
+def _index_batteries(batteries_list: Any) -> dict[str, dict[str, Any]]:
+    """Parse the batteries array into a dict keyed by serial number.
+
+    Batteries without a (unique) serial are keyed battery_1, battery_2, ...
+    by position. Dict order is the API's order, so the first is the primary.
+    """
+    if not isinstance(batteries_list, list):
+        return {}
+    batteries: dict[str, dict[str, Any]] = {}
+    for index, raw in enumerate(batteries_list):
+        battery = _parse_battery(_as_dict(raw))
+        battery["index"] = index
+        serial = battery["serial_number"]
+        key = serial if isinstance(serial, str) and serial and serial not in batteries else None
+        batteries[key or f"battery_{index + 1}"] = battery
+    return batteries
+
+
+def _aggregate_batteries(batteries: dict[str, dict[str, Any]]) -> dict[str, Any]:
+    """Combine per-battery readings into the bike-level battery snapshot.
+
+    Energies and cycle counts are summed, flags are set if any battery's is,
+    and the level is weighted by capacity. Names and versions are the primary
+    battery's. With a single battery its readings are used unchanged.
+    """
+    packs = list(batteries.values())
+    primary = packs[0] if packs else {}
+    aggregate = {
+        "level_percent": primary.get("level_percent"),
+        "remaining_wh": primary.get("remaining_wh"),
+        "total_capacity_wh": primary.get("total_capacity_wh"),
+        "is_charging": primary.get("is_charging"),
+        "is_charger_connected": primary.get("is_charger_connected"),
+        "charge_cycles_total": primary.get("charge_cycles_total"),
+        "delivered_lifetime_wh": primary.get("delivered_lifetime_wh"),
+        "product_name": primary.get("product_name"),
+        "software_version": primary.get("software_version"),
+    }
+    if len(packs) < 2:
+        return aggregate
+
+    for field in _BATTERY_SUM_FIELDS:
+        values = [pack[field] for pack in packs if _is_number(pack[field])]
+        aggregate[field] = sum(values) if values else None
+
+    for field in ("is_charging", "is_charger_connected"):
+        flags = [pack[field] for pack in packs if pack[field] is not None]
+        aggregate[field] = any(flags) if flags else None
+
+    levels = [
+        (pack["level_percent"], pack["total_capacity_wh"])
+        for pack in packs
+        if _is_number(pack["level_percent"])
+    ]
+    if levels and all(_is_number(capacity) and capacity > 0 for _, capacity in levels):
+        total = sum(capacity for _, capacity in levels)
+        aggregate["level_percent"] = round(
+            sum(level * capacity for level, capacity in levels) / total, 1
+        )
+    elif levels:
+        aggregate["level_percent"] = round(sum(level for level, _ in levels) / len(levels), 1)
+    else:
+        aggregate["level_percent"] = None
+    return aggregate
+
 
 class BoschEBikeDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
     """Class to manage fetching Bosch eBike data from the API."""
@@ -24,55 +177,748 @@ class BoschEBikeDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         api: BoschEBikeAPI,
         bike_id: str,
         bike_name: str,
+        scan_interval: timedelta = UPDATE_INTERVAL,
+        hibernate_after: timedelta = timedelta(hours=DEFAULT_HIBERNATE_AFTER),
+        probe_interval: timedelta | None = timedelta(hours=DEFAULT_PROBE_INTERVAL),
+        target_soc: float = DEFAULT_TARGET_SOC,
+        export_statistics: bool = True,
+        charger_efficiency: float = DEFAULT_CHARGER_EFFICIENCY,
+        executor: RefreshExecutor | None = None,
     ) -> None:
         """Initialize the coordinator."""
         super().__init__(
             hass,
             _LOGGER,
             name=f"{DOMAIN}_{bike_id}",
-            update_interval=UPDATE_INTERVAL,
+            update_interval=scan_interval,
+            # Unchanged snapshots (e.g. hibernation probes) don't write states
+            always_update=False,
         )
         self.api = api
         self.bike_id = bike_id
         self.bike_name = bike_name
+        self.scan_interval = scan_interval
+        self.target_soc = target_soc
+        self.charger_efficiency = charger_efficiency
+
+        # Hibernation - a bike with no new data for hibernate_after is only
+        # probed every probe_interval (None = not at all) until woken
+        self.hibernate_after = hibernate_after
+        self.probe_interval = probe_interval
+        self.hibernating = False
+        self._last_activity: datetime | None = None
+        self._activity_signature: tuple | None = None
+        self._profile_signature: tuple | None = None
+        # Profile fetched by the config flow, used instead of fetching it again
+        self._prefetched_profile: dict[str, Any] | None = None
+
+        # Pipeline health, updated once per cycle and pushed to the diagnostic
+        # sensors with SIGNAL_DIAGNOSTICS - kept out of the snapshot so it
+        # doesn't defeat always_update=False
+        self.diagnostics: dict[str, Any] = {
+            "data_as_of": None,  # last stateOfChargeLatestUpdate, kept while offline
+            "last_success": None,
+            "cycle_ms": None,
+            "endpoint_ms": {},
+            "consecutive_failures": 0,
+            "traffic": {},
+            "queue_wait_ms": None,
+            "refresh_queue": {},
+        }
+        self._endpoint_ms: dict[str, float] = {}
+        # Per-cycle details, returned by the dump_trace service
+        self.trace = TraceBuffer()
+        # Shared limit on concurrent refreshes (None: refresh freely)
+        self.executor = executor
+        # Stage timings, while the profile service runs
+        self.profiler = UpdateProfiler()
+        self._unsub_profile: CALLBACK_TYPE | None = None
+
+        # Recent SoC samples (shown in diagnostics) and the charge rate of the
+        # current session, both fed once per new reading
+        self.samples = SampleBuffer()
+        self._charge_rate = ChargeRateEstimator()
+        self._last_sample_key: tuple | None = None
+        # Highest odometer seen, the baseline of ride detection
+        self._max_distance_m: float | None = None
+
+        # Models persisted across restarts: battery health keyed by battery
+        # serial number, the hourly counter buffer for long-term statistics
+        # the trip history and charging energy
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{bike_id}"
+        )
+        self._battery_health: dict[str, BatteryHealthModel] = {}
+        self._statistics = ExternalStatistics(hass, bike_id, bike_name)
+        self._trips = TripStore()
+        self._charging = ChargingSessionTracker()
+        self.export_statistics = export_statistics
+
+        # Manual refreshes (refresh service) - the first call runs straight
+        # away, any calls during the cooldown collapse into one trailing refresh
+        self._manual_refresh = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=MANUAL_REFRESH_COOLDOWN,
+            immediate=True,
+            function=self._async_manual_refresh,
+        )
+        # Set for the next refresh by a manual one, which skips the executor queue
+        self._priority_refresh = False
+
+        # Optional smart plug (power or current sensor) the bike charges from
+        self._charger_entity: str | None = None
+        self._charger_threshold: float | None = None
+        self._charger_drawing: bool | None = None
+        # Set by a wake entity - keep polling an idle plug's bike until it reports
+        self._polling_resumed = False
+        self._unsub_charger: CALLBACK_TYPE | None = None
+        self._unsub_wake: CALLBACK_TYPE | None = None
+
+    def use_prefetched_profile(self, profile_data: dict[str, Any]) -> None:
+        """Use an already fetched profile for the next (first) update."""
+        self._prefetched_profile = profile_data
+
+    async def async_load_storage(self) -> None:
+        """Load the persisted models, call before the first refresh."""
+        stored = await self._store.async_load() or {}
+        self._battery_health = {
+            serial: BatteryHealthModel.from_dict(model)
+            for serial, model in stored.get("battery_health", {}).items()
+        }
+        self._statistics.load(stored.get("statistics"))
+        self._trips.load(stored.get("trips"))
+        self._charging.load(stored.get("charging"))
+
+    @callback
+    def _data_to_store(self) -> dict[str, Any]:
+        """Return the persisted models in storage form."""
+        return {
+            "battery_health": {
+                serial: model.as_dict()
+                for serial, model in self._battery_health.items()
+            },
+            "statistics": self._statistics.as_dict(),
+            "trips": self._trips.as_dict(),
+            "charging": self._charging.as_dict(),
+        }
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Persist the models, batching writes from consecutive updates."""
+        self._store.async_delay_save(self._data_to_store, STORAGE_SAVE_DELAY)
+
+    async def async_request_manual_refresh(self) -> None:
+        """Request a user-initiated refresh, coalesced with concurrent requests."""
+        await self._manual_refresh.async_call()
+
+    async def _async_manual_refresh(self) -> None:
+        """Refresh now, ahead of the next scheduled poll."""
+        self._wake("refresh requested")
+        # async_refresh cancels the pending poll and reschedules it from now,
+        # so a manual refresh never runs back-to-back with a scheduled one.
+        # The user is waiting for it - it skips the executor's queue
+        self._priority_refresh = True
+        await self.async_refresh()
+
+    async def async_shutdown(self) -> None:
+        """Cancel any pending manual refresh and the state listeners."""
+        self._manual_refresh.async_shutdown()
+        self.async_track_charger(None)
+        self.async_track_wake_entities(None)
+        if self._unsub_profile is not None:
+            self._unsub_profile()
+            self._unsub_profile = None
+        await super().async_shutdown()
+
+    @callback
+    def async_start_profile(self, cycles: int, duration: timedelta) -> None:
+        """Time the stages of the next update cycles (see profiler.py).
+
+        The report is written after cycles cycles, or when duration has
+        passed if that comes first.
+        """
+        if self._unsub_profile is not None:
+            self._unsub_profile()
+        self.profiler.start(cycles, duration.total_seconds())
+        self._unsub_profile = async_call_later(
+            self.hass, duration, self._async_profile_window_closed
+        )
+        _LOGGER.info("Profiling the next %d updates of %s", cycles, self.bike_name)
+
+    async def _async_profile_window_closed(self, now: datetime) -> None:
+        self._unsub_profile = None
+        if self.profiler.active:
+            await self._async_finish_profile()
+
+    async def _async_finish_profile(self) -> None:
+        """Write the profile report as folded stacks next to the configuration."""
+        if self._unsub_profile is not None:
+            self._unsub_profile()
+            self._unsub_profile = None
+        report, folded = self.profiler.stop()
+        path = self.hass.config.path(f"{DOMAIN}_profile_{self.bike_id}.folded")
+        try:
+            await self.hass.async_add_executor_job(_write_lines, path, folded)
+        except OSError as err:
+            _LOGGER.warning("Failed to write profile of %s: %s", self.bike_name, err)
+        else:
+            report["file"] = path
+        _LOGGER.info(
+            "Profiled %d updates of %s, report in %s and the diagnostics",
+            report["cycles"],
+            self.bike_name,
+            report.get("file"),
+        )
+
+    async def _async_refresh(self, *args: Any, **kwargs: Any) -> None:
+        """Refresh in a slot of the shared executor.
+
+        While profiling, the whole cycle is timed - waiting for the slot and
+        updating the listeners included.
+        """
+        with self.profiler.cycle():
+            if self.executor is None:
+                await super()._async_refresh(*args, **kwargs)
+            else:
+                priority, self._priority_refresh = self._priority_refresh, False
+                with span("queue_wait"):
+                    waited = await self.executor.acquire(self.bike_id, priority)
+                self.diagnostics["queue_wait_ms"] = round(waited * 1000, 1)
+                try:
+                    await super()._async_refresh(*args, **kwargs)
+                finally:
+                    self.executor.release()
+        if self.profiler.done:
+            await self._async_finish_profile()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all registered listeners."""
+        with span("entity_writes"):
+            super().async_update_listeners()
+
+    @callback
+    def async_apply_options(
+        self,
+        *,
+        scan_interval: timedelta,
+        hibernate_after: timedelta,
+        probe_interval: timedelta | None,
+        target_soc: float,
+        export_statistics: bool,
+        charger_efficiency: float,
+        charger_entity: str | None,
+        charger_threshold: float | None,
+        wake_entities: list[str] | None,
+    ) -> None:
+        """Apply changed options to the running coordinator.
+
+        Nothing is fetched: new intervals take effect when the next poll
+        (already scheduled under the old interval) reschedules, so changing
+        options across many bikes never lines their polls up into a burst.
+        """
+        self.scan_interval = scan_interval
+        self.hibernate_after = hibernate_after
+        self.probe_interval = probe_interval
+        self.target_soc = target_soc
+        self.export_statistics = export_statistics
+        self.charger_efficiency = charger_efficiency
+
+        if (charger_entity, charger_threshold) != (
+            self._charger_entity,
+            self._charger_threshold,
+        ):
+            self.async_track_charger(charger_entity, charger_threshold)
+        self.async_track_wake_entities(wake_entities)
+
+        previous_interval = self.update_interval
+        if self.hibernating:
+            self.update_interval = probe_interval
+        elif previous_interval is not None or self._charger_entity is None:
+            # Polling suspended for an idle charger resumes on the next plug
+            # change, or now if the plug was unlinked
+            self.update_interval = scan_interval
+        if previous_interval is None and self.update_interval is not None:
+            # Nothing is scheduled that would pick the change up
+            self._schedule_refresh()
+
+    @callback
+    def async_track_charger(
+        self, entity_id: str | None, threshold: float | None = None
+    ) -> None:
+        """Refresh as soon as the linked charger plug starts or stops drawing.
+
+        The ConnectModule never reports an unplug, and a plug-in is only seen at
+        the next poll, so the plug's own sensor is used as the trigger instead.
+        Without a threshold the default for the sensor's unit applies.
+        Replaces any previously linked plug; None unlinks it.
+        """
+        if self._unsub_charger is not None:
+            self._unsub_charger()
+            self._unsub_charger = None
+        self._charger_entity = entity_id
+        self._charger_threshold = threshold
+        self._charger_drawing = self._charger_is_drawing()
+        if entity_id is None:
+            return
+
+        @callback
+        def _async_charger_changed(event: Event) -> None:
+            drawing = self._charger_is_drawing()
+            # Ignore unavailable/unknown states and changes within the same side
+            # of the threshold (plugs report power every few seconds)
+            if drawing is None or drawing == self._charger_drawing:
+                return
+
+            _LOGGER.debug(
+                "Charger %s %s drawing power, requesting refresh for %s",
+                entity_id,
+                "started" if drawing else "stopped",
+                self.bike_id,
+            )
+            self._charger_drawing = drawing
+            # A plug change means someone is at the bike - as for a requested
+            # refresh, the update must fetch everything, not just probe
+            self._wake(f"charger {entity_id} {'started' if drawing else 'stopped'} drawing")
+            # Debounced - a flapping plug results in a single refresh
+            self.hass.async_create_task(self.async_request_refresh())
+
+        self._unsub_charger = async_track_state_change_event(
+            self.hass, [entity_id], _async_charger_changed
+        )
+
+    def _charger_is_drawing(self) -> bool | None:
+        """Return whether the linked charger plug is drawing power."""
+        if self._charger_entity is None:
+            return None
+
+        state = self.hass.states.get(self._charger_entity)
+        if state is None:
+            return None
+
+        try:
+            value = float(state.state)
+        except ValueError:
+            # unknown / unavailable
+            return None
+
+        threshold = self._charger_threshold
+        if threshold is None:
+            threshold = DEFAULT_CHARGER_THRESHOLDS.get(
+                state.attributes.get(ATTR_UNIT_OF_MEASUREMENT), DEFAULT_CHARGER_THRESHOLD
+            )
+        return value > threshold
+
+    def _update_polling(self, data: dict[str, Any]) -> None:
+        """Suspend polling while the charger is idle and the bike is silent.
+
+        With no draw at the plug the bike is not charging, and if the
+        ConnectModule has not pushed a new reading since the previous poll it
+        is asleep - polling would only fetch the same snapshot again. Polling
+        resumes on the next plug state change, or when a wake entity changes -
+        then until the bike reports again.
+        """
+        if self.hibernating:
+            update_interval = self.probe_interval
+        elif self._charger_entity is not None:
+            previous = self.data or {}
+            silent = data.get("last_update") == previous.get("last_update")
+            if not silent:
+                self._polling_resumed = False
+            idle = self._charger_is_drawing() is False
+            suspend = idle and silent and not self._polling_resumed
+            update_interval = None if suspend else self.scan_interval
+        else:
+            update_interval = self.scan_interval
+
+        if update_interval != self.update_interval:
+            _LOGGER.debug(
+                "Polling interval for %s changed to %s",
+                self.bike_id,
+                update_interval,
+            )
+            self.update_interval = update_interval
+
+    def _derive_metrics(self, data: dict[str, Any]) -> None:
+        """Compute derived values once per snapshot so entities only look them up."""
+        data["battery"]["reachable_range_by_mode"] = self._parse_reachable_range(
+            data["battery"].get("reachable_range_km")
+        )
+        self._update_charge_metrics(data)
+        self._update_battery_health(data)
+        self._update_trips(data)
+
+    def _update_trips(self, data: dict[str, Any]) -> None:
+        """Segment odometer movement into trips."""
+        now = dt_util.utcnow()
+        read_at = _parse_timestamp(data.get("last_update")) or now
+        if self._trips.update(
+            read_at.timestamp(),
+            data["bike"].get("total_distance_m"),
+            data["battery"].get("remaining_wh"),
+        ):
+            self._async_schedule_save()
+        data["trips"] = self._trips.summary(now)
+
+    def get_trips(self, limit: int) -> dict[str, Any]:
+        """Return recent trips and the day/week/month rollups."""
+        return self._trips.query(limit)
+
+    def _update_battery_health(self, data: dict[str, Any]) -> None:
+        """Feed each battery's readings into the health model for its serial."""
+        models = []
+        changed = False
+        for key, battery in data["batteries"].items():
+            model = self._battery_health.get(key)
+            if model is None:
+                model = self._battery_health[key] = BatteryHealthModel()
+            changed |= model.update(
+                battery.get("total_capacity_wh"),
+                battery.get("charge_cycles_total"),
+                battery.get("product_name"),
+            )
+            battery["state_of_health_percent"] = model.state_of_health
+            battery["degradation_per_100_cycles"] = model.degradation_per_100_cycles
+            models.append(model)
+        if changed:
+            self._async_schedule_save()
+
+        battery = data["battery"]
+        if len(models) == 1:
+            battery["state_of_health_percent"] = models[0].state_of_health
+            battery["degradation_per_100_cycles"] = models[0].degradation_per_100_cycles
+            return
+
+        # Bike level: capacity of all packs against their combined rating
+        rated = [
+            model for model in models
+            if model.nominal_wh and model.capacity_wh is not None
+        ]
+        nominal = sum(model.nominal_wh for model in rated)
+        battery["state_of_health_percent"] = (
+            round(min(sum(model.capacity_wh for model in rated) / nominal * 100, 100.0), 1)
+            if rated else None
+        )
+        fading = [
+            (model.degradation_per_100_cycles, model.nominal_wh)
+            for model in rated
+            if model.degradation_per_100_cycles is not None
+        ]
+        battery["degradation_per_100_cycles"] = (
+            round(
+                sum(rate * weight for rate, weight in fading)
+                / sum(weight for _, weight in fading),
+                2,
+            )
+            if fading else None
+        )
+
+    @staticmethod
+    def _parse_reachable_range(reachable_range: Any) -> dict[str, float | None]:
+        """Map the reachableRange array (one value per assist mode) to mode names.
+
+        Values are ordered from the most economical mode; modes beyond the
+        known ASSIST_MODES are named mode_5, mode_6, ...
+        """
+        if not isinstance(reachable_range, list):
+            return {}
+        return {
+            (ASSIST_MODES[index] if index < len(ASSIST_MODES) else f"mode_{index + 1}"): (
+                value if isinstance(value, (int, float)) and not isinstance(value, bool)
+                else None
+            )
+            for index, value in enumerate(reachable_range)
+        }
+
+    def _update_charge_metrics(self, data: dict[str, Any]) -> None:
+        """Record a SoC sample and derive charge rate and time-to-full."""
+        battery = data["battery"]
+        level = battery.get("level_percent")
+        energy = battery.get("remaining_wh")
+        if energy is None:
+            energy = battery.get("remaining_energy_rider_wh")
+
+        # Only a new ConnectModule reading is a new sample - repeated polls of
+        # the same reading would flatten the rate estimate
+        sample_key = (data.get("last_update"), level, energy)
+        if isinstance(level, (int, float)) and sample_key != self._last_sample_key:
+            self._last_sample_key = sample_key
+            sampled_at = _parse_timestamp(data.get("last_update")) or dt_util.utcnow()
+            timestamp = sampled_at.timestamp()
+            energy = energy if isinstance(energy, (int, float)) else None
+            self.samples.append(timestamp, level, energy)
+            if battery.get("is_charging"):
+                self._charge_rate.add(timestamp, level, energy)
+
+        if not battery.get("is_charging"):
+            self._charge_rate.reset()
+
+        percent_per_hour = self._charge_rate.percent_per_hour
+        watts = self._charge_rate.watts
+
+        def _minutes_to(target: float) -> float | None:
+            # The API may send null or a string level
+            if not _is_number(level) or not _is_number(percent_per_hour) or percent_per_hour <= 0:
+                return None
+            return round(max(target - level, 0) / percent_per_hour * 60)
+
+        # Grid energy put into the battery, per session and in total. Each
+        # pack's own readings, so a pack missing from a DualBattery reading
+        # isn't mistaken for energy used - the bike-level battery (with the
+        # live values filled in) stands for a single pack
+        batteries = data["batteries"]
+        packs = list(batteries.values()) if len(batteries) > 1 else [battery]
+        read_at = _parse_timestamp(data.get("last_update")) or dt_util.utcnow()
+        if self._charging.update(
+            read_at.timestamp(),
+            battery.get("is_charging"),
+            level if isinstance(level, (int, float)) else None,
+            [
+                (
+                    pack.get("remaining_wh"),
+                    pack.get("level_percent"),
+                    pack.get("total_capacity_wh"),
+                )
+                for pack in packs
+            ],
+            self.charger_efficiency / 100,
+        ):
+            self._async_schedule_save()
+
+        data["charging"] = {
+            "rate_percent_per_hour": (
+                round(percent_per_hour, 1) if percent_per_hour is not None else None
+            ),
+            "rate_w": round(watts) if watts is not None else None,
+            "time_to_full_min": _minutes_to(100),
+            "time_to_target_min": _minutes_to(self.target_soc),
+            **self._charging.summary(),
+        }
+
+    def _fire_transition_events(self, data: dict[str, Any]) -> None:
+        """Fire a bus event for every transition since the previous snapshot."""
+        for event_type, event_data in detect_transitions(
+            self.data, data, self.target_soc, self._max_distance_m
+        ):
+            _LOGGER.info("%s: %s %s", self.bike_name, event_type, event_data)
+            self.hass.bus.async_fire(
+                event_type,
+                {"bike_id": self.bike_id, "bike_name": self.bike_name, **event_data},
+            )
+        distance = data["bike"].get("total_distance_m")
+        if _is_number(distance) and (
+            self._max_distance_m is None or distance > self._max_distance_m
+        ):
+            self._max_distance_m = distance
+
+    @staticmethod
+    def _get_profile_signature(profile_data: dict[str, Any] | None) -> tuple:
+        """Return the profile fields that change when a bike is used or charged."""
+        bike_attrs = _as_dict(_as_dict(_as_dict(profile_data).get("data")).get("attributes"))
+        batteries_list = bike_attrs.get("batteries")
+        drive_unit = _as_dict(bike_attrs.get("driveUnit"))
+        return (
+            tuple(
+                (
+                    _as_dict(battery).get("batteryLevel"),
+                    _as_dict(battery).get("remainingEnergy"),
+                    _as_dict(_as_dict(battery).get("numberOfFullChargeCycles")).get("total"),
+                )
+                for battery in (batteries_list if isinstance(batteries_list, list) else [])
+            ),
+            drive_unit.get("totalDistanceTraveled"),
+        )
+
+    def _update_activity(self, data: dict[str, Any]) -> None:
+        """Track when the bike last produced new data and hibernate if dormant."""
+        battery = data.get("battery", {})
+        signature = (
+            data.get("last_update"),
+            data.get("bike", {}).get("total_distance_m"),
+            battery.get("level_percent"),
+            battery.get("remaining_wh"),
+        )
+        now = dt_util.utcnow()
+
+        if self._activity_signature is None:
+            # First snapshot - date activity from the ConnectModule's own
+            # timestamp so a bike stored for the winter hibernates right away
+            # after a restart instead of being polled for hibernate_after again
+            last_update = _parse_timestamp(data.get("last_update"))
+            self._last_activity = min(last_update, now) if last_update else now
+        elif signature != self._activity_signature:
+            self._last_activity = now
+        self._activity_signature = signature
+
+        if not self.hibernating and now - self._last_activity >= self.hibernate_after:
+            _LOGGER.info(
+                "No new data from %s since %s, hibernating",
+                self.bike_name,
+                self._last_activity,
+            )
+            self.hibernating = True
+
+    def _wake(self, reason: str) -> None:
+        """Leave hibernation, the next update fetches everything again."""
+        if not self.hibernating:
+            return
+        _LOGGER.info("Waking %s from hibernation: %s", self.bike_name, reason)
+        self.hibernating = False
+        self._last_activity = dt_util.utcnow()
+
+    async def async_wake(self, reason: str) -> None:
+        """Leave hibernation, or resume suspended polling, and refresh straight away."""
+        if self.hibernating:
+            self._wake(reason)
+        elif self.update_interval is None:
+            # Suspended while the charger plug is idle and the bike silent
+            _LOGGER.debug("Resuming polling of %s: %s", self.bike_name, reason)
+            self._polling_resumed = True
+        else:
+            return
+        self.update_interval = self.scan_interval
+        await self.async_request_refresh()
+
+    @callback
+    def async_track_wake_entities(self, entity_ids: list[str] | None) -> None:
+        """Wake when a person, tracker or zone changes state.
+
+        Leaves hibernation, and resumes polling suspended for an idle charger
+        plug - the rider may be about to take the bike out unplugged.
+
+        Replaces any previously tracked entities; None or [] stops tracking.
+        """
+        if self._unsub_wake is not None:
+            self._unsub_wake()
+            self._unsub_wake = None
+        if not entity_ids:
+            return
+
+        @callback
+        def _async_presence_changed(event: Event) -> None:
+            old_state = event.data.get("old_state")
+            new_state = event.data.get("new_state")
+            if (
+                (not self.hibernating and self.update_interval is not None)
+                or old_state is None
+                or new_state is None
+                or old_state.state == new_state.state
+            ):
+                return
+            self.hass.async_create_task(
+                self.async_wake(f"{new_state.entity_id} changed to {new_state.state}")
+            )
+
+        self._unsub_wake = async_track_state_change_event(
+            self.hass, entity_ids, _async_presence_changed
+        )
 
     async def _async_update_data(self) -> dict[str, Any]:
+        """Fetch data from Bosch eBike API and record how the cycle went."""
+        started = time.perf_counter()
+        self._endpoint_ms = {}
+        try:
+            data = await self._async_fetch_data()
+        except Exception as err:
+            self.diagnostics["consecutive_failures"] += 1
+            self.trace.add("update_failed", error=repr(err))
+            raise
+        else:
+            now = dt_util.utcnow()
+            read_at = _parse_timestamp(data.get("last_update"))
+            self.diagnostics["consecutive_failures"] = 0
+            self.diagnostics["last_success"] = now
+            if read_at is not None:
+                self.diagnostics["data_as_of"] = read_at
+            return data
+        finally:
+            self.diagnostics["cycle_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            self.diagnostics["endpoint_ms"] = self._endpoint_ms
+            self.diagnostics["traffic"] = self.api.metrics.totals()
+            if self.executor is not None:
+                self.diagnostics["refresh_queue"] = self.executor.as_dict()
+            with span("diagnostic_sensors"):
+                async_dispatcher_send(self.hass, SIGNAL_DIAGNOSTICS.format(self.bike_id))
+
+    async def _timed(self, endpoint: str, request: Awaitable[_T]) -> _T:
+        """Await an API request, recording its duration for the diagnostics."""
+        started = time.perf_counter()
+        try:
+            with span(endpoint):
+                return await request
+        finally:
+            self._endpoint_ms[endpoint] = round((time.perf_counter() - started) * 1000, 1)
+
+    async def _async_fetch_data(self) -> dict[str, Any]:
         """Fetch data from Bosch eBike API."""
         try:
-            _LOGGER.info(
-                "=== COORDINATOR UPDATE TRIGGERED for bike %s ===", self.bike_id)
+            self.trace.add("update_started")
 
-            # Fetch bike profile (static info + last known battery state)
-            profile_data = await self.api.get_bike_profile(self.bike_id)
+            # Fetch bike profile (static info + last known battery state),
+            # bikes of the same account share one bike list request
+            if self._prefetched_profile is not None:
+                profile_data, self._prefetched_profile = self._prefetched_profile, None
+            else:
+                profile_data = await self._timed(
+                    "bike_profile",
+                    self.api.get_bike_profile(self.bike_id, max_age=PROFILE_BATCH_TTL),
+                )
+
+            profile_signature = self._get_profile_signature(profile_data)
+            if self.hibernating:
+                if profile_signature == self._profile_signature and self.data:
+                    # Cheap probe - nothing moved, keep the previous snapshot
+                    self.trace.add("still_dormant")
+                    return self.data
+                self._wake("profile data changed")
+            self._profile_signature = profile_signature
 
             # Try to fetch live state of charge (only works when bike is online/charging)
             soc_data = None
             try:
-                soc_data = await self.api.get_state_of_charge(self.bike_id)
-                _LOGGER.debug("Got live state-of-charge data")
+                soc_data = await self._timed(
+                    "state_of_charge", self.api.get_state_of_charge(self.bike_id)
+                )
+                self.trace.add("state_of_charge", live=soc_data is not None)
             except BoschEBikeAPIError as err:
                 # This is expected when bike is offline - not an error
-                _LOGGER.debug(
-                    "Live state-of-charge not available (bike offline?): %s", err)
+                self.trace.add("state_of_charge", live=False, error=str(err))
 
             # Combine the data
-            combined_data = self._combine_bike_data(profile_data, soc_data)
+            with span("combine"):
+                combined_data = self._combine_bike_data(profile_data, soc_data)
 
-            _LOGGER.info(
-                "=== COORDINATOR UPDATE COMPLETE: battery=%s%%, charging=%s, charger_connected=%s ===",
-                combined_data.get("battery", {}).get("level_percent"),
-                combined_data.get("battery", {}).get("is_charging"),
-                combined_data.get("battery", {}).get("is_charger_connected"),
+            battery = combined_data["battery"]
+            bike = combined_data["bike"]
+            self.trace.add(
+                "update_complete",
+                battery=battery.get("level_percent"),
+                charging=battery.get("is_charging"),
+                charger_connected=battery.get("is_charger_connected"),
+                is_locked=bike.get("is_locked"),
+                lock_enabled=bike.get("lock_enabled"),
+                alarm_enabled=bike.get("alarm_enabled"),
             )
-
-            # Log lock/alarm status for debugging
-            _LOGGER.info(
-                "Lock status: is_locked=%s, lock_enabled=%s, alarm_enabled=%s",
-                combined_data.get("bike", {}).get("is_locked"),
-                combined_data.get("bike", {}).get("lock_enabled"),
-                combined_data.get("bike", {}).get("alarm_enabled"),
+            _SAMPLED_LOGGER.info(
+                "update_complete",
+                "Updated %s: battery=%s%%, charging=%s, charger_connected=%s",
+                self.bike_name,
+                battery.get("level_percent"),
+                battery.get("is_charging"),
+                battery.get("is_charger_connected"),
             )
 
+            with span("derive_metrics"):
+                self._derive_metrics(combined_data)
+            with span("events"):
+                self._fire_transition_events(combined_data)
+            with span("statistics"):
+                if self.export_statistics and self._statistics.async_add(combined_data):
+                    self._async_schedule_save()
+            self._update_activity(combined_data)
+            self._update_polling(combined_data)
+
             return combined_data
 
         except BoschEBikeAPIError as err:
@@ -86,33 +932,32 @@ class BoschEBikeDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         soc_data: dict[str, Any] | None,
     ) -> dict[str, Any]:
         """Combine bike profile and state-of-charge data."""
+        if not isinstance(profile_data, dict):
+            # get_bike_profile returns None on 404
+            raise UpdateFailed("Bike profile not available")
+
         try:
             # Extract from profile
-            bike_attrs = profile_data.get("data", {}).get("attributes", {})
-            batteries_list = bike_attrs.get("batteries") or []
-            battery = batteries_list[0] if batteries_list else {}
-            # Use 'or {}' to handle None values (API may return null for optional fields)
-            drive_unit = bike_attrs.get("driveUnit") or {}
-            connected_module = bike_attrs.get("connectedModule") or {}
-            remote_control = bike_attrs.get("remoteControl") or {}
+            bike_attrs = _as_dict(_as_dict(profile_data.get("data")).get("attributes"))
+            batteries = _index_batteries(bike_attrs.get("batteries"))
+            battery = _aggregate_batteries(batteries)
+            primary_battery = next(iter(batteries.values()), {})
+            # Use _as_dict to handle None values (API may return null for optional fields)
+            drive_unit = _as_dict(bike_attrs.get("driveUnit"))
+            lock = _as_dict(drive_unit.get("lock"))
+            connected_module = _as_dict(bike_attrs.get("connectedModule"))
+            remote_control = _as_dict(bike_attrs.get("remoteControl"))
+            soc_data = _as_dict(soc_data)
 
             # Start with profile data
             combined = {
-                "battery": {
-                    "level_percent": battery.get("batteryLevel"),
-                    "remaining_wh": battery.get("remainingEnergy"),
-                    "total_capacity_wh": battery.get("totalEnergy"),
-                    "is_charging": battery.get("isCharging"),
-                    "is_charger_connected": battery.get("isChargerConnected"),
-                    "charge_cycles_total": (battery.get("numberOfFullChargeCycles") or {}).get("total"),
-                    "delivered_lifetime_wh": battery.get("deliveredWhOverLifetime"),
-                    "product_name": battery.get("productName"),
-                    "software_version": battery.get("softwareVersion"),
-                },
+                # Bike-level totals; per-battery readings are under "batteries"
+                "battery": battery,
+                "batteries": batteries,
                 "bike": {
                     "total_distance_m": drive_unit.get("totalDistanceTraveled"),
-                    "is_locked": (drive_unit.get("lock") or {}).get("isLocked"),
-                    "lock_enabled": (drive_unit.get("lock") or {}).get("isEnabled"),
+                    "is_locked": lock.get("isLocked"),
+                    "lock_enabled": lock.get("isEnabled"),
                     "alarm_enabled": connected_module.get("isAlarmFeatureEnabled"),
                 },
                 "components": {
@@ -122,9 +967,9 @@ class BoschEBikeDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
                         "serial_number": drive_unit.get("serialNumber"),
                     },
                     "battery": {
-                        "product_name": battery.get("productName"),
-                        "software_version": battery.get("softwareVersion"),
-                        "serial_number": battery.get("serialNumber"),
+                        "product_name": primary_battery.get("product_name"),
+                        "software_version": primary_battery.get("software_version"),
+                        "serial_number": primary_battery.get("serial_number"),
                     },
                     "connected_module": {
                         "product_name": connected_module.get("productName"),
@@ -162,8 +1007,7 @@ class BoschEBikeDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
 
                 # Add live-only data
                 reachable_range_raw = soc_data.get("reachableRange")
-                _LOGGER.debug("Reachable range raw data: %s (type: %s)",
-                              reachable_range_raw, type(reachable_range_raw))
+                self.trace.add("reachable_range", raw=reachable_range_raw)
                 combined["battery"]["reachable_range_km"] = reachable_range_raw
                 combined["battery"]["remaining_energy_rider_wh"] = soc_data.get(
                     "remainingEnergyForRider")
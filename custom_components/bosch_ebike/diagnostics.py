@@ -0,0 +1,64 @@
+"""Diagnostics support for the Bosch eBike integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_ACCESS_TOKEN
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_REFRESH_TOKEN, DOMAIN
+from .executor import async_get_executor
+
+TO_REDACT = {
+    CONF_ACCESS_TOKEN,
+    CONF_REFRESH_TOKEN,
+    "unique_id",
+    "serial_number",
+    "frame_number",
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry.
+
+    Besides the redacted entry and the latest data and SoC samples of each
+    bike, this holds the update pipeline health, the request metrics of the
+    account, the shared refresh executor's queue and the last report of the
+    profile service.
+    """
+    diagnostics: dict[str, Any] = {"entry": async_redact_data(entry.as_dict(), TO_REDACT)}
+    entry_data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if entry_data is None:
+        return diagnostics
+
+    diagnostics["api_mode"] = entry_data["api_mode"]
+    diagnostics["requests"] = entry_data["api"].metrics.endpoints
+    diagnostics["refresh_executor"] = async_get_executor(hass).as_dict()
+    diagnostics["bikes"] = {
+        bike_id: {
+            "data": _redact_bike_data(coordinator.data or {}),
+            "update": coordinator.diagnostics,
+            "profile": coordinator.profiler.last_report,
+            # (timestamp, SoC %, remaining Wh) of the last 24 hours' readings
+            "soc_samples": list(coordinator.samples),
+        }
+        for bike_id, coordinator in entry_data["coordinators"].items()
+    }
+    return diagnostics
+
+
+def _redact_bike_data(data: dict[str, Any]) -> dict[str, Any]:
+    """Redact a bike's data, including the serials that key its batteries."""
+    if isinstance(data.get("batteries"), dict):
+        data = {
+            **data,
+            "batteries": {
+                f"battery_{position}": battery
+                for position, battery in enumerate(data["batteries"].values(), 1)
+            },
+        }
+    return async_redact_data(data, TO_REDACT)
@@ -0,0 +1,74 @@
+"""Discovery of bikes added to a Bosch account after it was set up."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import logging
+
+from homeassistant.config_entries import (
+    SOURCE_IGNORE,
+    SOURCE_INTEGRATION_DISCOVERY,
+    ConfigEntry,
+)
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import discovery_flow
+from homeassistant.helpers.event import async_track_time_interval
+
+from .api import BoschEBikeAPI, BoschEBikeAPIError
+from .const import (
+    BIKES_CACHE_TTL,
+    CONF_BIKE_ID,
+    CONF_BIKES,
+    CONF_SOURCE_ENTRY_ID,
+    DISCOVERY_INTERVAL,
+    DOMAIN,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_discover_bikes(
+    hass: HomeAssistant, entry: ConfigEntry, api: BoschEBikeAPI
+) -> None:
+    """Start a discovery flow for each bike on the account not yet configured.
+
+    Uses the client's cached bike list, so a check costs at most one request
+    per BIKES_CACHE_TTL.
+    """
+    try:
+        bikes = await api.get_bikes(max_age=BIKES_CACHE_TTL)
+    except BoschEBikeAPIError as err:
+        _LOGGER.debug("Bike discovery skipped: %s", err)
+        return
+
+    configured: set[str] = set()
+    for config_entry in hass.config_entries.async_entries(DOMAIN):
+        configured.update(config_entry.data.get(CONF_BIKES, {}))
+        if config_entry.source == SOURCE_IGNORE and config_entry.unique_id:
+            # A discovered bike the user chose to ignore
+            configured.add(config_entry.unique_id)
+    for bike in bikes:
+        bike_id = bike.get("id")
+        if not bike_id or bike_id in configured:
+            continue
+        _LOGGER.debug("Discovered new bike %s on the account of %s", bike_id, entry.title)
+        # The flow aborts itself if one is already in progress for the bike
+        discovery_flow.async_create_flow(
+            hass,
+            DOMAIN,
+            context={"source": SOURCE_INTEGRATION_DISCOVERY},
+            data={CONF_BIKE_ID: bike_id, CONF_SOURCE_ENTRY_ID: entry.entry_id},
+        )
+
+
+@callback
+def async_setup_discovery(
+    hass: HomeAssistant, entry: ConfigEntry, api: BoschEBikeAPI
+) -> CALLBACK_TYPE:
+    """Check the account for new bikes every DISCOVERY_INTERVAL."""
+
+    async def _async_discover(now: datetime) -> None:
+        await async_discover_bikes(hass, entry, api)
+
+    return async_track_time_interval(
+        hass, _async_discover, timedelta(seconds=DISCOVERY_INTERVAL)
+    )
@@ -0,0 +1,101 @@
+"""Transition detection between consecutive Bosch eBike snapshots."""
+from __future__ import annotations
+
+from typing import Any
+
+from .const import (
+    EVENT_CHARGER_CONNECTED,
+    EVENT_CHARGING_STARTED,
+    EVENT_CHARGING_STOPPED,
+    EVENT_FIRMWARE_CHANGED,
+    EVENT_RIDE_DETECTED,
+    EVENT_TARGET_SOC_REACHED,
+    RIDE_MIN_DISTANCE,
+)
+
+
+def _number(value: Any) -> float | None:
+    """Return value if it is numeric (the API may send null or strings)."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    return None
+
+
+def detect_transitions(
+    previous: dict[str, Any] | None,
+    current: dict[str, Any],
+    target_soc: float,
+    max_distance_m: float | None = None,
+) -> list[tuple[str, dict[str, Any]]]:
+    """Compare two combined snapshots and return (event_type, event_data) pairs.
+
+    A value going from None to something is not a transition - that is what
+    a restart or a bike coming back online looks like. Rides are measured
+    from max_distance_m, the highest odometer seen before, when it is above
+    the previous snapshot's - the live and profile odometers may disagree,
+    and going back to the higher one is not a ride.
+    """
+    if not previous:
+        return []
+
+    transitions: list[tuple[str, dict[str, Any]]] = []
+    old_battery = previous.get("battery", {})
+    new_battery = current.get("battery", {})
+    level = _number(new_battery.get("level_percent"))
+
+    old_charging = old_battery.get("is_charging")
+    new_charging = new_battery.get("is_charging")
+    if old_charging is not None and new_charging is not None:
+        if new_charging and not old_charging:
+            transitions.append((EVENT_CHARGING_STARTED, {"battery_level": level}))
+        elif old_charging and not new_charging:
+            transitions.append((EVENT_CHARGING_STOPPED, {"battery_level": level}))
+
+    old_level = _number(old_battery.get("level_percent"))
+    if old_level is not None and level is not None and old_level < target_soc <= level:
+        transitions.append(
+            (EVENT_TARGET_SOC_REACHED, {"battery_level": level, "target_soc": target_soc})
+        )
+
+    if (
+        old_battery.get("is_charger_connected") is False
+        and new_battery.get("is_charger_connected") is True
+    ):
+        transitions.append((EVENT_CHARGER_CONNECTED, {"battery_level": level}))
+
+    old_distance = _number(previous.get("bike", {}).get("total_distance_m"))
+    if old_distance is not None and _number(max_distance_m) is not None:
+        old_distance = max(old_distance, max_distance_m)
+    new_distance = _number(current.get("bike", {}).get("total_distance_m"))
+    if (
+        old_distance is not None
+        and new_distance is not None
+        and new_distance - old_distance >= RIDE_MIN_DISTANCE
+    ):
+        transitions.append(
+            (
+                EVENT_RIDE_DETECTED,
+                {
+                    "distance_m": new_distance - old_distance,
+                    "total_distance_m": new_distance,
+                },
+            )
+        )
+
+    old_components = previous.get("components", {})
+    for component, info in current.get("components", {}).items():
+        old_version = old_components.get(component, {}).get("software_version")
+        new_version = info.get("software_version")
+        if old_version is not None and new_version is not None and old_version != new_version:
+            transitions.append(
+                (
+                    EVENT_FIRMWARE_CHANGED,
+                    {
+                        "component": component,
+                        "previous_version": old_version,
+                        "software_version": new_version,
+                    },
+                )
+            )
+
+    return transitions
@@ -0,0 +1,132 @@
+"""Shared executor bounding concurrent bike refreshes.
+
+Every coordinator runs its refreshes in a slot of the one RefreshExecutor
+of the integration, so a restart or reload with many bikes doesn't send
+every bike's requests at once. Waiting refreshes are granted a slot one
+bike at a time in turn, so a bike refreshed over and over can't hold up
+the others. Priority refreshes (requested by the user) skip the turns and
+get the next free slot.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict, deque
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_EXECUTOR, DEFAULT_MAX_CONCURRENT_REFRESHES
+
+
+class RefreshExecutor:
+    """Limits the refreshes running at once across all bikes."""
+
+    def __init__(self, limit: int = DEFAULT_MAX_CONCURRENT_REFRESHES) -> None:
+        """Initialize the executor."""
+        self.limit = limit
+        self._running = 0
+        # bike_id -> waiting refreshes, in the order bikes get their turn
+        self._queues: OrderedDict[str, deque[asyncio.Future[None]]] = OrderedDict()
+        # Priority refreshes, granted before any bike's turn
+        self._priority: deque[asyncio.Future[None]] = deque()
+        self.stats: dict[str, Any] = {
+            "refreshes": 0,
+            "queued": 0,
+            "max_queue_depth": 0,
+            "total_wait_ms": 0.0,
+            "max_wait_ms": 0.0,
+        }
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of refreshes waiting for a slot."""
+        return len(self._priority) + sum(len(queue) for queue in self._queues.values())
+
+    def set_limit(self, limit: int) -> None:
+        """Change the limit, starting waiting refreshes if it was raised."""
+        self.limit = limit
+        while self._running < self.limit and self._grant_next():
+            self._running += 1
+
+    async def acquire(self, bike_id: str, priority: bool = False) -> float:
+        """Wait for a slot for a refresh of bike_id, returning the seconds waited.
+
+        A priority refresh waits only for a slot to free up, ahead of the
+        bikes waiting their turn. Every acquire must be followed by a release.
+        """
+        self.stats["refreshes"] += 1
+        if self._running < self.limit and not self._queues and not self._priority:
+            self._running += 1
+            return 0.0
+
+        started = time.monotonic()
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        if priority:
+            self._priority.append(future)
+        else:
+            self._queues.setdefault(bike_id, deque()).append(future)
+        self.stats["queued"] += 1
+        self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], self.queue_depth)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just before the cancellation - pass the slot on
+                self.release()
+            elif future in self._priority:
+                self._priority.remove(future)
+            elif (queue := self._queues.get(bike_id)) is not None and future in queue:
+                queue.remove(future)
+                if not queue:
+                    del self._queues[bike_id]
+            raise
+
+        waited = time.monotonic() - started
+        self.stats["total_wait_ms"] += waited * 1000
+        self.stats["max_wait_ms"] = max(self.stats["max_wait_ms"], round(waited * 1000, 1))
+        return waited
+
+    def release(self) -> None:
+        """Free a slot, handing it to the next bike in turn if any is waiting."""
+        if self._running <= self.limit and self._grant_next():
+            return
+        self._running -= 1
+
+    def _grant_next(self) -> bool:
+        """Wake the oldest priority refresh, or that of the bike whose turn it is."""
+        while self._priority:
+            future = self._priority.popleft()
+            if not future.done():
+                future.set_result(None)
+                return True
+        while self._queues:
+            bike_id, queue = next(iter(self._queues.items()))
+            future = queue.popleft()
+            if queue:
+                self._queues.move_to_end(bike_id)
+            else:
+                del self._queues[bike_id]
+            if not future.done():
+                future.set_result(None)
+                return True
+        return False
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the executor's state and counters."""
+        queued = self.stats["queued"]
+        return {
+            "limit": self.limit,
+            "running": self._running,
+            "queue_depth": self.queue_depth,
+            **self.stats,
+            "avg_wait_ms": round(self.stats["total_wait_ms"] / queued, 1) if queued else 0.0,
+        }
+
+
+@callback
+def async_get_executor(hass: HomeAssistant) -> RefreshExecutor:
+    """Return the integration's refresh executor, creating it on first use."""
+    if (executor := hass.data.get(DATA_EXECUTOR)) is None:
+        executor = hass.data[DATA_EXECUTOR] = RefreshExecutor()
+    return executor
@@ -0,0 +1,174 @@
+"""Long-term statistics for slow-moving Bosch eBike counters.
+
+Odometer, lifetime energy and charge cycles change a few times a day at most,
+yet charting them over months from state history makes the recorder store and
+compact every state write. Instead, the last value seen in each hour is kept
+in a small persisted buffer and completed hours are imported in batches as
+external statistics.
+"""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable
+from datetime import datetime
+import logging
+from typing import Any
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.const import UnitOfEnergy, UnitOfLength
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# Two weeks of hourly rows - also the longest gap that gets backfilled
+HOURLY_BUFFER_SIZE = 24 * 14
+
+HOUR = 3600
+
+
+def _scaled(section: str, key: str, factor: float) -> Callable[[dict[str, Any]], float | None]:
+    """Return a getter for a numeric snapshot value, scaled by factor."""
+
+    def _get(data: dict[str, Any]) -> float | None:
+        value = data.get(section, {}).get(key)
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            return None
+        return round(value * factor, 3)
+
+    return _get
+
+
+# (statistic suffix, name suffix, unit, getter)
+SERIES: tuple[tuple[str, str, str | None, Callable[[dict[str, Any]], float | None]], ...] = (
+    ("odometer", "Odometer", UnitOfLength.KILOMETERS, _scaled("bike", "total_distance_m", 0.001)),
+    (
+        "lifetime_energy_delivered",
+        "Lifetime Energy Delivered",
+        UnitOfEnergy.KILO_WATT_HOUR,
+        _scaled("battery", "delivered_lifetime_wh", 0.001),
+    ),
+    ("charge_cycles", "Charge Cycles", None, _scaled("battery", "charge_cycles_total", 1)),
+)
+
+
+class ExternalStatistics:
+    """Hourly buffer of counter values, exported as external statistics."""
+
+    def __init__(self, hass: HomeAssistant, bike_id: str, bike_name: str) -> None:
+        """Initialize the buffer."""
+        self._hass = hass
+        self._bike_id = bike_id
+        self._bike_name = bike_name
+        # [hour start timestamp, value per SERIES entry]
+        self._hours: deque[list[float | None]] = deque(maxlen=HOURLY_BUFFER_SIZE)
+        self._exported_until: float | None = None  # last exported hour start
+
+    def load(self, stored: dict[str, Any] | None) -> None:
+        """Restore the buffer from storage."""
+        if not stored:
+            return
+        self._hours.extend(stored.get("hours", []))
+        self._exported_until = stored.get("exported_until")
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the buffer in storage form."""
+        return {
+            "hours": list(self._hours),
+            "exported_until": self._exported_until,
+        }
+
+    @callback
+    def async_add(self, data: dict[str, Any], now: datetime | None = None) -> bool:
+        """Record a snapshot, exporting any hours completed since the last one.
+
+        Returns True if the buffer changed and should be saved.
+        """
+        hour = float(int((now or dt_util.utcnow()).timestamp()) // HOUR * HOUR)
+        values = [getter(data) for _, _, _, getter in SERIES]
+        if all(value is None for value in values):
+            return False
+
+        if self._hours and self._hours[-1][0] == hour:
+            row = self._hours[-1]
+            if all(value is None or row[index + 1] == value for index, value in enumerate(values)):
+                return False
+            for index, value in enumerate(values):
+                if value is not None:
+                    row[index + 1] = value
+        else:
+            self._hours.append([hour, *values])
+
+        self.async_export(hour)
+        return True
+
+    @callback
+    def async_export(self, current_hour: float) -> None:
+        """Import every completed hour not exported yet, in one batch per series.
+
+        Hours without a row (HA was down, or the bike hibernated) are filled
+        with the last known value so long-range charts stay continuous.
+        """
+        if "recorder" not in self._hass.config.components or not self._hours:
+            return
+
+        first_hour = self._hours[0][0]
+        start = first_hour if self._exported_until is None else max(
+            first_hour, self._exported_until + HOUR
+        )
+        end = current_hour - HOUR  # current hour is still open
+        if start > end:
+            return
+
+        rows = {row[0]: row for row in self._hours}
+        # Carry forward from the newest row before the export window
+        last: list[float | None] = [None] * len(SERIES)
+        for row in self._hours:
+            if row[0] >= start:
+                break
+            for index, value in enumerate(row[1:]):
+                if value is not None:
+                    last[index] = value
+
+        points: list[list[StatisticData]] = [[] for _ in SERIES]
+        hour = start
+        while hour <= end:
+            if row := rows.get(hour):
+                for index, value in enumerate(row[1:]):
+                    if value is not None:
+                        last[index] = value
+            start_dt = dt_util.utc_from_timestamp(hour)
+            for index, value in enumerate(last):
+                if value is not None:
+                    # Counters only grow, so the value itself is the running sum
+                    points[index].append(
+                        StatisticData(start=start_dt, state=value, sum=value)
+                    )
+            hour += HOUR
+
+        object_id = slugify(self._bike_id)
+        for (suffix, name, unit, _), statistics in zip(SERIES, points):
+            if not statistics:
+                continue
+            async_add_external_statistics(
+                self._hass,
+                StatisticMetaData(
+                    has_mean=False,
+                    has_sum=True,
+                    name=f"{self._bike_name} {name}",
+                    source=DOMAIN,
+                    statistic_id=f"{DOMAIN}:{object_id}_{suffix}",
+                    unit_of_measurement=unit,
+                ),
+                statistics,
+            )
+
+        _LOGGER.debug(
+            "Exported %d hour(s) of statistics for %s",
+            int((end - start) // HOUR) + 1,
+            self._bike_id,
+        )
+        self._exported_until = end
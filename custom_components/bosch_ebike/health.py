@@ -0,0 +1,119 @@
+"""Battery health (capacity fade) model for Bosch eBike batteries."""
+from __future__ import annotations
+
+import re
+from typing import Any
+
+# Bosch battery product names carry the nominal capacity, e.g. "PowerTube 625"
+_NOMINAL_CAPACITY_RE = re.compile(r"\b(\d{3,4})\b")
+
+
+class BatteryHealthModel:
+    """Capacity-vs-cycles model for one battery pack.
+
+    Each time the full charge cycle count moves, the reported capacity is
+    added to a running least-squares fit of capacity against cycles, so the
+    degradation rate is available without keeping (or scanning) any history.
+    The whole model is a handful of numbers, which is what gets persisted.
+    """
+
+    __slots__ = (
+        "nominal_wh",
+        "capacity_wh",
+        "cycles",
+        "_n",
+        "_sx",
+        "_sy",
+        "_sxx",
+        "_sxy",
+    )
+
+    def __init__(self) -> None:
+        """Initialize an empty model."""
+        self.nominal_wh: float | None = None
+        self.capacity_wh: float | None = None
+        self.cycles: float | None = None
+        self._n = 0
+        self._sx = self._sy = self._sxx = self._sxy = 0.0
+
+    @staticmethod
+    def nominal_from_product_name(product_name: Any) -> float | None:
+        """Return the nominal capacity encoded in a battery product name.
+
+        None (unknown) unless the API sent a name string with a capacity.
+        """
+        if not isinstance(product_name, str):
+            return None
+        match = _NOMINAL_CAPACITY_RE.search(product_name)
+        return float(match.group(1)) if match else None
+
+    def update(
+        self,
+        capacity_wh: float | None,
+        cycles: float | None,
+        product_name: Any = None,
+    ) -> bool:
+        """Feed the latest battery readings, returning True if the model changed."""
+        if not isinstance(capacity_wh, (int, float)) or not isinstance(cycles, (int, float)):
+            return False
+
+        rated_wh = self.nominal_from_product_name(product_name)
+        if rated_wh is not None:
+            self.nominal_wh = rated_wh
+        elif self.nominal_wh is None or capacity_wh > self.nominal_wh:
+            # Without a rating, the best capacity ever reported is the reference
+            self.nominal_wh = float(capacity_wh)
+
+        if cycles == self.cycles and capacity_wh == self.capacity_wh:
+            return False
+
+        # One fit point per cycle count
+        if cycles != self.cycles:
+            self._n += 1
+            self._sx += cycles
+            self._sy += capacity_wh
+            self._sxx += cycles * cycles
+            self._sxy += cycles * capacity_wh
+
+        self.cycles = float(cycles)
+        self.capacity_wh = float(capacity_wh)
+        return True
+
+    @property
+    def state_of_health(self) -> float | None:
+        """Return current capacity as a percentage of nominal."""
+        if not self.nominal_wh or self.capacity_wh is None:
+            return None
+        return round(min(self.capacity_wh / self.nominal_wh * 100, 100.0), 1)
+
+    @property
+    def degradation_per_100_cycles(self) -> float | None:
+        """Return the capacity lost per 100 cycles, as a percentage of nominal."""
+        if self._n < 2 or not self.nominal_wh:
+            return None
+        denominator = self._n * self._sxx - self._sx * self._sx
+        if denominator <= 0:
+            return None
+        slope = (self._n * self._sxy - self._sx * self._sy) / denominator  # Wh/cycle
+        return round(-slope / self.nominal_wh * 100 * 100, 2)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the model in its compact storage form."""
+        return {
+            "nominal_wh": self.nominal_wh,
+            "capacity_wh": self.capacity_wh,
+            "cycles": self.cycles,
+            "fit": [self._n, self._sx, self._sy, self._sxx, self._sxy],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> BatteryHealthModel:
+        """Restore a model from its storage form."""
+        model = cls()
+        model.nominal_wh = data.get("nominal_wh")
+        model.capacity_wh = data.get("capacity_wh")
+        model.cycles = data.get("cycles")
+        model._n, model._sx, model._sy, model._sxx, model._sxy = data.get(
+            "fit", [0, 0.0, 0.0, 0.0, 0.0]
+        )
+        return model
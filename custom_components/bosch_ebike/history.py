@@ -0,0 +1,141 @@
+"""In-memory state-of-charge history and charge rate estimation."""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterator
+import math
+
+# 24 hours of samples at the 5 minute poll interval
+SAMPLE_BUFFER_SIZE = 288
+
+# Weight kept by older samples each time a new one arrives - low enough to
+# follow the slow-down near full charge, high enough to smooth integer SoC steps
+CHARGE_RATE_FORGETTING = 0.8
+
+
+class SampleBuffer:
+    """Fixed-size ring buffer of (timestamp, soc %, energy Wh) samples.
+
+    Backed by three flat float arrays rather than a list of tuples, so a full
+    buffer costs 24 bytes per sample. Missing energy values are stored as NaN.
+    """
+
+    __slots__ = ("_size", "_timestamps", "_soc", "_energy", "_head", "_count")
+
+    def __init__(self, size: int = SAMPLE_BUFFER_SIZE) -> None:
+        """Initialize an empty buffer."""
+        self._size = size
+        self._timestamps = array("d", bytes(8 * size))
+        self._soc = array("d", bytes(8 * size))
+        self._energy = array("d", bytes(8 * size))
+        self._head = 0  # next slot to write
+        self._count = 0
+
+    def __len__(self) -> int:
+        """Return the number of samples held."""
+        return self._count
+
+    def __iter__(self) -> Iterator[tuple[float, float, float | None]]:
+        """Iterate over samples from oldest to newest."""
+        start = (self._head - self._count) % self._size
+        for offset in range(self._count):
+            index = (start + offset) % self._size
+            energy = self._energy[index]
+            yield (
+                self._timestamps[index],
+                self._soc[index],
+                None if math.isnan(energy) else energy,
+            )
+
+    def append(self, timestamp: float, soc: float, energy: float | None) -> None:
+        """Add a sample, overwriting the oldest once the buffer is full."""
+        self._timestamps[self._head] = timestamp
+        self._soc[self._head] = soc
+        self._energy[self._head] = math.nan if energy is None else energy
+        self._head = (self._head + 1) % self._size
+        self._count = min(self._count + 1, self._size)
+
+    @property
+    def latest(self) -> tuple[float, float, float | None] | None:
+        """Return the newest sample."""
+        if not self._count:
+            return None
+        index = (self._head - 1) % self._size
+        energy = self._energy[index]
+        return (
+            self._timestamps[index],
+            self._soc[index],
+            None if math.isnan(energy) else energy,
+        )
+
+
+class _WeightedRegression:
+    """Recursive exponentially weighted least-squares fit of y against x."""
+
+    __slots__ = ("_forgetting", "_w", "_x", "_y", "_xx", "_xy", "count")
+
+    def __init__(self, forgetting: float) -> None:
+        self._forgetting = forgetting
+        self.reset()
+
+    def reset(self) -> None:
+        self._w = self._x = self._y = self._xx = self._xy = 0.0
+        self.count = 0
+
+    def add(self, x: float, y: float) -> None:
+        decay = self._forgetting
+        self._w = self._w * decay + 1.0
+        self._x = self._x * decay + x
+        self._y = self._y * decay + y
+        self._xx = self._xx * decay + x * x
+        self._xy = self._xy * decay + x * y
+        self.count += 1
+
+    @property
+    def slope(self) -> float | None:
+        if self.count < 2:
+            return None
+        denominator = self._w * self._xx - self._x * self._x
+        if denominator <= 0:
+            return None
+        return (self._w * self._xy - self._x * self._y) / denominator
+
+
+class ChargeRateEstimator:
+    """Online estimate of the charge rate during a charging session.
+
+    Each sample updates running sums in O(1); nothing is recomputed from the
+    sample history. Times are taken relative to the first sample of the
+    session to keep the sums well conditioned.
+    """
+
+    def __init__(self, forgetting: float = CHARGE_RATE_FORGETTING) -> None:
+        """Initialize the estimator."""
+        self._soc = _WeightedRegression(forgetting)
+        self._energy = _WeightedRegression(forgetting)
+        self._origin: float | None = None
+
+    def reset(self) -> None:
+        """Forget the current session."""
+        self._soc.reset()
+        self._energy.reset()
+        self._origin = None
+
+    def add(self, timestamp: float, soc: float, energy: float | None) -> None:
+        """Add a sample (timestamp in seconds)."""
+        if self._origin is None:
+            self._origin = timestamp
+        hours = (timestamp - self._origin) / 3600
+        self._soc.add(hours, soc)
+        if energy is not None:
+            self._energy.add(hours, energy)
+
+    @property
+    def percent_per_hour(self) -> float | None:
+        """Return the charge rate in %/h."""
+        return self._soc.slope
+
+    @property
+    def watts(self) -> float | None:
+        """Return the charge rate in W (Wh per hour)."""
+        return self._energy.slope
@@ -0,0 +1,338 @@
+"""Request middleware for the Bosch eBike API client.
+
+A middleware is an async callable taking the request and the next handler
+of the chain. BoschEBikeAPI sends every API request through a chain of them
+(cache, metrics, record/replay, retry, rate limit, auth) ending in the HTTP
+transport, so each concern can be reordered, left out or benchmarked on its
+own. The transport never raises for a status - middlewares see the status
+and the client maps it to a result or an error at the end.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+from functools import partial
+import logging
+import random
+import time
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+
+from .const import (
+    PAYLOAD_GROWTH_FACTOR,
+    REQUEST_BURST,
+    REQUEST_RATE,
+    REQUEST_RETRIES,
+    REQUEST_RETRY_BACKOFF,
+)
+from .profiler import span
+from .recording import ApiRecorder, ApiReplayer
+
+if TYPE_CHECKING:
+    from .api import BoschEBikeAPI
+
+_LOGGER = logging.getLogger(__name__)
+
+# Statuses worth another attempt - the request itself was fine
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+@dataclass
+class ApiRequest:
+    """One API request, across all of its attempts."""
+
+    method: str
+    endpoint: str
+    deadline: float  # time.monotonic() by which the request must be answered
+    max_age: float = 0  # seconds a cached response may be old; 0 always fetches
+    headers: dict[str, str] = field(default_factory=dict)
+    kwargs: dict[str, Any] = field(default_factory=dict)
+
+    def remaining(self) -> float:
+        """Return the seconds left of the request's budget."""
+        return self.deadline - time.monotonic()
+
+
+@dataclass
+class ApiResponse:
+    """Status and decoded body of a response (body is None for errors)."""
+
+    status: int
+    body: Any = None
+    body_bytes: int = 0  # size of the decompressed body
+    wire_bytes: int | None = None  # size as transferred, None if unknown
+
+
+Handler = Callable[[ApiRequest], Awaitable[ApiResponse]]
+Middleware = Callable[[ApiRequest, Handler], Awaitable[ApiResponse]]
+
+
+def build_chain(middlewares: Sequence[Middleware], handler: Handler) -> Handler:
+    """Wrap handler in middlewares, the first one outermost."""
+    for middleware in reversed(middlewares):
+        handler = partial(middleware, call_next=handler)
+    return handler
+
+
+class CacheMiddleware:
+    """Serves GET responses that are at most request.max_age seconds old.
+
+    Only endpoints ever requested with max_age (the bike list) are cached.
+    Their successful responses are stored even for requests without max_age,
+    so those refresh the cache for later ones. Concurrent requests for the
+    same endpoint with max_age share one fetch.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the cache."""
+        self._entries: dict[str, tuple[float, ApiResponse]] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    async def __call__(self, request: ApiRequest, call_next: Handler) -> ApiResponse:
+        """Answer from the cache, or fetch and store."""
+        if request.method != "GET":
+            return await call_next(request)
+        if request.max_age <= 0:
+            response = await call_next(request)
+            if request.endpoint in self._locks:
+                # Read with max_age elsewhere - keep it fresh for those reads
+                self._store(request.endpoint, response)
+            return response
+
+        async with self._locks.setdefault(request.endpoint, asyncio.Lock()):
+            entry = self._entries.get(request.endpoint)
+            if entry is not None and time.monotonic() - entry[0] < request.max_age:
+                return entry[1]
+            return self._store(request.endpoint, await call_next(request))
+
+    def _store(self, endpoint: str, response: ApiResponse) -> ApiResponse:
+        if response.status < 300:
+            self._entries[endpoint] = (time.monotonic(), response)
+        return response
+
+
+class MetricsMiddleware:
+    """Counts requests, failures, time spent and bytes received per endpoint.
+
+    An endpoint whose average response size grows past PAYLOAD_GROWTH_FACTOR
+    times its first response is flagged as growing.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.endpoints: dict[str, dict[str, Any]] = {}
+
+    async def __call__(self, request: ApiRequest, call_next: Handler) -> ApiResponse:
+        """Time the request and count its bytes."""
+        stats = self.endpoints.setdefault(
+            request.endpoint,
+            {
+                "requests": 0,
+                "failures": 0,
+                "total_ms": 0.0,
+                "last_ms": 0.0,
+                "wire_bytes": 0,
+                "body_bytes": 0,
+                "first_body_bytes": 0,
+                "avg_body_bytes": 0.0,
+                "growing": False,
+            },
+        )
+        started = time.monotonic()
+        failed = True
+        try:
+            response = await call_next(request)
+            # A 404 is an answer (an offline bike), not a failure
+            failed = response.status >= 400 and response.status != 404
+            if response.body_bytes:
+                self._count_bytes(request.endpoint, stats, response)
+            return response
+        finally:
+            elapsed = (time.monotonic() - started) * 1000
+            stats["requests"] += 1
+            stats["failures"] += failed
+            stats["total_ms"] += elapsed
+            stats["last_ms"] = round(elapsed, 1)
+
+    @staticmethod
+    def _count_bytes(endpoint: str, stats: dict[str, Any], response: ApiResponse) -> None:
+        stats["body_bytes"] += response.body_bytes
+        # Unknown for compressed responses sent without Content-Length
+        if response.wire_bytes is not None:
+            stats["wire_bytes"] += response.wire_bytes
+        if not stats["first_body_bytes"]:
+            stats["first_body_bytes"] = stats["avg_body_bytes"] = response.body_bytes
+            return
+
+        # Slow moving average, so one large response doesn't count as growth
+        stats["avg_body_bytes"] += 0.1 * (response.body_bytes - stats["avg_body_bytes"])
+        growing = stats["avg_body_bytes"] > stats["first_body_bytes"] * PAYLOAD_GROWTH_FACTOR
+        if growing and not stats["growing"]:
+            _LOGGER.warning(
+                "Responses of %s grew from %d to %d bytes on average",
+                endpoint,
+                stats["first_body_bytes"],
+                stats["avg_body_bytes"],
+            )
+        stats["growing"] = growing
+
+    def totals(self) -> dict[str, Any]:
+        """Return the bytes received over all endpoints, and the growing ones."""
+        return {
+            "wire_bytes": sum(stats["wire_bytes"] for stats in self.endpoints.values()),
+            "body_bytes": sum(stats["body_bytes"] for stats in self.endpoints.values()),
+            "growing": sorted(
+                endpoint for endpoint, stats in self.endpoints.items() if stats["growing"]
+            ),
+        }
+
+
+class RecordReplayMiddleware:
+    """Records responses to disk, or serves recorded ones instead.
+
+    While replaying, nothing further down the chain runs - no tokens are
+    needed and no requests are sent. Raises LookupError for a request that
+    was never recorded.
+    """
+
+    def __init__(
+        self,
+        recorder: ApiRecorder | None = None,
+        replayer: ApiReplayer | None = None,
+    ) -> None:
+        """Initialize the middleware."""
+        self.recorder = recorder
+        self.replayer = replayer
+
+    async def __call__(self, request: ApiRequest, call_next: Handler) -> ApiResponse:
+        """Replay, or pass the request on and record the response."""
+        if self.replayer is not None:
+            status, body = await self.replayer.async_replay(request.method, request.endpoint)
+            return ApiResponse(status, body)
+
+        started = time.monotonic()
+        response = await call_next(request)
+        if self.recorder is not None:
+            try:
+                await self.recorder.async_record(
+                    request.method,
+                    request.endpoint,
+                    response.status,
+                    time.monotonic() - started,
+                    response.body,
+                )
+            except OSError as err:
+                _LOGGER.warning("Failed to record API response: %s", err)
+        return response
+
+
+class RetryMiddleware:
+    """Retries GET requests after connection errors and transient statuses.
+
+    Backs off exponentially with jitter, and gives up early rather than
+    sleeping past the request's deadline.
+    """
+
+    def __init__(
+        self,
+        retries: int = REQUEST_RETRIES,
+        backoff: float = REQUEST_RETRY_BACKOFF,
+    ) -> None:
+        """Initialize the middleware."""
+        self.retries = retries
+        self.backoff = backoff
+
+    async def __call__(self, request: ApiRequest, call_next: Handler) -> ApiResponse:
+        """Send the request, retrying while the budget allows."""
+        if request.method != "GET":
+            return await call_next(request)
+
+        attempt = 0
+        while True:
+            try:
+                response = await call_next(request)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                error: Exception | None = err
+                outcome = str(err) or type(err).__name__
+            else:
+                if response.status not in RETRY_STATUSES:
+                    return response
+                error = None
+                outcome = f"status {response.status}"
+
+            delay = self.backoff * 2**attempt * random.uniform(0.5, 1.5)
+            if attempt >= self.retries or delay >= request.remaining():
+                if error is not None:
+                    raise error
+                return response
+
+            attempt += 1
+            _LOGGER.debug(
+                "%s %s failed (%s), retry %d in %.1fs",
+                request.method,
+                request.endpoint,
+                outcome,
+                attempt,
+                delay,
+            )
+            with span("retry_backoff"):
+                await asyncio.sleep(delay)
+
+
+class RateLimitMiddleware:
+    """Token bucket limiting the requests of one client (one account).
+
+    Allows bursts of burst requests, then rate requests per second. Raises
+    asyncio.TimeoutError when the wait would outlast the request's deadline.
+    """
+
+    def __init__(self, rate: float = REQUEST_RATE, burst: int = REQUEST_BURST) -> None:
+        """Initialize the bucket, full."""
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def __call__(self, request: ApiRequest, call_next: Handler) -> ApiResponse:
+        """Wait for a token, then pass the request on."""
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                wait = (1 - self._tokens) / self.rate
+                if wait >= request.remaining():
+                    raise asyncio.TimeoutError
+                with span("rate_limit_wait"):
+                    await asyncio.sleep(wait)
+                self._tokens = 1.0
+                self._updated = time.monotonic()
+            self._tokens -= 1
+        return await call_next(request)
+
+
+class AuthMiddleware:
+    """Adds the bearer token, refreshing it before expiry and once on a 401."""
+
+    def __init__(self, api: BoschEBikeAPI) -> None:
+        """Initialize the middleware."""
+        self._api = api
+
+    async def __call__(self, request: ApiRequest, call_next: Handler) -> ApiResponse:
+        """Authorize the request."""
+        # Includes the refresh of an expiring token
+        with span("auth"):
+            token = await self._api.async_get_access_token(timeout=request.remaining())
+        request.headers["Authorization"] = f"Bearer {token}"
+        response = await call_next(request)
+        if response.status != 401:
+            return response
+
+        _LOGGER.debug("Got 401, attempting token refresh")
+        with span("token_refresh"):
+            await self._api.refresh_access_token(timeout=request.remaining())
+        request.headers["Authorization"] = f"Bearer {self._api.access_token}"
+        return await call_next(request)
@@ -0,0 +1,153 @@
+"""On-demand timing of coordinator update cycles.
+
+While a bike is being profiled, span() times each stage of its update
+cycles, nested by call - update;bike_profile;network, for example. The
+timings are summed over the profiled cycles and written as folded stacks,
+the input format of flame graph tools. Outside a profile span() returns a
+shared no-op context manager, so the spans left in the code cost a
+ContextVar lookup.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime
+import time
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+_NO_SPAN = nullcontext()
+
+
+class _CycleTrace:
+    """Span timings of one profiled update cycle."""
+
+    def __init__(self) -> None:
+        """Initialize the trace."""
+        self.closed = False
+        self.stack: list[str] = []
+        # Time spent in the children of each open span
+        self.child_time: list[float] = []
+        # Stack path -> [count, total seconds, self seconds]
+        self.stages: dict[str, list[float]] = {}
+
+
+# Trace of the update cycle running in the current task, if it is profiled
+_CURRENT: ContextVar[_CycleTrace | None] = ContextVar(f"{DOMAIN}_profile", default=None)
+
+
+class _Span:
+    """Times one stage of a profiled cycle."""
+
+    __slots__ = ("_trace", "_name", "_started")
+
+    def __init__(self, trace: _CycleTrace, name: str) -> None:
+        self._trace = trace
+        self._name = name
+        self._started = 0.0
+
+    def __enter__(self) -> None:
+        self._trace.stack.append(self._name)
+        self._trace.child_time.append(0.0)
+        self._started = time.perf_counter()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        elapsed = time.perf_counter() - self._started
+        trace = self._trace
+        path = ";".join(trace.stack)
+        children = trace.child_time.pop()
+        trace.stack.pop()
+        if trace.child_time:
+            trace.child_time[-1] += elapsed
+        stage = trace.stages.setdefault(path, [0, 0.0, 0.0])
+        stage[0] += 1
+        stage[1] += elapsed
+        stage[2] += elapsed - children
+
+
+def span(name: str) -> AbstractContextManager[None]:
+    """Time a stage of the update cycle running in this task, if profiled."""
+    trace = _CURRENT.get()
+    # Tasks and timers started during a profiled cycle inherit its context
+    if trace is None or trace.closed:
+        return _NO_SPAN
+    return _Span(trace, name)
+
+
+class UpdateProfiler:
+    """Aggregates the span timings of a bike over a number of cycles or a window."""
+
+    def __init__(self) -> None:
+        """Initialize the profiler, inactive."""
+        self.active = False
+        self.last_report: dict[str, Any] | None = None
+        self._cycles_left = 0
+        self._until = 0.0
+        self._cycles = 0
+        self._started: datetime | None = None
+        self._stages: dict[str, list[float]] = {}
+
+    def start(self, cycles: int, duration: float) -> None:
+        """Profile the next cycles update cycles, for at most duration seconds."""
+        self.active = True
+        self._cycles_left = cycles
+        self._until = time.monotonic() + duration
+        self._cycles = 0
+        self._started = dt_util.utcnow()
+        self._stages = {}
+
+    @property
+    def done(self) -> bool:
+        """Return True once the profile has all its cycles or its window closed."""
+        return self.active and (self._cycles_left <= 0 or time.monotonic() >= self._until)
+
+    @contextmanager
+    def cycle(self) -> Iterator[None]:
+        """Run an update cycle, timing it while the profile is active."""
+        trace = _CycleTrace() if self.active else None
+        token = _CURRENT.set(trace)
+        try:
+            if trace is None:
+                yield
+            else:
+                with _Span(trace, "update"):
+                    yield
+        finally:
+            _CURRENT.reset(token)
+            if trace is not None:
+                trace.closed = True
+                self._cycles += 1
+                self._cycles_left -= 1
+                for path, (count, total, own) in trace.stages.items():
+                    stage = self._stages.setdefault(path, [0, 0.0, 0.0])
+                    stage[0] += count
+                    stage[1] += total
+                    stage[2] += own
+
+    def stop(self) -> tuple[dict[str, Any], list[str]]:
+        """End the profile and return its report and its folded stacks."""
+        self.active = False
+        stages = sorted(self._stages.items())
+        report = {
+            "started": self._started.isoformat() if self._started else None,
+            "ended": dt_util.utcnow().isoformat(),
+            "cycles": self._cycles,
+            "stages": {
+                path: {
+                    "count": count,
+                    "total_ms": round(total * 1000, 2),
+                    "self_ms": round(own * 1000, 2),
+                    "avg_ms": round(total * 1000 / count, 2),
+                }
+                for path, (count, total, own) in stages
+            },
+        }
+        # Self time in microseconds, one line per stack
+        folded = [f"{path} {round(own * 1e6)}" for path, (_, _, own) in stages]
+        self.last_report = report
+        self._stages = {}
+        return report, folded
@@ -0,0 +1,142 @@
+"""Record and replay Bosch eBike API traffic.
+
+Recording writes one JSON line per API request (method, endpoint, status,
+elapsed time and the redacted response body) to a gzip file. Replaying serves
+those responses back through the same client, so a production problem can be
+reproduced, benchmarked or turned into a test without the Bosch cloud.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict, deque
+import gzip
+import json
+import logging
+import os
+import time
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+REDACTED = "**REDACTED**"
+
+# Compressed size at which a recording is moved to <path>.1 (replacing the
+# previous one) and a new file started - a few days of polling
+RECORDING_MAX_BYTES = 10 * 1024 * 1024
+
+# Response fields that identify the rider or the hardware
+REDACT_KEYS = frozenset({
+    "access_token",
+    "refresh_token",
+    "id_token",
+    "serialNumber",
+    "frameNumber",
+    "email",
+    "firstName",
+    "lastName",
+})
+
+
+def redact(value: Any) -> Any:
+    """Return a copy of a JSON value with identifying fields replaced."""
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if key in REDACT_KEYS and item is not None else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    return value
+
+
+class ApiRecorder:
+    """Appends redacted request/response pairs to a gzip JSON-lines file.
+
+    Once the file reaches max_bytes it is rotated, so a recording left
+    running keeps at most twice that on disk.
+    """
+
+    def __init__(self, path: str, max_bytes: int = RECORDING_MAX_BYTES) -> None:
+        """Initialize the recorder."""
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = asyncio.Lock()
+
+    def _write(self, line: str) -> None:
+        try:
+            full = os.path.getsize(self.path) >= self.max_bytes
+        except OSError:
+            full = False
+        if full:
+            os.replace(self.path, f"{self.path}.1")
+            _LOGGER.debug("Rotated API recording %s", self.path)
+        # Each append adds a gzip member - gzip readers treat them as one stream
+        with gzip.open(self.path, "at", encoding="utf-8") as file:
+            file.write(line + "\n")
+
+    async def async_record(
+        self,
+        method: str,
+        endpoint: str,
+        status: int,
+        elapsed: float,
+        body: Any,
+    ) -> None:
+        """Record one request."""
+        line = json.dumps(
+            {
+                "ts": time.time(),
+                "method": method,
+                "endpoint": endpoint,
+                "status": status,
+                "elapsed": round(elapsed, 4),
+                "body": redact(body),
+            },
+            separators=(",", ":"),
+        )
+        async with self._lock:
+            await asyncio.get_running_loop().run_in_executor(None, self._write, line)
+
+
+class ApiReplayer:
+    """Serves recorded responses in order, per method and endpoint.
+
+    Responses for an endpoint are replayed in the order they were recorded
+    and start over once exhausted. speed scales the recorded response time
+    (2.0 = twice as fast); 0 returns immediately.
+    """
+
+    def __init__(self, path: str, speed: float = 1.0) -> None:
+        """Initialize the replayer."""
+        self.path = path
+        self.speed = speed
+        self._responses: dict[tuple[str, str], deque[dict[str, Any]]] = defaultdict(deque)
+
+    def _read(self) -> list[dict[str, Any]]:
+        with gzip.open(self.path, "rt", encoding="utf-8") as file:
+            return [json.loads(line) for line in file if line.strip()]
+
+    async def async_load(self) -> None:
+        """Load the recording."""
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(self.path)
+        records = await asyncio.get_running_loop().run_in_executor(None, self._read)
+        for record in records:
+            self._responses[(record["method"], record["endpoint"])].append(record)
+        _LOGGER.debug("Loaded %d recorded responses from %s", len(records), self.path)
+
+    async def async_replay(self, method: str, endpoint: str) -> tuple[int, Any]:
+        """Return the next recorded (status, body) for a request.
+
+        Raises LookupError if nothing was recorded for it.
+        """
+        responses = self._responses.get((method, endpoint))
+        if not responses:
+            raise LookupError(f"No recorded response for {method} {endpoint}")
+
+        record = responses[0]
+        responses.rotate(-1)
+
+        if self.speed > 0:
+            await asyncio.sleep(record["elapsed"] / self.speed)
+        return record["status"], record["body"]
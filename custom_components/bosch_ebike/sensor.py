@@ -7,8 +7,8 @@ import logging
 from typing import Any
 
 from homeassistant.components.sensor import (
+    RestoreSensor,
     SensorDeviceClass,
-    SensorEntity,
     SensorEntityDescription,
     SensorStateClass,
 )
@@ -16,14 +16,18 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
     PERCENTAGE,
     UnitOfEnergy,
+    UnitOfInformation,
     UnitOfLength,
+    UnitOfPower,
+    UnitOfTime,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
+from .const import ASSIST_MODES, ATTR_DATA_AS_OF, DOMAIN, SIGNAL_DIAGNOSTICS
 from .coordinator import BoschEBikeDataUpdateCoordinator
 
 _LOGGER = logging.getLogger(__name__)
@@ -34,6 +38,10 @@ class BoschEBikeSensorEntityDescription(SensorEntityDescription):
     """Describes Bosch eBike sensor entity."""
 
     value_fn: Callable[[dict[str, Any]], Any] | None = None
+    attributes_fn: Callable[[dict[str, Any]], dict[str, Any]] | None = None
+    # False where None means "not applicable" rather than "not known", so a
+    # restored value would be stale (e.g. a charge ETA after charging ended)
+    restore: bool = True
 
 
 SENSORS: tuple[BoschEBikeSensorEntityDescription, ...] = (
@@ -71,13 +79,11 @@ SENSORS: tuple[BoschEBikeSensorEntityDescription, ...] = (
         native_unit_of_measurement=UnitOfLength.KILOMETERS,
         device_class=SensorDeviceClass.DISTANCE,
         state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda data: (
-            # reachableRange is an array with values for each riding mode
+        value_fn=lambda data: next(
+            # reachableRange is parsed per riding mode by the coordinator
             # Take the first value (most economical mode)
-            data.get("battery", {}).get("reachable_range_km")[0]
-            if isinstance(data.get("battery", {}).get("reachable_range_km"), list)
-            and len(data.get("battery", {}).get("reachable_range_km", [])) > 0
-            else None
+            iter(data.get("battery", {}).get("reachable_range_by_mode", {}).values()),
+            None,
         ),
         entity_registry_enabled_default=False,  # Only available when bike is online
     ),
@@ -116,6 +122,123 @@ SENSORS: tuple[BoschEBikeSensorEntityDescription, ...] = (
             else None
         ),
     ),
+    # Grid energy used for charging (Energy dashboard compatible)
+    BoschEBikeSensorEntityDescription(
+        key="charging_energy",
+        translation_key="charging_energy",
+        name="Charging Energy",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda data: data.get("charging", {}).get("energy_total_kwh"),
+    ),
+    BoschEBikeSensorEntityDescription(
+        key="last_charge_energy",
+        translation_key="last_charge_energy",
+        name="Last Charge Energy",
+        native_unit_of_measurement=UnitOfEnergy.WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        value_fn=lambda data: data.get("charging", {}).get("last_session_wh"),
+    ),
+    # Battery health model (persisted, updated when the cycle count moves)
+    BoschEBikeSensorEntityDescription(
+        key="battery_health",
+        translation_key="battery_health",
+        name="Battery Health",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: data.get("battery", {}).get("state_of_health_percent"),
+    ),
+    BoschEBikeSensorEntityDescription(
+        key="battery_degradation",
+        translation_key="battery_degradation",
+        name="Battery Degradation per 100 Cycles",
+        native_unit_of_measurement=PERCENTAGE,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda data: data.get("battery", {}).get("degradation_per_100_cycles"),
+    ),
+    # Trips segmented from odometer movement
+    BoschEBikeSensorEntityDescription(
+        key="last_trip_distance",
+        translation_key="last_trip_distance",
+        name="Last Trip Distance",
+        native_unit_of_measurement=UnitOfLength.KILOMETERS,
+        device_class=SensorDeviceClass.DISTANCE,
+        restore=False,
+        value_fn=lambda data: data.get("trips", {}).get("last_trip_km"),
+    ),
+    BoschEBikeSensorEntityDescription(
+        key="last_trip_energy",
+        translation_key="last_trip_energy",
+        name="Last Trip Energy",
+        native_unit_of_measurement=UnitOfEnergy.WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        entity_registry_enabled_default=False,
+        restore=False,
+        value_fn=lambda data: data.get("trips", {}).get("last_trip_energy_wh"),
+    ),
+    BoschEBikeSensorEntityDescription(
+        key="distance_today",
+        translation_key="distance_today",
+        name="Distance Today",
+        native_unit_of_measurement=UnitOfLength.KILOMETERS,
+        device_class=SensorDeviceClass.DISTANCE,
+        value_fn=lambda data: data.get("trips", {}).get("today_km"),
+    ),
+    BoschEBikeSensorEntityDescription(
+        key="distance_this_week",
+        translation_key="distance_this_week",
+        name="Distance This Week",
+        native_unit_of_measurement=UnitOfLength.KILOMETERS,
+        device_class=SensorDeviceClass.DISTANCE,
+        value_fn=lambda data: data.get("trips", {}).get("week_km"),
+    ),
+    BoschEBikeSensorEntityDescription(
+        key="distance_this_month",
+        translation_key="distance_this_month",
+        name="Distance This Month",
+        native_unit_of_measurement=UnitOfLength.KILOMETERS,
+        device_class=SensorDeviceClass.DISTANCE,
+        value_fn=lambda data: data.get("trips", {}).get("month_km"),
+    ),
+    # Derived from the coordinator's SoC sample history (None unless charging)
+    BoschEBikeSensorEntityDescription(
+        key="charge_rate",
+        translation_key="charge_rate",
+        name="Charge Rate",
+        native_unit_of_measurement="%/h",
+        state_class=SensorStateClass.MEASUREMENT,
+        restore=False,
+        value_fn=lambda data: data.get("charging", {}).get("rate_percent_per_hour"),
+    ),
+    BoschEBikeSensorEntityDescription(
+        key="charge_power",
+        translation_key="charge_power",
+        name="Charge Power",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        restore=False,
+        value_fn=lambda data: data.get("charging", {}).get("rate_w"),
+    ),
+    BoschEBikeSensorEntityDescription(
+        key="time_to_full",
+        translation_key="time_to_full",
+        name="Time to Full",
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        device_class=SensorDeviceClass.DURATION,
+        restore=False,
+        value_fn=lambda data: data.get("charging", {}).get("time_to_full_min"),
+    ),
+    BoschEBikeSensorEntityDescription(
+        key="time_to_target",
+        translation_key="time_to_target",
+        name="Time to Target",
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        device_class=SensorDeviceClass.DURATION,
+        restore=False,
+        value_fn=lambda data: data.get("charging", {}).get("time_to_target_min"),
+    ),
     # Diagnostic sensors (disabled by default)
     BoschEBikeSensorEntityDescription(
         key="drive_unit_software_version",
@@ -156,24 +279,244 @@ SENSORS: tuple[BoschEBikeSensorEntityDescription, ...] = (
 )
 
 
+# Health of the update pipeline - value_fn reads coordinator.diagnostics
+# instead of the bike snapshot
+DIAGNOSTIC_SENSORS: tuple[BoschEBikeSensorEntityDescription, ...] = (
+    BoschEBikeSensorEntityDescription(
+        key="data_age",
+        translation_key="data_age",
+        name="Data Age",
+        # A timestamp, so the age keeps growing while the bike is silent and
+        # polling is suspended - the frontend shows it as "5 days ago"
+        device_class=SensorDeviceClass.TIMESTAMP,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        restore=False,
+        value_fn=lambda diagnostics: diagnostics.get("data_as_of"),
+    ),
+    BoschEBikeSensorEntityDescription(
+        key="last_successful_poll",
+        translation_key="last_successful_poll",
+        name="Last Successful Poll",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda diagnostics: diagnostics.get("last_success"),
+    ),
+    BoschEBikeSensorEntityDescription(
+        key="update_duration",
+        translation_key="update_duration",
+        name="Update Duration",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda diagnostics: diagnostics.get("cycle_ms"),
+        attributes_fn=lambda diagnostics: {
+            f"{endpoint}_ms": elapsed
+            for endpoint, elapsed in diagnostics.get("endpoint_ms", {}).items()
+        },
+    ),
+    BoschEBikeSensorEntityDescription(
+        key="consecutive_failures",
+        translation_key="consecutive_failures",
+        name="Consecutive Failures",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda diagnostics: diagnostics.get("consecutive_failures"),
+    ),
+    # Traffic of the whole account - shared by its bikes
+    BoschEBikeSensorEntityDescription(
+        key="api_data_received",
+        translation_key="api_data_received",
+        name="API Data Received",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda diagnostics: diagnostics.get("traffic", {}).get("wire_bytes"),
+        attributes_fn=lambda diagnostics: {
+            "growing_endpoints": diagnostics.get("traffic", {}).get("growing", []),
+        },
+    ),
+    BoschEBikeSensorEntityDescription(
+        key="api_data_decoded",
+        translation_key="api_data_decoded",
+        name="API Data Decoded",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda diagnostics: diagnostics.get("traffic", {}).get("body_bytes"),
+    ),
+    # Time the last refresh waited for a slot of the shared refresh executor
+    BoschEBikeSensorEntityDescription(
+        key="refresh_queue_wait",
+        translation_key="refresh_queue_wait",
+        name="Refresh Queue Wait",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda diagnostics: diagnostics.get("queue_wait_ms"),
+        attributes_fn=lambda diagnostics: {
+            key: diagnostics.get("refresh_queue", {}).get(key)
+            for key in ("queue_depth", "max_queue_depth", "avg_wait_ms", "max_wait_ms")
+        },
+    ),
+)
+
+
+def _range_description(mode: str) -> BoschEBikeSensorEntityDescription:
+    """Describe the reachable range sensor for one assist mode."""
+    return BoschEBikeSensorEntityDescription(
+        key=f"reachable_range_{mode}",
+        translation_key=f"reachable_range_{mode}",
+        name=f"Reachable Range {mode.replace('_', ' ').title()}",
+        native_unit_of_measurement=UnitOfLength.KILOMETERS,
+        device_class=SensorDeviceClass.DISTANCE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: data.get("battery", {}).get(
+            "reachable_range_by_mode", {}).get(mode),
+        entity_registry_enabled_default=False,  # Only available when bike is online
+    )
+
+
+# Readings exposed per battery on multi-battery (DualBattery) bikes:
+# (field, name, unit, device class, state class)
+BATTERY_PACK_SENSORS = (
+    ("level_percent", "Level", PERCENTAGE, SensorDeviceClass.BATTERY, SensorStateClass.MEASUREMENT),
+    (
+        "remaining_wh",
+        "Remaining Energy",
+        UnitOfEnergy.WATT_HOUR,
+        SensorDeviceClass.ENERGY_STORAGE,
+        SensorStateClass.MEASUREMENT,
+    ),
+    (
+        "total_capacity_wh",
+        "Capacity",
+        UnitOfEnergy.WATT_HOUR,
+        SensorDeviceClass.ENERGY_STORAGE,
+        SensorStateClass.MEASUREMENT,
+    ),
+    ("charge_cycles_total", "Charge Cycles", None, None, SensorStateClass.TOTAL_INCREASING),
+    ("state_of_health_percent", "Health", PERCENTAGE, None, SensorStateClass.MEASUREMENT),
+)
+
+
+def _battery_pack_descriptions(
+    battery_key: str, number: int
+) -> list[BoschEBikeSensorEntityDescription]:
+    """Describe the sensors for one battery, keyed by its serial number."""
+    return [
+        BoschEBikeSensorEntityDescription(
+            key=f"battery_{battery_key}_{field}",
+            name=f"Battery {number} {name}",
+            native_unit_of_measurement=unit,
+            device_class=device_class,
+            state_class=state_class,
+            value_fn=lambda data, field=field: data.get("batteries", {}).get(
+                battery_key, {}).get(field),
+        )
+        for field, name, unit, device_class, state_class in BATTERY_PACK_SENSORS
+    ]
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Bosch eBike sensors from a config entry."""
-    coordinator: BoschEBikeDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    coordinators: dict[str, BoschEBikeDataUpdateCoordinator] = hass.data[DOMAIN][
+        entry.entry_id
+    ]["coordinators"]
 
-    entities = [
-        BoschEBikeSensor(coordinator, description, entry)
-        for description in SENSORS
-    ]
+    entities = []
+    for coordinator in coordinators.values():
+        entities.extend(
+            BoschEBikeSensor(coordinator, description, entry)
+            for description in SENSORS
+        )
+        entities.extend(
+            BoschEBikeSensor(coordinator, _range_description(mode), entry)
+            for mode in ASSIST_MODES
+        )
+        entities.extend(
+            BoschEBikeDiagnosticSensor(coordinator, description, entry)
+            for description in DIAGNOSTIC_SENSORS
+        )
 
     async_add_entities(entities)
 
+    for coordinator in coordinators.values():
+        _async_add_dynamic_sensors(entry, coordinator, async_add_entities)
+
+
+@callback
+def _async_add_dynamic_sensors(
+    entry: ConfigEntry,
+    coordinator: BoschEBikeDataUpdateCoordinator,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Add sensors for assist modes and batteries as they show up in the data."""
+    # Bikes with more assist modes than ASSIST_MODES get extra range sensors
+    # as soon as the modes show up in the data
+    added_modes = set(ASSIST_MODES)
+
+    @callback
+    def _async_add_range_sensors() -> None:
+        if not coordinator.data:
+            return
+        modes = coordinator.data.get("battery", {}).get("reachable_range_by_mode", {})
+        new_modes = [mode for mode in modes if mode not in added_modes]
+        if not new_modes:
+            return
+        added_modes.update(new_modes)
+        async_add_entities(
+            BoschEBikeSensor(coordinator, _range_description(mode), entry)
+            for mode in new_modes
+        )
+
+    _async_add_range_sensors()
+    entry.async_on_unload(coordinator.async_add_listener(_async_add_range_sensors))
 
-class BoschEBikeSensor(CoordinatorEntity[BoschEBikeDataUpdateCoordinator], SensorEntity):
-    """Representation of a Bosch eBike sensor."""
+    # Per-battery sensors, once the bike reports more than one battery.
+    # Single-battery bikes are fully covered by the bike-level sensors.
+    added_batteries: set[str] = set()
+
+    @callback
+    def _async_add_battery_sensors() -> None:
+        if not coordinator.data:
+            return
+        batteries = coordinator.data.get("batteries", {})
+        if len(batteries) < 2:
+            return
+        new_batteries = [key for key in batteries if key not in added_batteries]
+        if not new_batteries:
+            return
+        added_batteries.update(new_batteries)
+        async_add_entities(
+            BoschEBikeSensor(coordinator, description, entry)
+            for key in new_batteries
+            for description in _battery_pack_descriptions(
+                key, batteries[key]["index"] + 1
+            )
+        )
+
+    _async_add_battery_sensors()
+    entry.async_on_unload(coordinator.async_add_listener(_async_add_battery_sensors))
+
+
+class BoschEBikeSensor(CoordinatorEntity[BoschEBikeDataUpdateCoordinator], RestoreSensor):
+    """Representation of a Bosch eBike sensor.
+
+    The last value is restored on startup and shown until the API returns a
+    value again - offline bikes often report null in their profile.
+    """
 
     entity_description: BoschEBikeSensorEntityDescription
     _attr_has_entity_name = True
@@ -189,6 +532,8 @@ class BoschEBikeSensor(CoordinatorEntity[BoschEBikeDataUpdateCoordinator], Senso
         super().__init__(coordinator)
         self.entity_description = description
         self._entry = entry
+        self._restored_value: Any = None
+        self._restored_as_of: str | None = None
 
         # Set unique ID
         self._attr_unique_id = f"{coordinator.bike_id}_{description.key}"
@@ -222,6 +567,35 @@ class BoschEBikeSensor(CoordinatorEntity[BoschEBikeDataUpdateCoordinator], Senso
 
         self._attr_device_info = device_info
 
+    async def async_added_to_hass(self) -> None:
+        """Restore the last value, used until the API provides one."""
+        await super().async_added_to_hass()
+        if not self.entity_description.restore:
+            return
+        last_state = await self.async_get_last_state()
+        last_data = await self.async_get_last_sensor_data()
+        if last_state is None or last_data is None or last_data.native_value is None:
+            return
+        self._restored_value = last_data.native_value
+        self._restored_as_of = last_state.attributes.get(ATTR_DATA_AS_OF)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Drop the restored value once the API provides a newer one."""
+        if self._restored_value is not None and self._live_value() is not None:
+            self._restored_value = self._restored_as_of = None
+        super()._handle_coordinator_update()
+
+    def _live_value(self) -> Any:
+        """Return the value in the latest snapshot."""
+        if self.coordinator.data is None:
+            return None
+
+        if self.entity_description.value_fn is not None:
+            return self.entity_description.value_fn(self.coordinator.data)
+
+        return None
+
     @property
     def native_unit_of_measurement(self) -> str | None:
         """Return the unit of measurement."""
@@ -230,21 +604,70 @@ class BoschEBikeSensor(CoordinatorEntity[BoschEBikeDataUpdateCoordinator], Senso
     @property
     def native_value(self) -> Any:
         """Return the state of the sensor."""
-        if self.coordinator.data is None:
-            return None
+        value = self._live_value()
+        return self._restored_value if value is None else value
 
-        if self.entity_description.value_fn is not None:
-            return self.entity_description.value_fn(self.coordinator.data)
-
-        return None
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return when the value was last received by the Bosch cloud."""
+        if self._restored_value is not None and self._live_value() is None:
+            return {ATTR_DATA_AS_OF: self._restored_as_of}
+        return {ATTR_DATA_AS_OF: (self.coordinator.data or {}).get("last_update")}
 
     @property
     def available(self) -> bool:
         """Return if entity is available."""
         # Entity is available if coordinator succeeded
         # Even if individual values are None, we want to show the entity
-        # (it will just show as Unknown)
+        # (it will just show as Unknown). A restored value keeps it
+        # available while the API is unreachable.
         return (
             self.coordinator.last_update_success
             and self.coordinator.data is not None
+        ) or self._restored_value is not None
+
+
+class BoschEBikeDiagnosticSensor(BoschEBikeSensor):
+    """Sensor reporting the health of the bike's update cycle.
+
+    Written once per cycle on SIGNAL_DIAGNOSTICS, including failed cycles
+    and ones that returned unchanged data (which don't notify listeners).
+    """
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to the coordinator's per-cycle diagnostics."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_DIAGNOSTICS.format(self.coordinator.bike_id),
+                self._handle_diagnostics_update,
+            )
         )
+
+    @callback
+    def _handle_diagnostics_update(self) -> None:
+        """Write the state after an update cycle."""
+        if self._restored_value is not None and self._live_value() is not None:
+            self._restored_value = self._restored_as_of = None
+        self.async_write_ha_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Ignore coordinator updates - the dispatcher signal covers every cycle."""
+
+    def _live_value(self) -> Any:
+        """Return the value from the coordinator's diagnostics."""
+        return self.entity_description.value_fn(self.coordinator.diagnostics)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the per-endpoint breakdown, where the sensor has one."""
+        if self.entity_description.attributes_fn is None:
+            return None
+        return self.entity_description.attributes_fn(self.coordinator.diagnostics)
+
+    @property
+    def available(self) -> bool:
+        """Return True - diagnostics matter most while the API is failing."""
+        return True
@@ -0,0 +1,147 @@
+"""Services for the Bosch eBike integration."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+import logging
+
+import voluptuous as vol
+
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import device_registry as dr
+
+from .const import (
+    ATTR_BIKE_ID,
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_CYCLES,
+    ATTR_DURATION,
+    ATTR_LIMIT,
+    DEFAULT_PROFILE_CYCLES,
+    DEFAULT_PROFILE_DURATION,
+    DOMAIN,
+    SERVICE_DUMP_TRACE,
+    SERVICE_GET_TRIPS,
+    SERVICE_PROFILE,
+    SERVICE_REFRESH,
+)
+from .coordinator import BoschEBikeDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+REFRESH_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional(ATTR_CONFIG_ENTRY_ID): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional(ATTR_BIKE_ID): vol.All(cv.ensure_list, [cv.string]),
+})
+
+GET_TRIPS_SCHEMA = REFRESH_SCHEMA.extend({
+    vol.Optional(ATTR_LIMIT, default=20): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=500)
+    ),
+})
+
+PROFILE_SCHEMA = REFRESH_SCHEMA.extend({
+    vol.Optional(ATTR_CYCLES, default=DEFAULT_PROFILE_CYCLES): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=100)
+    ),
+    vol.Optional(
+        ATTR_DURATION, default=timedelta(seconds=DEFAULT_PROFILE_DURATION)
+    ): vol.All(cv.time_period, cv.positive_timedelta),
+})
+
+
+def _get_coordinators(
+    hass: HomeAssistant, call: ServiceCall
+) -> list[BoschEBikeDataUpdateCoordinator]:
+    """Return the coordinators targeted by a service call (all if untargeted)."""
+    bike_ids = set(call.data.get(ATTR_BIKE_ID, []))
+    entry_ids = set(call.data.get(ATTR_CONFIG_ENTRY_ID, []))
+
+    # Devices are identified by (DOMAIN, bike_id)
+    device_registry = dr.async_get(hass)
+    for device_id in call.data.get(ATTR_DEVICE_ID, []):
+        if device := device_registry.async_get(device_id):
+            bike_ids.update(
+                identifier for domain, identifier in device.identifiers
+                if domain == DOMAIN
+            )
+
+    targeted = bool(bike_ids or entry_ids)
+    coordinators = []
+    for entry_id, entry_data in hass.data.get(DOMAIN, {}).items():
+        for coordinator in entry_data["coordinators"].values():
+            if (
+                not targeted
+                or entry_id in entry_ids
+                or coordinator.bike_id in bike_ids
+            ):
+                coordinators.append(coordinator)
+
+    return coordinators
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+
+    async def async_handle_refresh(call: ServiceCall) -> None:
+        """Refresh the targeted bikes."""
+        coordinators = _get_coordinators(hass, call)
+        _LOGGER.debug(
+            "Refresh requested for %s",
+            [coordinator.bike_id for coordinator in coordinators],
+        )
+        await asyncio.gather(
+            *(
+                coordinator.async_request_manual_refresh()
+                for coordinator in coordinators
+            )
+        )
+
+    async def async_handle_get_trips(call: ServiceCall) -> ServiceResponse:
+        """Return recent trips and distance rollups for the targeted bikes."""
+        return {
+            coordinator.bike_id: coordinator.get_trips(call.data[ATTR_LIMIT])
+            for coordinator in _get_coordinators(hass, call)
+        }
+
+    async def async_handle_profile(call: ServiceCall) -> None:
+        """Time the stages of the next update cycles of the targeted bikes."""
+        for coordinator in _get_coordinators(hass, call):
+            coordinator.async_start_profile(call.data[ATTR_CYCLES], call.data[ATTR_DURATION])
+
+    async def async_handle_dump_trace(call: ServiceCall) -> ServiceResponse:
+        """Return the buffered update traces of the targeted bikes."""
+        return {
+            coordinator.bike_id: coordinator.trace.dump()
+            for coordinator in _get_coordinators(hass, call)
+        }
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_REFRESH, async_handle_refresh, schema=REFRESH_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_TRIPS,
+        async_handle_get_trips,
+        schema=GET_TRIPS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_DUMP_TRACE,
+        async_handle_dump_trace,
+        schema=REFRESH_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE, async_handle_profile, schema=PROFILE_SCHEMA
+    )
@@ -0,0 +1,75 @@
+"""Cheap logging for the update hot path.
+
+Messages repeated on every update of every bike go through SampledLogger,
+which logs each one at most once per interval whatever the number of
+bikes. Per-cycle details go to a TraceBuffer instead of the log - a
+bounded in-memory record that the dump_trace service returns on demand.
+"""
+from __future__ import annotations
+
+from collections import deque
+import logging
+import time
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+from .const import LOG_SAMPLE_INTERVAL, TRACE_BUFFER_SIZE
+
+
+class SampledLogger:
+    """Logs each message key at most once per interval.
+
+    Suppressed messages are counted and the count is added to the next
+    message logged for the key. Nothing is formatted, and no state is
+    touched, while the level is disabled.
+    """
+
+    def __init__(self, logger: logging.Logger, interval: float = LOG_SAMPLE_INTERVAL) -> None:
+        """Initialize the logger."""
+        self._logger = logger
+        self.interval = interval
+        # key -> (time.monotonic() of the last message logged, messages suppressed since)
+        self._keys: dict[str, tuple[float, int]] = {}
+
+    def log(self, level: int, key: str, msg: str, *args: Any) -> None:
+        """Log msg % args, unless key was logged less than interval ago."""
+        if not self._logger.isEnabledFor(level):
+            return
+        now = time.monotonic()
+        last, suppressed = self._keys.get(key, (None, 0))
+        if last is not None and now - last < self.interval:
+            self._keys[key] = (last, suppressed + 1)
+            return
+        if suppressed:
+            msg = f"{msg} (%d similar messages suppressed)"
+            args = (*args, suppressed)
+        self._keys[key] = (now, 0)
+        self._logger.log(level, msg, *args)
+
+    def info(self, key: str, msg: str, *args: Any) -> None:
+        """Log a sampled message at INFO."""
+        self.log(logging.INFO, key, msg, *args)
+
+
+class TraceBuffer:
+    """The last TRACE_BUFFER_SIZE trace events of a bike.
+
+    Events are stored unformatted, so adding one costs a tuple and an
+    append; formatting happens only when the buffer is dumped.
+    """
+
+    def __init__(self, size: int = TRACE_BUFFER_SIZE) -> None:
+        """Initialize the buffer."""
+        self._events: deque[tuple[float, str, dict[str, Any]]] = deque(maxlen=size)
+
+    def add(self, event: str, **fields: Any) -> None:
+        """Record an event."""
+        self._events.append((time.time(), event, fields))
+
+    def dump(self) -> list[dict[str, Any]]:
+        """Return the buffered events, oldest first."""
+        return [
+            {"time": dt_util.utc_from_timestamp(timestamp).isoformat(), "event": event, **fields}
+            for timestamp, event, fields in self._events
+        ]
@@ -0,0 +1,172 @@
+"""Ride detection and trip history for Bosch eBikes."""
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+# No odometer movement for this long closes a trip
+TRIP_GAP = 30 * 60  # seconds
+
+# Bounded history - the oldest trips/periods are dropped first
+TRIP_HISTORY_SIZE = 500
+ROLLUP_SIZE = {"day": 62, "week": 27, "month": 24}
+
+
+def _period_keys(timestamp: float) -> dict[str, str]:
+    """Return the local day/week/month keys a timestamp falls into."""
+    local = dt_util.as_local(dt_util.utc_from_timestamp(timestamp))
+    year, week, _ = local.isocalendar()
+    return {
+        "day": local.strftime("%Y-%m-%d"),
+        "week": f"{year}-W{week:02d}",
+        "month": local.strftime("%Y-%m"),
+    }
+
+
+class TripStore:
+    """Segments odometer increases into trips and keeps rollups per period.
+
+    Trips are appended as compact [start, end, distance_m, energy_wh] rows.
+    Day/week/month totals ([distance_m, energy_wh, trips]) are updated with
+    every odometer delta, so reporting never walks the trip list.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty store."""
+        self._trips: deque[list[float]] = deque(maxlen=TRIP_HISTORY_SIZE)
+        self._open: list[float] | None = None
+        self._rollups: dict[str, dict[str, list[float]]] = {
+            period: {} for period in ROLLUP_SIZE
+        }
+        self._last: tuple[float, float, float | None] | None = None
+
+    def load(self, stored: dict[str, Any] | None) -> None:
+        """Restore the store from storage."""
+        if not stored:
+            return
+        self._trips.extend(stored.get("trips", []))
+        self._open = stored.get("open")
+        self._rollups.update(stored.get("rollups", {}))
+        if last := stored.get("last"):
+            self._last = tuple(last)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the store in storage form."""
+        return {
+            "trips": list(self._trips),
+            "open": self._open,
+            "rollups": self._rollups,
+            "last": self._last,
+        }
+
+    def update(
+        self, timestamp: float, odometer_m: float | None, energy_wh: float | None
+    ) -> bool:
+        """Feed a reading, returning True if the store changed."""
+        if not isinstance(odometer_m, (int, float)):
+            return False
+        energy_wh = energy_wh if isinstance(energy_wh, (int, float)) else None
+
+        last = self._last
+        if last is None:
+            self._last = (timestamp, odometer_m, energy_wh)
+            return True
+        last_time, last_odometer, last_energy = last
+
+        delta = odometer_m - last_odometer
+        if delta >= 0:
+            self._last = (timestamp, odometer_m, energy_wh)
+        # A lower reading (the live and profile odometers disagree) is
+        # ignored, so the baseline stays the highest odometer seen and
+        # nothing is counted twice when the higher one comes back
+        if delta <= 0:
+            if self._open is not None and timestamp - self._open[1] > TRIP_GAP:
+                self._close()
+                return True
+            return False
+
+        # Energy used since the previous reading (a charge stop mid-trip is
+        # not counted as negative use)
+        energy = (
+            max(last_energy - energy_wh, 0.0)
+            if last_energy is not None and energy_wh is not None
+            else 0.0
+        )
+
+        if self._open is not None and timestamp - self._open[1] <= TRIP_GAP:
+            self._open[1] = timestamp
+            self._open[2] += delta
+            self._open[3] += energy
+            new_trip = False
+        else:
+            self._close()
+            # The ride started some time after the previous reading
+            start = last_time if timestamp - last_time <= TRIP_GAP else timestamp
+            self._open = [start, timestamp, delta, energy]
+            new_trip = True
+
+        for period, key in _period_keys(timestamp).items():
+            rollup = self._rollups[period]
+            totals = rollup.setdefault(key, [0.0, 0.0, 0])
+            totals[0] += delta
+            totals[1] += energy
+            totals[2] += new_trip
+            if len(rollup) > ROLLUP_SIZE[period]:
+                del rollup[min(rollup)]
+
+        return True
+
+    def _close(self) -> None:
+        """Move the open trip to the history."""
+        if self._open is not None:
+            self._trips.append(self._open)
+            self._open = None
+
+    def summary(self, now: datetime) -> dict[str, Any]:
+        """Return the values exposed as sensors."""
+        keys = _period_keys(now.timestamp())
+        last_trip = self._open or (self._trips[-1] if self._trips else None)
+
+        def _km(period: str) -> float:
+            totals = self._rollups[period].get(keys[period])
+            return round(totals[0] / 1000, 2) if totals else 0.0
+
+        return {
+            "last_trip_km": round(last_trip[2] / 1000, 2) if last_trip else None,
+            "last_trip_energy_wh": round(last_trip[3]) if last_trip else None,
+            "ride_in_progress": self._open is not None,
+            "today_km": _km("day"),
+            "week_km": _km("week"),
+            "month_km": _km("month"),
+        }
+
+    def query(self, limit: int) -> dict[str, Any]:
+        """Return the most recent trips and all rollups."""
+        trips = list(self._trips)
+        if self._open is not None:
+            trips.append(self._open)
+        return {
+            "trips": [
+                {
+                    "start": dt_util.utc_from_timestamp(start).isoformat(),
+                    "end": dt_util.utc_from_timestamp(end).isoformat(),
+                    "distance_km": round(distance / 1000, 2),
+                    "energy_wh": round(energy),
+                }
+                for start, end, distance, energy in trips[-limit:]
+            ],
+            "rollups": {
+                period: {
+                    key: {
+                        "distance_km": round(distance / 1000, 2),
+                        "energy_wh": round(energy),
+                        "trips": int(count),
+                    }
+                    for key, (distance, energy, count) in rollup.items()
+                }
+                for period, rollup in self._rollups.items()
+            },
+        }
@@ -18,12 +18,18 @@ class MockDataUpdateCoordinator:
         # Store arguments that might be accessed
         if 'update_interval' in kwargs:
             self.update_interval = kwargs['update_interval']
+        self.data = None
+
+    def __class_getitem__(cls, item):
+        # DataUpdateCoordinator[dict[str, Any]]
+        return cls
 
 
 # Create comprehensive mocks
 mock_ha = MagicMock()
 mock_ha.core = MagicMock()
 mock_ha.core.HomeAssistant = MagicMock()
+mock_ha.core.callback = lambda func: func
 mock_ha.config_entries = MagicMock()
 mock_ha.config_entries.ConfigEntry = MagicMock()
 mock_ha.const = MagicMock()
@@ -47,3 +53,25 @@ sys.modules['homeassistant.const'] = mock_ha.const
 sys.modules['homeassistant.helpers'] = mock_ha.helpers
 sys.modules['homeassistant.helpers.update_coordinator'] = mock_ha.helpers.update_coordinator
 sys.modules['homeassistant.helpers.aiohttp_client'] = mock_ha.helpers.aiohttp_client
+
+# Remaining modules imported by the integration - plain mocks are enough as
+# the tests only exercise data handling
+for module_name in (
+    'homeassistant.components',
+    'homeassistant.components.recorder',
+    'homeassistant.components.recorder.models',
+    'homeassistant.components.recorder.statistics',
+    'homeassistant.data_entry_flow',
+    'homeassistant.exceptions',
+    'homeassistant.helpers.config_validation',
+    'homeassistant.helpers.debounce',
+    'homeassistant.helpers.device_registry',
+    'homeassistant.helpers.dispatcher',
+    'homeassistant.helpers.event',
+    'homeassistant.helpers.selector',
+    'homeassistant.helpers.storage',
+    'homeassistant.helpers.typing',
+    'homeassistant.util',
+    'homeassistant.util.dt',
+):
+    sys.modules.setdefault(module_name, MagicMock())
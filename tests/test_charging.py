@@ -0,0 +1,54 @@
+"""Tests for charging session detection and grid energy accounting."""
+# conftest.py handles Home Assistant mocking before imports
+from custom_components.bosch_ebike.charging import ChargingSessionTracker
+
+START = 1_700_000_000.0
+
+
+def test_charging_session_counts_grid_energy():
+    """Energy added while charging is divided by the charger efficiency."""
+    tracker = ChargingSessionTracker()
+    tracker.update(START, False, 50, [(250, 50, 500)], 0.8)
+    tracker.update(START + 600, True, 60, [(300, 60, 500)], 0.8)
+    tracker.update(START + 1200, True, 80, [(400, 80, 500)], 0.8)
+    assert tracker.update(START + 1800, False, 80, [(400, 80, 500)], 0.8)
+
+    assert tracker.total_wh == 150 / 0.8
+    assert tracker.last_session == [START + 600, START + 1200, 60, 80, 150, 187.5]
+
+    # Riding uses energy - never counted
+    tracker.update(START + 3600, False, 40, [(200, 40, 500)], 0.8)
+    assert tracker.total_wh == 187.5
+
+    restored = ChargingSessionTracker()
+    restored.load(tracker.as_dict())
+    assert restored.as_dict() == tracker.as_dict()
+
+
+def test_switching_energy_source_adds_no_energy():
+    """Alternating remaining energy and level readings never adds phantom energy."""
+    tracker = ChargingSessionTracker()
+    tracker.update(START, True, 80, [(400, 80, 500)], 1.0)
+    for step in range(1, 7):
+        # Remaining energy missing every other reading - the level fallback
+        # (80 % of 500 Wh) is 400 Wh as well, but from another source
+        remaining = None if step % 2 else 400
+        tracker.update(START + step * 300, True, 80, [(remaining, 80, 500)], 1.0)
+    assert tracker.total_wh == 0
+
+    tracker.update(START + 2400, True, 90, [(450, 90, 500)], 1.0)
+    assert tracker.total_wh == 50
+
+
+def test_dual_battery_pack_without_readings_is_skipped():
+    """A DualBattery reading missing one pack doesn't move the baseline."""
+    tracker = ChargingSessionTracker()
+    tracker.update(START, True, 50, [(250, 50, 500), (250, 50, 500)], 1.0)
+    # Second pack reports null, then comes back
+    tracker.update(START + 300, True, 50, [(260, 52, 500), (None, None, None)], 1.0)
+    tracker.update(START + 600, True, 52, [(260, 52, 500), (260, 52, 500)], 1.0)
+    assert tracker.total_wh == 20
+
+    # Non-numeric capacity is ignored rather than raising
+    tracker.update(START + 900, True, 52, [(None, 52, "n/a"), (None, 52, 500)], 1.0)
+    assert tracker.total_wh == 20
@@ -0,0 +1,230 @@
+"""Generated-payload tests for BoschEBikeDataUpdateCoordinator._combine_bike_data.
+
+Unlike test_coordinator_logic.py, these run the real coordinator method
+(conftest.py mocks Home Assistant) against thousands of generated payloads:
+nulls, missing keys, extra batteries, large arrays and unexpected types.
+"""
+# conftest.py handles Home Assistant mocking before imports
+import random
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+# The integration's own runtime dependencies (requirements-dev.txt)
+pytest.importorskip("aiohttp")
+pytest.importorskip("async_timeout")
+pytest.importorskip("voluptuous")
+
+from homeassistant.helpers.update_coordinator import UpdateFailed  # noqa: E402
+
+from custom_components.bosch_ebike.coordinator import (  # noqa: E402
+    BoschEBikeDataUpdateCoordinator,
+)
+
+PAYLOAD_COUNT = 5000
+SEED = 20240101
+
+# Values the API has been seen to (or could plausibly) send in place of
+# the expected type
+ODD_VALUES = [None, 0, -1, 1.5, "", "unexpected", True, [], {}, [None], {"extra": 1}]
+
+
+def _coordinator():
+    return BoschEBikeDataUpdateCoordinator(
+        hass=MagicMock(),
+        api=MagicMock(),
+        bike_id="test-bike-id",
+        bike_name="Test Bike",
+    )
+
+
+def _maybe(rng, value):
+    """Return value, an odd value, or signal the key should be dropped."""
+    roll = rng.random()
+    if roll < 0.7:
+        return value
+    if roll < 0.85:
+        return rng.choice(ODD_VALUES)
+    return KeyError  # drop the key
+
+
+def _obj(rng, fields):
+    """Build a dict from fields, randomly dropping keys and adding extra ones."""
+    result = {}
+    for key, value in fields.items():
+        value = _maybe(rng, value)
+        if value is not KeyError:
+            result[key] = value
+    if rng.random() < 0.2:
+        result[f"unknownField{rng.randint(0, 99)}"] = rng.choice(ODD_VALUES)
+    return result
+
+
+def _component(rng):
+    return _obj(rng, {
+        "productName": "Performance Line CX",
+        "softwareVersion": f"{rng.randint(1, 9)}.{rng.randint(0, 99)}.0",
+        "serialNumber": f"SN{rng.randint(0, 10**8)}",
+    })
+
+
+def _battery(rng):
+    return _obj(rng, {
+        "batteryLevel": rng.randint(0, 100),
+        "remainingEnergy": rng.randint(0, 750),
+        "totalEnergy": rng.choice([500, 625, 750, 800]),
+        "isCharging": rng.choice([True, False]),
+        "isChargerConnected": rng.choice([True, False]),
+        "numberOfFullChargeCycles": _obj(rng, {"total": rng.randint(0, 1000)}),
+        "deliveredWhOverLifetime": rng.randint(0, 10**6),
+        "productName": "PowerTube 625",
+        "softwareVersion": "1.2.3",
+        "serialNumber": f"BAT{rng.randint(0, 10**8)}",
+    })
+
+
+def _batteries(rng):
+    roll = rng.random()
+    if roll < 0.05:
+        # Large array
+        return [_battery(rng) for _ in range(rng.randint(100, 1000))]
+    if roll < 0.15:
+        return rng.choice(ODD_VALUES)
+    # Usually one, sometimes none or extra (DualBattery) batteries
+    return [_battery(rng) for _ in range(rng.choice([0, 1, 1, 1, 2, 3]))]
+
+
+def _profile(rng):
+    attributes = _obj(rng, {
+        "brandName": "Cube",
+        "frameNumber": "WCUBE1234",
+        "driveUnit": _obj(rng, {
+            "productName": "Performance Line CX",
+            "softwareVersion": "4.5.6",
+            "serialNumber": "DU123",
+            "totalDistanceTraveled": rng.randint(0, 10**8),
+            "lock": _obj(rng, {"isLocked": rng.choice([True, False]), "isEnabled": True}),
+        }),
+        "connectedModule": _obj(rng, {
+            "productName": "ConnectModule",
+            "isAlarmFeatureEnabled": rng.choice([True, False]),
+        }) if rng.random() < 0.8 else None,
+        "remoteControl": _component(rng) if rng.random() < 0.8 else None,
+    })
+    attributes["batteries"] = _batteries(rng)
+
+    roll = rng.random()
+    if roll < 0.05:
+        return {}
+    if roll < 0.1:
+        return {"data": rng.choice(ODD_VALUES)}
+    if roll < 0.15:
+        return {"data": {"attributes": rng.choice(ODD_VALUES)}}
+    return {"data": {"id": "test-bike-id", "attributes": attributes}}
+
+
+def _soc(rng):
+    roll = rng.random()
+    if roll < 0.3:
+        return None
+    if roll < 0.35:
+        return rng.choice(ODD_VALUES)
+    reachable_range = [rng.randint(0, 200) for _ in range(rng.choice([0, 4, 5, 8]))]
+    if rng.random() < 0.05:
+        reachable_range = [rng.random() * 200 for _ in range(10000)]
+    return _obj(rng, {
+        "stateOfCharge": rng.randint(0, 100),
+        "chargingActive": rng.choice([True, False]),
+        "chargerConnected": rng.choice([True, False]),
+        "reachableRange": reachable_range,
+        "remainingEnergyForRider": rng.randint(0, 750),
+        "odometer": rng.randint(0, 10**8),
+        "stateOfChargeLatestUpdate": "2024-06-01T12:00:00Z",
+    })
+
+
+def test_combine_bike_data_generated_payloads():
+    """Only UpdateFailed may escape, and successful results keep their shape."""
+    coordinator = _coordinator()
+    rng = random.Random(SEED)
+
+    for index in range(PAYLOAD_COUNT):
+        profile_data = _profile(rng)
+        soc_data = _soc(rng)
+        try:
+            result = coordinator._combine_bike_data(profile_data, soc_data)
+        except UpdateFailed:
+            continue
+        except Exception as err:  # pylint: disable=broad-except
+            pytest.fail(
+                f"Payload {index} (seed {SEED}) raised {type(err).__name__}: {err}\n"
+                f"profile={profile_data!r:.500}\nsoc={soc_data!r:.500}"
+            )
+
+        assert set(result) >= {"battery", "bike", "components", "last_update"}
+        assert set(result["components"]) == {
+            "drive_unit", "battery", "connected_module", "remote_control",
+        }
+        assert isinstance(result["live_data_available"], bool)
+
+
+def test_combine_bike_data_missing_profile():
+    """A 404 profile (None) is reported as UpdateFailed."""
+    with pytest.raises(UpdateFailed):
+        _coordinator()._combine_bike_data(None, None)
+
+
+def test_combine_bike_data_throughput(record_property):
+    """Record combine throughput for typical payloads (reported, not asserted)."""
+    coordinator = _coordinator()
+    rng = random.Random(SEED)
+    payloads = []
+    while len(payloads) < 200:
+        profile_data = _profile(rng)
+        attributes = profile_data.get("data")
+        # Typical payloads only - well formed, one battery, normal array sizes
+        if (
+            isinstance(attributes, dict)
+            and isinstance(attributes.get("attributes"), dict)
+            and isinstance(attributes["attributes"].get("batteries"), list)
+            and len(attributes["attributes"]["batteries"]) == 1
+        ):
+            payloads.append((profile_data, _soc(rng)))
+
+    iterations = 25
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for profile_data, soc_data in payloads:
+            try:
+                coordinator._combine_bike_data(profile_data, soc_data)
+            except UpdateFailed:
+                pass
+    elapsed = time.perf_counter() - started
+
+    rate = iterations * len(payloads) / elapsed
+    record_property("combine_payloads_per_second", round(rate))
+    # Reported only - wall-clock floors flake on loaded CI runners
+    print(f"_combine_bike_data: {rate:,.0f} payloads/s")
+
+
+def test_combine_bike_data_dual_battery():
+    """Both batteries of a DualBattery bike are indexed and aggregated."""
+    profile_data = {"data": {"attributes": {"batteries": [
+        {"batteryLevel": 80, "remainingEnergy": 500, "totalEnergy": 625,
+         "isCharging": False, "numberOfFullChargeCycles": {"total": 10},
+         "serialNumber": "BAT1"},
+        {"batteryLevel": 40, "remainingEnergy": 200, "totalEnergy": 500,
+         "isCharging": True, "numberOfFullChargeCycles": {"total": 4},
+         "serialNumber": "BAT2"},
+    ]}}}
+    result = _coordinator()._combine_bike_data(profile_data, None)
+
+    assert list(result["batteries"]) == ["BAT1", "BAT2"]
+    assert result["batteries"]["BAT2"]["level_percent"] == 40
+    assert result["battery"]["remaining_wh"] == 700
+    assert result["battery"]["total_capacity_wh"] == 1125
+    assert result["battery"]["charge_cycles_total"] == 14
+    assert result["battery"]["is_charging"] is True
+    assert result["battery"]["level_percent"] == round((80 * 625 + 40 * 500) / 1125, 1)
+    assert result["components"]["battery"]["serial_number"] == "BAT1"
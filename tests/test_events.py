@@ -0,0 +1,71 @@
+"""Tests for the transition detection between snapshots."""
+# conftest.py handles Home Assistant mocking before imports
+from custom_components.bosch_ebike.const import (
+    EVENT_CHARGER_CONNECTED,
+    EVENT_CHARGING_STARTED,
+    EVENT_FIRMWARE_CHANGED,
+    EVENT_RIDE_DETECTED,
+    EVENT_TARGET_SOC_REACHED,
+)
+from custom_components.bosch_ebike.events import detect_transitions
+
+
+def _snapshot(level=50, charging=False, connected=False, distance=10000, firmware="1.0"):
+    return {
+        "battery": {
+            "level_percent": level,
+            "is_charging": charging,
+            "is_charger_connected": connected,
+        },
+        "bike": {"total_distance_m": distance},
+        "components": {"drive_unit": {"software_version": firmware}},
+    }
+
+
+def test_transitions_between_snapshots():
+    """Charging, target level, plug-in and firmware changes are reported once."""
+    previous = _snapshot(level=79)
+    current = _snapshot(level=80, charging=True, connected=True, firmware="1.1")
+
+    events = dict(detect_transitions(previous, current, target_soc=80))
+    assert set(events) == {
+        EVENT_CHARGING_STARTED,
+        EVENT_TARGET_SOC_REACHED,
+        EVENT_CHARGER_CONNECTED,
+        EVENT_FIRMWARE_CHANGED,
+    }
+    assert events[EVENT_TARGET_SOC_REACHED] == {"battery_level": 80, "target_soc": 80}
+    assert events[EVENT_FIRMWARE_CHANGED]["previous_version"] == "1.0"
+
+    # Nothing changed, and nothing to compare against after a restart
+    assert detect_transitions(current, current, target_soc=80) == []
+    assert detect_transitions(None, current, target_soc=80) == []
+
+
+def test_unknown_values_are_not_transitions():
+    """A value going from None to something is a restart, not an event."""
+    previous = _snapshot()
+    previous["battery"] = {"level_percent": None, "is_charging": None}
+    current = _snapshot(level=90, charging=True, connected=True)
+
+    assert detect_transitions(previous, current, target_soc=80) == []
+
+
+def test_ride_detection_ignores_odometer_regression():
+    """Returning to the highest odometer seen after a lower reading is not a ride."""
+    events = detect_transitions(_snapshot(distance=10000), _snapshot(distance=10500), 80)
+    assert events == [
+        (EVENT_RIDE_DETECTED, {"distance_m": 500, "total_distance_m": 10500})
+    ]
+
+    # 10500 -> 9000 (stale reading) -> 10500
+    assert detect_transitions(_snapshot(distance=10500), _snapshot(distance=9000), 80) == []
+    assert detect_transitions(
+        _snapshot(distance=9000), _snapshot(distance=10500), 80, max_distance_m=10500
+    ) == []
+    assert detect_transitions(
+        _snapshot(distance=9000), _snapshot(distance=10700), 80, max_distance_m=10500
+    ) == [(EVENT_RIDE_DETECTED, {"distance_m": 200, "total_distance_m": 10700})]
+
+    # Below the minimum distance is odometer noise
+    assert detect_transitions(_snapshot(distance=10000), _snapshot(distance=10050), 80) == []
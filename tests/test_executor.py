@@ -0,0 +1,94 @@
+"""Tests for the shared refresh executor."""
+# conftest.py handles Home Assistant mocking before imports
+import asyncio
+
+from custom_components.bosch_ebike.executor import RefreshExecutor
+
+
+def test_executor_limits_concurrency_and_takes_bikes_in_turn():
+    """No more than limit refreshes run, and waiting bikes alternate."""
+    executor = RefreshExecutor(limit=1)
+    running = 0
+    peak = 0
+    order = []
+
+    async def refresh(bike_id):
+        nonlocal running, peak
+        await executor.acquire(bike_id)
+        try:
+            running += 1
+            peak = max(peak, running)
+            order.append(bike_id)
+            await asyncio.sleep(0)
+        finally:
+            running -= 1
+            executor.release()
+
+    async def run():
+        # Bike a queues three refreshes before b and c queue one each
+        await asyncio.gather(
+            refresh("a"), refresh("a"), refresh("a"), refresh("b"), refresh("c")
+        )
+
+    asyncio.run(run())
+    assert peak == 1
+    assert order == ["a", "a", "b", "c", "a"]
+    stats = executor.as_dict()
+    assert stats["running"] == 0
+    assert stats["queue_depth"] == 0
+    assert stats["max_queue_depth"] == 4
+    assert stats["queued"] == 4
+
+
+def test_executor_cancelled_waiter_leaves_queue():
+    """A refresh cancelled while waiting gives up its place in the queue."""
+    executor = RefreshExecutor(limit=1)
+
+    async def run():
+        await executor.acquire("a")
+        waiter = asyncio.ensure_future(executor.acquire("b"))
+        await asyncio.sleep(0)
+        assert executor.queue_depth == 1
+        waiter.cancel()
+        await asyncio.sleep(0)
+        assert executor.queue_depth == 0
+        executor.release()
+        assert executor.as_dict()["running"] == 0
+
+        # Raising the limit starts waiting refreshes right away
+        await executor.acquire("a")
+        waiter = asyncio.ensure_future(executor.acquire("b"))
+        await asyncio.sleep(0)
+        executor.set_limit(2)
+        await waiter
+        assert executor.as_dict()["running"] == 2
+
+    asyncio.run(run())
+
+
+def test_executor_priority_refresh_skips_the_turns():
+    """A priority refresh gets the next free slot ahead of waiting bikes."""
+    executor = RefreshExecutor(limit=1)
+    order = []
+
+    async def refresh(bike_id, priority=False):
+        await executor.acquire(bike_id, priority)
+        order.append(bike_id)
+        await asyncio.sleep(0)
+        executor.release()
+
+    async def run():
+        await executor.acquire("a")
+        waiters = [
+            asyncio.ensure_future(refresh("b")),
+            asyncio.ensure_future(refresh("c")),
+            asyncio.ensure_future(refresh("d", priority=True)),
+        ]
+        await asyncio.sleep(0)
+        assert executor.queue_depth == 3
+        executor.release()
+        await asyncio.gather(*waiters)
+
+    asyncio.run(run())
+    assert order == ["d", "b", "c"]
+    assert executor.as_dict()["running"] == 0
@@ -0,0 +1,94 @@
+"""Tests for the hourly external statistics export."""
+# conftest.py handles Home Assistant mocking before imports
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.bosch_ebike import external_statistics
+from custom_components.bosch_ebike.external_statistics import HOUR, ExternalStatistics
+
+
+@pytest.fixture
+def imported(monkeypatch):
+    """Capture the statistics imports - the recorder and homeassistant.util are mocked."""
+    imports = []
+    monkeypatch.setattr(external_statistics, "StatisticData", dict)
+    monkeypatch.setattr(external_statistics, "StatisticMetaData", dict)
+    monkeypatch.setattr(
+        external_statistics,
+        "async_add_external_statistics",
+        lambda hass, metadata, statistics: imports.append((metadata, statistics)),
+    )
+    monkeypatch.setattr(external_statistics, "slugify", lambda value: value)
+    monkeypatch.setattr(
+        external_statistics,
+        "dt_util",
+        SimpleNamespace(
+            utc_from_timestamp=lambda timestamp: datetime.fromtimestamp(
+                timestamp, timezone.utc
+            ),
+        ),
+    )
+    return imports
+
+
+START = datetime(2024, 5, 6, 8, tzinfo=timezone.utc)
+
+
+def _at(hours, minutes=0):
+    return datetime.fromtimestamp(START.timestamp() + hours * HOUR + minutes * 60, timezone.utc)
+
+
+def _data(distance_m, cycles=None):
+    return {
+        "bike": {"total_distance_m": distance_m},
+        "battery": {"charge_cycles_total": cycles},
+    }
+
+
+def _points(imported, suffix):
+    return [
+        (point["start"].hour, point["state"])
+        for metadata, statistics in imported
+        if metadata["statistic_id"] == f"bosch_ebike:bike_{suffix}"
+        for point in statistics
+    ]
+
+
+def test_backfill_carries_the_last_value_forward(imported):
+    """Hours without a reading are exported with the last known value."""
+    hass = SimpleNamespace(config=SimpleNamespace(components={"recorder"}))
+    stats = ExternalStatistics(hass, "bike", "eBike")
+
+    assert stats.async_add(_data(100000, cycles=12), now=_at(0, 10))
+    # Same values within the hour - nothing to store
+    assert not stats.async_add(_data(100000, cycles=12), now=_at(0, 40))
+    assert imported == []
+
+    # HA was down for hours 1 and 2
+    stats.async_add(_data(110000), now=_at(3, 5))
+    assert _points(imported, "odometer") == [(8, 100.0), (9, 100.0), (10, 100.0)]
+    assert _points(imported, "charge_cycles") == [(8, 12), (9, 12), (10, 12)]
+
+    imported.clear()
+    stats.async_add(_data(112000), now=_at(5, 5))
+    # Hour 3 only had an odometer reading - the cycles carry forward from before it
+    assert _points(imported, "odometer") == [(11, 110.0), (12, 110.0)]
+    assert _points(imported, "charge_cycles") == [(11, 12), (12, 12)]
+
+    restored = ExternalStatistics(hass, "bike", "eBike")
+    restored.load(stats.as_dict())
+    assert restored.as_dict() == stats.as_dict()
+
+
+def test_no_export_without_recorder(imported):
+    """Hours are buffered but not exported while the recorder isn't loaded."""
+    hass = SimpleNamespace(config=SimpleNamespace(components=set()))
+    stats = ExternalStatistics(hass, "bike", "eBike")
+    stats.async_add(_data(100000), now=_at(0))
+    stats.async_add(_data(101000), now=_at(2))
+
+    assert imported == []
+    assert len(stats.as_dict()["hours"]) == 2
+    assert not stats.async_add({"bike": {}, "battery": {}}, now=_at(3))
@@ -0,0 +1,41 @@
+"""Tests for the battery health model."""
+# conftest.py handles Home Assistant mocking before imports
+import pytest
+
+from custom_components.bosch_ebike.health import BatteryHealthModel
+
+
+def test_health_model_fits_capacity_fade():
+    """Capacity against cycles gives the health and the fade per 100 cycles."""
+    model = BatteryHealthModel()
+    assert model.update(625, 10, "PowerTube 625")
+    # Same reading again - nothing changes
+    assert not model.update(625, 10, "PowerTube 625")
+    assert model.degradation_per_100_cycles is None
+
+    # 6.25 Wh (1 % of 625 Wh) lost every 50 cycles
+    for cycles in (60, 110, 160):
+        assert model.update(625 - (cycles - 10) / 50 * 6.25, cycles, "PowerTube 625")
+
+    assert model.nominal_wh == 625
+    assert model.state_of_health == 97.0
+    assert model.degradation_per_100_cycles == pytest.approx(2.0)
+
+    restored = BatteryHealthModel.from_dict(model.as_dict())
+    assert restored.state_of_health == model.state_of_health
+    assert restored.degradation_per_100_cycles == model.degradation_per_100_cycles
+
+
+def test_health_model_without_rating_uses_best_capacity():
+    """Without a rated capacity, the best capacity reported is the reference."""
+    model = BatteryHealthModel()
+    assert BatteryHealthModel.nominal_from_product_name("Battery") is None
+    # The API may send anything as the name
+    assert BatteryHealthModel.nominal_from_product_name(None) is None
+    assert BatteryHealthModel.nominal_from_product_name(625) is None
+    assert not model.update(None, 10)
+    model.update(500, 10)
+    model.update(490, 60)
+
+    assert model.nominal_wh == 500
+    assert model.state_of_health == 98.0
@@ -0,0 +1,59 @@
+"""Tests for the SoC sample buffer and the charge rate estimator."""
+# conftest.py handles Home Assistant mocking before imports
+import pytest
+
+from custom_components.bosch_ebike.history import ChargeRateEstimator, SampleBuffer
+
+
+def test_estimator_converges_on_the_charge_rate():
+    """Noisy integer SoC steps settle on the true rate within a few samples."""
+    estimator = ChargeRateEstimator()
+    assert estimator.percent_per_hour is None
+
+    start = 1_700_000_000.0
+    # 30 %/h and 150 W, sampled every 5 minutes, SoC rounded to whole percent
+    for sample in range(24):
+        hours = sample * 5 / 60
+        estimator.add(start + hours * 3600, round(20 + 30 * hours), 100 + 150 * hours)
+        if sample == 0:
+            # A single sample has no slope
+            assert estimator.percent_per_hour is None
+
+    assert estimator.percent_per_hour == pytest.approx(30, rel=0.05)
+    assert estimator.watts == pytest.approx(150, rel=0.01)
+
+
+def test_estimator_follows_a_slowing_charge_and_resets():
+    """Old samples fade out, so the slow-down near full shows up."""
+    estimator = ChargeRateEstimator()
+    start = 1_700_000_000.0
+    for sample in range(12):
+        estimator.add(start + sample * 300, 40 + sample * 3, None)
+    fast = estimator.percent_per_hour
+    for sample in range(12, 24):
+        estimator.add(start + sample * 300, 73 + (sample - 11), None)
+
+    assert fast == pytest.approx(36)
+    # Mostly the recent 12 %/h - a trace of the earlier samples remains
+    assert 12 <= estimator.percent_per_hour < 18
+    # Without energy readings there is no power estimate
+    assert estimator.watts is None
+
+    estimator.reset()
+    assert estimator.percent_per_hour is None
+
+
+def test_sample_buffer_keeps_the_newest_samples():
+    """A full buffer overwrites its oldest samples and iterates oldest first."""
+    samples = SampleBuffer(size=3)
+    assert samples.latest is None
+    for index in range(5):
+        samples.append(1000.0 + index, 50.0 + index, None if index == 3 else 400.0 + index)
+
+    assert len(samples) == 3
+    assert list(samples) == [
+        (1002.0, 52.0, 402.0),
+        (1003.0, 53.0, None),
+        (1004.0, 54.0, 404.0),
+    ]
+    assert samples.latest == (1004.0, 54.0, 404.0)
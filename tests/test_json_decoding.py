@@ -0,0 +1,201 @@
+"""Benchmarks for response decoding and field projection."""
+# conftest.py handles Home Assistant mocking before imports
+import asyncio
+import json
+import time
+import tracemalloc
+
+import pytest
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("async_timeout")
+
+from custom_components.bosch_ebike.api import (  # noqa: E402
+    BIKE_LIST_FIELDS,
+    STATE_OF_CHARGE_FIELDS,
+    BoschEBikeAPI,
+    BoschEBikeAPIError,
+    json_loads,
+    project,
+)
+from custom_components.bosch_ebike.middleware import RecordReplayMiddleware  # noqa: E402
+
+
+def _component(name):
+    return {
+        "productName": name,
+        "softwareVersion": "4.5.6",
+        "serialNumber": "SN123",
+        "partNumber": "BDU3740",
+        "hardwareVersion": "1.0",
+        "manufacturingDate": "2023-01-01",
+        "capabilities": [{"name": f"cap{i}", "enabled": True} for i in range(10)],
+    }
+
+
+def _bike_list(bikes=3):
+    """A bike list response with the fields the API sends but we don't use."""
+    return {
+        "data": [
+            {
+                "id": f"bike-{index}",
+                "type": "bike-profile",
+                "links": {"self": f"/v1/bike-profile/bike-{index}"},
+                "attributes": {
+                    "brandName": "Cube",
+                    "frameNumber": "WCUBE1234",
+                    "createdAt": "2023-01-01T00:00:00Z",
+                    "batteries": [
+                        {
+                            **_component("PowerTube 625"),
+                            "batteryLevel": 80,
+                            "remainingEnergy": 500,
+                            "totalEnergy": 625,
+                            "isCharging": False,
+                            "isChargerConnected": False,
+                            "numberOfFullChargeCycles": {"total": 42, "onBike": 40},
+                            "deliveredWhOverLifetime": 26000,
+                        }
+                    ],
+                    "driveUnit": {
+                        **_component("Performance Line CX"),
+                        "totalDistanceTraveled": 1234567,
+                        "lock": {"isLocked": False, "isEnabled": True},
+                        "assistModes": [{"name": f"mode{i}"} for i in range(6)],
+                    },
+                    "connectedModule": {
+                        **_component("ConnectModule"),
+                        "isAlarmFeatureEnabled": True,
+                    },
+                    "remoteControl": _component("LED Remote"),
+                    "serviceHistory": [
+                        {"date": "2024-01-01", "dealer": "Bike shop", "notes": "x" * 200}
+                        for _ in range(20)
+                    ],
+                },
+            }
+            for index in range(bikes)
+        ]
+    }
+
+
+def _retained_bytes(build):
+    """Return the memory still allocated by build's result."""
+    tracemalloc.start()
+    result = build()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return retained
+
+
+def test_projection_keeps_consumed_fields():
+    """Projection keeps what the coordinator reads and passes odd shapes through."""
+    body = project(_bike_list(1), BIKE_LIST_FIELDS)
+    attributes = body["data"][0]["attributes"]
+
+    assert "serviceHistory" not in attributes
+    assert "capabilities" not in attributes["driveUnit"]
+    assert attributes["batteries"][0]["numberOfFullChargeCycles"] == {"total": 42}
+    assert attributes["driveUnit"]["lock"] == {"isLocked": False, "isEnabled": True}
+    assert project({"data": None}, BIKE_LIST_FIELDS) == {"data": None}
+    assert project("unexpected", STATE_OF_CHARGE_FIELDS) == "unexpected"
+
+
+def test_decode_and_project_benchmark(record_property):
+    """Record decode time and retained memory, full tree vs projected."""
+    raw = json.dumps(_bike_list()).encode()
+    iterations = 200
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        json.loads(raw)
+    full_us = (time.perf_counter() - started) / iterations * 1e6
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        project(json_loads(raw), BIKE_LIST_FIELDS)
+    projected_us = (time.perf_counter() - started) / iterations * 1e6
+
+    full_bytes = _retained_bytes(lambda: json.loads(raw))
+    projected_bytes = _retained_bytes(lambda: project(json_loads(raw), BIKE_LIST_FIELDS))
+
+    record_property("decode_full_us", round(full_us, 1))
+    record_property("decode_projected_us", round(projected_us, 1))
+    record_property("retained_full_bytes", full_bytes)
+    record_property("retained_projected_bytes", projected_bytes)
+    print(
+        f"bike list decode: {full_us:.1f}us full, {projected_us:.1f}us projected; "
+        f"retained {full_bytes:,}B full, {projected_bytes:,}B projected"
+    )
+    assert projected_bytes < full_bytes / 2
+
+
+class _FakeResponse:
+    def __init__(self, raw):
+        self.status = 200
+        self.headers = {}
+        self.content_length = len(raw)
+        self._raw = raw
+
+    async def read(self):
+        return self._raw
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class _FakeSession:
+    def __init__(self, raw):
+        self._raw = raw
+
+    def request(self, method, url, **kwargs):
+        return _FakeResponse(self._raw)
+
+
+@pytest.mark.parametrize("raw", [b"", b'{"stateOfCharge": 8'])
+def test_undecodable_body_raises_api_error(raw):
+    """An empty or truncated 200 body is an API error, not a decode crash."""
+    api = BoschEBikeAPI(_FakeSession(raw), access_token="token", middlewares=())
+
+    with pytest.raises(BoschEBikeAPIError, match="Invalid response"):
+        asyncio.run(api.get_bike_profile("bike-1"))
+    # The state of charge getter treats any API error as an offline bike
+    assert asyncio.run(api.get_state_of_charge("bike-1")) is None
+
+
+class _MemoryRecording:
+    """Stands in for ApiRecorder and ApiReplayer, keeping bodies in memory."""
+
+    def __init__(self):
+        self.bodies = []
+
+    async def async_record(self, method, endpoint, status, elapsed, body):
+        self.bodies.append(body)
+
+    async def async_replay(self, method, endpoint):
+        return 200, self.bodies[0]
+
+
+def test_recording_holds_full_body_and_replay_is_projected():
+    """Projection runs after the chain - recorded bodies are what the cloud sent."""
+    raw = json.dumps(_bike_list(1)).encode()
+    recording = _MemoryRecording()
+    live = BoschEBikeAPI(
+        _FakeSession(raw),
+        access_token="token",
+        middlewares=(RecordReplayMiddleware(recorder=recording),),
+    )
+    replay = BoschEBikeAPI(
+        _FakeSession(b""),
+        access_token="token",
+        middlewares=(RecordReplayMiddleware(replayer=recording),),
+    )
+
+    live_bikes = asyncio.run(live.get_bikes())
+    assert recording.bodies == [json.loads(raw)]
+    assert asyncio.run(replay.get_bikes()) == live_bikes
+    assert live_bikes == project(_bike_list(1), BIKE_LIST_FIELDS)["data"]
@@ -0,0 +1,133 @@
+"""Tests for the API request middleware chain."""
+# conftest.py handles Home Assistant mocking before imports
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from custom_components.bosch_ebike.middleware import (  # noqa: E402
+    ApiRequest,
+    ApiResponse,
+    AuthMiddleware,
+    CacheMiddleware,
+    MetricsMiddleware,
+    RateLimitMiddleware,
+    RetryMiddleware,
+    build_chain,
+)
+
+
+def _request(budget=5.0, max_age=0):
+    return ApiRequest("GET", "/v1/bike-profile", time.monotonic() + budget, max_age)
+
+
+class _Transport:
+    """Answers with the given statuses in order, recording the headers sent."""
+
+    def __init__(self, *statuses):
+        self.statuses = list(statuses)
+        self.headers = []
+
+    async def __call__(self, request):
+        self.headers.append(dict(request.headers))
+        return ApiResponse(self.statuses.pop(0), {"data": []})
+
+
+class _Api:
+    """Stands in for BoschEBikeAPI's token handling."""
+
+    def __init__(self):
+        self.access_token = "old"
+        self.refreshes = 0
+
+    async def async_get_access_token(self, timeout):
+        return self.access_token
+
+    async def refresh_access_token(self, timeout):
+        self.refreshes += 1
+        self.access_token = "new"
+
+
+def test_auth_refreshes_once_on_401():
+    """A 401 refreshes the token and retries with the new one, once."""
+    api = _Api()
+    transport = _Transport(401, 200)
+    handler = build_chain([AuthMiddleware(api)], transport)
+
+    response = asyncio.run(handler(_request()))
+
+    assert response.status == 200
+    assert api.refreshes == 1
+    assert [h["Authorization"] for h in transport.headers] == ["Bearer old", "Bearer new"]
+
+
+def test_retry_stops_at_deadline():
+    """Retries back off but never sleep past the request's budget."""
+    transport = _Transport(503, 503, 200)
+    handler = build_chain([RetryMiddleware(retries=2, backoff=0.01)], transport)
+    assert asyncio.run(handler(_request())).status == 200
+
+    transport = _Transport(503, 503, 200)
+    handler = build_chain([RetryMiddleware(retries=2, backoff=10)], transport)
+    assert asyncio.run(handler(_request(budget=1))).status == 503
+    assert len(transport.statuses) == 2
+
+
+def test_cache_serves_fresh_responses_only():
+    """max_age answers from the cache; without it the cache is refreshed."""
+    transport = _Transport(200, 200, 200)
+    cache = CacheMiddleware()
+    handler = build_chain([cache], transport)
+
+    async def run():
+        # Never read with max_age - not kept
+        await handler(_request())
+        assert not cache._entries
+        await handler(_request(max_age=60))
+        await handler(_request(max_age=60))
+        assert len(transport.statuses) == 1
+        await handler(_request())
+        assert not transport.statuses
+        assert len(cache._entries) == 1
+
+    asyncio.run(run())
+
+
+def test_rate_limit_respects_deadline():
+    """An empty bucket waits for a token, or times out if the budget is too short."""
+    transport = _Transport(200, 200, 200)
+    handler = build_chain([RateLimitMiddleware(rate=50, burst=1)], transport)
+
+    async def run():
+        await handler(_request())
+        await handler(_request())
+        with pytest.raises(asyncio.TimeoutError):
+            await handler(_request(budget=0.001))
+
+    asyncio.run(run())
+
+
+def test_metrics_count_bytes_and_flag_growth():
+    """Bytes are summed per endpoint and a growing average is flagged."""
+    sizes = [1000] + [3000] * 10
+
+    async def transport(request):
+        size = sizes.pop(0)
+        return ApiResponse(200, {}, body_bytes=size, wire_bytes=size // 4)
+
+    metrics = MetricsMiddleware()
+    handler = build_chain([metrics], transport)
+
+    async def run():
+        await handler(_request())
+        assert not metrics.totals()["growing"]
+        while sizes:
+            await handler(_request())
+
+    asyncio.run(run())
+    totals = metrics.totals()
+    assert totals["body_bytes"] == 31000
+    assert totals["wire_bytes"] == 7750
+    assert totals["growing"] == ["/v1/bike-profile"]
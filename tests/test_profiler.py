@@ -0,0 +1,59 @@
+"""Tests for the update cycle profiler."""
+# conftest.py handles Home Assistant mocking before imports
+import asyncio
+
+from custom_components.bosch_ebike.profiler import UpdateProfiler, span
+
+
+async def _update():
+    with span("bike_profile"):
+        with span("network"):
+            await asyncio.sleep(0.01)
+        with span("decode"):
+            pass
+    with span("combine"):
+        pass
+
+
+def test_profiler_aggregates_nested_spans():
+    """Spans nest by call, sum over cycles and stop once the cycles are done."""
+    profiler = UpdateProfiler()
+
+    async def run():
+        # Not profiling - spans are no-ops
+        with profiler.cycle():
+            await _update()
+        profiler.start(cycles=2, duration=60)
+        for _ in range(2):
+            assert not profiler.done
+            with profiler.cycle():
+                await _update()
+
+    asyncio.run(run())
+    assert profiler.done
+    report, folded = profiler.stop()
+
+    assert report["cycles"] == 2
+    stages = report["stages"]
+    assert set(stages) == {
+        "update",
+        "update;bike_profile",
+        "update;bike_profile;network",
+        "update;bike_profile;decode",
+        "update;combine",
+    }
+    assert stages["update;bike_profile;network"]["count"] == 2
+    assert stages["update;bike_profile;network"]["total_ms"] >= 20
+    # Self time excludes the children
+    assert stages["update;bike_profile"]["self_ms"] < stages["update;bike_profile"]["total_ms"]
+    assert "update;bike_profile;network " in "\n".join(folded)
+    assert not profiler.active
+
+
+def test_span_outside_cycle_is_noop():
+    """Spans outside a profiled cycle record nothing."""
+    profiler = UpdateProfiler()
+    profiler.start(cycles=1, duration=60)
+    asyncio.run(_update())
+    report, _ = profiler.stop()
+    assert report["stages"] == {}
@@ -0,0 +1,66 @@
+"""Tests for recording and replaying API traffic."""
+# conftest.py handles Home Assistant mocking before imports
+import asyncio
+import gzip
+import json
+
+from custom_components.bosch_ebike.recording import (
+    REDACTED,
+    ApiRecorder,
+    ApiReplayer,
+    redact,
+)
+
+
+def test_redact_replaces_serials_and_tokens():
+    """Identifying fields are replaced at any depth, everything else is kept."""
+    body = {
+        "access_token": "eyJ...",
+        "refresh_token": "abc",
+        "data": [{
+            "id": "bike-1",
+            "attributes": {
+                "frameNumber": "WBX123",
+                "batteries": [{"serialNumber": "SN1", "batteryLevel": 80}],
+                "driveUnit": {"serialNumber": None},
+            },
+        }],
+    }
+
+    redacted = redact(body)
+    assert redacted["access_token"] == redacted["refresh_token"] == REDACTED
+    attributes = redacted["data"][0]["attributes"]
+    assert attributes["frameNumber"] == REDACTED
+    assert attributes["batteries"] == [{"serialNumber": REDACTED, "batteryLevel": 80}]
+    # Missing values stay missing
+    assert attributes["driveUnit"] == {"serialNumber": None}
+    assert redacted["data"][0]["id"] == "bike-1"
+    # The original is untouched
+    assert body["data"][0]["attributes"]["batteries"][0]["serialNumber"] == "SN1"
+
+
+def test_recording_is_redacted_rotated_and_replayed(tmp_path):
+    """A recording holds redacted bodies, rotates when full and replays in order."""
+    path = str(tmp_path / "recording.jsonl.gz")
+
+    async def run():
+        recorder = ApiRecorder(path, max_bytes=300)
+        for index in range(10):
+            await recorder.async_record(
+                "GET", "/bike", 200, 0.25, {"serialNumber": "SN1", "index": index}
+            )
+
+        replayer = ApiReplayer(path, speed=0)
+        await replayer.async_load()
+        return [(await replayer.async_replay("GET", "/bike"))[1] for _ in range(3)]
+
+    replayed = asyncio.run(run())
+    # Each write adds a gzip member of over 100 bytes - 300 bytes hold two
+    assert (tmp_path / "recording.jsonl.gz.1").exists()
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        records = [json.loads(line) for line in file]
+    assert [record["body"]["index"] for record in records] == [8, 9]
+
+    # Bodies come back redacted, starting over once exhausted
+    assert [body["index"] for body in replayed] == [8, 9, 8]
+    assert all(body["serialNumber"] == REDACTED for body in replayed)
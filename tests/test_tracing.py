@@ -0,0 +1,35 @@
+"""Tests for sampled hot-path logging."""
+# conftest.py handles Home Assistant mocking before imports
+import logging
+
+from custom_components.bosch_ebike.tracing import SampledLogger
+
+
+def test_sampled_logger_rate_limits_per_key(caplog):
+    """A key logs once per interval, then reports how many were suppressed."""
+    logger = logging.getLogger("test_sampled_logger")
+    sampled = SampledLogger(logger, interval=3600)
+
+    with caplog.at_level(logging.INFO, logger="test_sampled_logger"):
+        for bike in range(50):
+            sampled.info("update_complete", "Updated %s", bike)
+        sampled.info("other", "Other message")
+        sampled.interval = 0
+        sampled.info("update_complete", "Updated %s", "last")
+
+    assert [record.getMessage() for record in caplog.records] == [
+        "Updated 0",
+        "Other message",
+        "Updated last (49 similar messages suppressed)",
+    ]
+
+
+def test_sampled_logger_skips_disabled_levels():
+    """Nothing is counted or formatted while the level is disabled."""
+    logger = logging.getLogger("test_sampled_logger_disabled")
+    logger.setLevel(logging.WARNING)
+    sampled = SampledLogger(logger, interval=3600)
+
+    sampled.info("update_complete", "Updated %s", object())
+
+    assert not sampled._keys
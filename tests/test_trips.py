@@ -0,0 +1,66 @@
+"""Tests for trip segmentation and rollups."""
+# conftest.py handles Home Assistant mocking before imports
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.bosch_ebike import trips
+from custom_components.bosch_ebike.trips import TRIP_GAP, TripStore
+
+
+@pytest.fixture(autouse=True)
+def _utc(monkeypatch):
+    """homeassistant.util.dt is mocked - local time is UTC here."""
+    monkeypatch.setattr(
+        trips,
+        "dt_util",
+        SimpleNamespace(
+            as_local=lambda value: value,
+            utc_from_timestamp=lambda timestamp: datetime.fromtimestamp(
+                timestamp, timezone.utc
+            ),
+        ),
+    )
+
+
+START = datetime(2024, 5, 6, 8, tzinfo=timezone.utc).timestamp()
+
+
+def test_trips_are_split_by_gaps_and_rolled_up():
+    """Odometer increases form trips, closed after TRIP_GAP without movement."""
+    store = TripStore()
+    store.update(START, 10000, 500)
+    store.update(START + 600, 13000, 480)
+    store.update(START + 1200, 15000, 470)
+    # Next ride, after a long stop
+    store.update(START + 1200 + TRIP_GAP + 600, 16000, 465)
+
+    summary = store.summary(datetime.fromtimestamp(START + 7200, timezone.utc))
+    assert summary["last_trip_km"] == 1.0
+    assert summary["today_km"] == 6.0
+    assert summary["ride_in_progress"]
+
+    result = store.query(limit=10)
+    assert [trip["distance_km"] for trip in result["trips"]] == [5.0, 1.0]
+    assert result["trips"][0]["energy_wh"] == 30
+    assert result["rollups"]["day"]["2024-05-06"] == {
+        "distance_km": 6.0, "energy_wh": 35, "trips": 2,
+    }
+
+    restored = TripStore()
+    restored.load(store.as_dict())
+    assert restored.query(limit=10) == result
+
+
+def test_odometer_regression_is_not_counted_twice():
+    """A lower reading is ignored, and returning to the higher one adds nothing."""
+    store = TripStore()
+    store.update(START, 10000, None)
+    assert not store.update(START + 300, 9000, None)
+    assert not store.update(START + 600, 10000, None)
+    assert store.update(START + 900, 10500, None)
+
+    result = store.query(limit=10)
+    assert [trip["distance_km"] for trip in result["trips"]] == [0.5]
+    assert result["rollups"]["day"]["2024-05-06"]["distance_km"] == 0.5